@@ -1,6 +1,8 @@
 import cpu_pd_tune_funs 
+import stability_chart
 from cpu_pd_tune_animation import play_animation
 import numpy as np
+import time
 from datetime import datetime
 import pandas as pd
 from pathlib import Path
@@ -78,6 +80,27 @@ class PD_Controller:
         cpu_pd_tune_funs.plot_PD_plane(self.ordered_runs, self.D_cor_P, self.D_cor_D, self.D_a, self.tau)
         return self
 
+    def plot_stability_chart(self, resolution=20):
+        """
+        Computes and plots the stability chart of the linearized delayed PD control over the
+        gain ranges, without running the nonlinear simulations.
+
+        Args:
+            resolution (int): Number of semi-discretization steps per delay (default: 20).
+
+        Returns:
+            self: Returns the instance.
+        """
+        Kp_phi1_range = self.M_data["Kp_phi1_range"]
+        Kd_phi1_range = self.M_data["Kd_phi1_range"]
+        start = time.perf_counter()
+        sigma = stability_chart.pd_stability_chart(self.M_data["sys_consts_double"], Kp_phi1_range, Kd_phi1_range, self.tau, resolution)
+        boundary = stability_chart.stability_boundary(Kp_phi1_range, Kd_phi1_range, sigma)
+        print(f"Stability chart: {np.count_nonzero(sigma < 0)}/{sigma.size} stable combinations, "
+              f"{len(boundary)} boundary points in {time.perf_counter() - start:.2f} s.")
+        stability_chart.plot_stability_chart(Kp_phi1_range, Kd_phi1_range, sigma)
+        return self
+
     def play_animation(self, index=0):
         """
         Plays the animation for a specific simulation result.
@@ -216,6 +239,7 @@ if __name__ == "__main__":
 
     #PD_M1.generate_optimization().printresults().plot_PD_p().play_animation()
     #PD_M1.load_from_pkl_file().printresults().plot_PD_p()
+    #PD_M1.plot_stability_chart()
     #PD_M3.generate_optimization().printresults().plot_PD_p().play_animation()
     #PD_M3.load_from_pkl_file().printresults().plot_PD_p().play_animation()
     PD_M5.generate_optimization().printresults()#.plot_PD_p().play_animation()
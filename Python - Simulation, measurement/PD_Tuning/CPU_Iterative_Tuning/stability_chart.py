@@ -0,0 +1,195 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.linalg import expm
+
+def linearized_sys_matrices(sys_consts):
+    """
+    Computes the matrices of the double pendulum linearized about the upright position.
+
+    Args:
+        sys_consts (list): Constants of the double pendulum (C1, C2, C3, C4, C5, m1, m2, l1, l2, g).
+
+    Returns:
+        tuple: The 4x4 state matrix A_lin and the 4x1 input matrix B_lin.
+    """
+    C1, C2, C3, C4, C5, m1, m2, l1, l2, g = sys_consts
+    s1 = C3 * C3 - C1 * C2
+
+    A_lin = np.array([
+        [0, 0, 1, 0],
+        [0, 0, 0, 1],
+        [C2 * C4 / s1, -C3 * C5 / s1, 0, 0],
+        [-C3 * C4 / s1, C1 * C5 / s1, 0, 0]
+    ])
+    B_lin = np.array([
+        [0],
+        [0],
+        [-(C2 * l1 * m1 + 2 * C2 * l1 * m2 - C3 * l2 * m2) / (2 * s1)],
+        [(C3 * l1 * m1 - C1 * l2 * m2 + 2 * C3 * l1 * m2) / (2 * s1)]
+    ])
+    return A_lin, B_lin
+
+def _semi_discretization_terms(A, h):
+    """
+    Computes the terms of one semi-discretization step of length h.
+
+    Args:
+        A (np.ndarray): State matrix (n x n).
+        h (float): Step length.
+
+    Returns:
+        tuple: Phi = e^(A h), Gamma_0 = int_0^h e^(A (h - s)) ds and
+            Gamma_1 = int_0^h e^(A (h - s)) s / h ds.
+    """
+    n = A.shape[0]
+    I = np.eye(n)
+    Z = np.zeros((n, n))
+    E = expm(np.block([[A, I, Z], [Z, Z, I], [Z, Z, Z]]) * h)
+    return E[:n, :n], E[:n, n:2 * n], E[:n, 2 * n:] / h
+
+def spectral_abscissa(A, B, K, tau, resolution=20, chunk_size=512):
+    """
+    Computes the spectral abscissa of the delayed closed loop x' = A x - B K x(t - tau)
+    for a batch of gains by first-order semi-discretization.
+
+    The delay is divided into resolution steps of h = tau / resolution. Over a step the
+    delayed state is interpolated linearly between its samples, which turns the delay
+    equation into the map of the states of the last resolution + 1 samples. The moduli of
+    the eigenvalues mu of the map give the rightmost characteristic roots as ln|mu| / h;
+    the eigenvalues of all gains are computed with batched eigvals on the stacked maps.
+
+    Args:
+        A (np.ndarray): State matrix (n x n).
+        B (np.ndarray): Input matrix (n x 1).
+        K (np.ndarray): Gains of shape (..., n).
+        tau (float): Delay in seconds, larger than zero.
+        resolution (int): Number of steps per delay (default: 20).
+        chunk_size (int): Number of gains per batched eigvals call (default: 512).
+
+    Returns:
+        np.ndarray: Spectral abscissa in 1/s for every gain, of shape (...); negative if the closed loop is stable.
+    """
+    K = np.asarray(K, dtype=float)
+    n = A.shape[0]
+    shape = K.shape[:-1]
+    K = K.reshape(-1, n)
+    r = int(resolution)
+    h = tau / r
+    Phi, Gamma_0, Gamma_1 = _semi_discretization_terms(A, h)
+
+    # x[i+1] = Phi x[i] + Gamma_1 D x[i-r+1] + (Gamma_0 - Gamma_1) D x[i-r], D = -B K
+    dim = n * (r + 1)
+    G = np.zeros((dim, dim))
+    G[:n, :n] = Phi
+    G[n:, :-n] = np.eye(n * r)
+    G_1B = -Gamma_1 @ B
+    G_0B = -(Gamma_0 - Gamma_1) @ B
+
+    sigma = np.empty(len(K))
+    for start in range(0, len(K), chunk_size):
+        K_c = K[start:start + chunk_size]
+        G_c = np.repeat(G[None], len(K_c), axis=0)
+        G_c[:, :n, n * (r - 1):n * r] += G_1B[None] * K_c[:, None, :]
+        G_c[:, :n, n * r:] += G_0B[None] * K_c[:, None, :]
+        mu = np.max(np.abs(np.linalg.eigvals(G_c)), axis=-1)
+        sigma[start:start + chunk_size] = np.log(np.maximum(mu, 1e-300)) / h
+
+    return sigma.reshape(shape)
+
+def pd_stability_chart(sys_consts, Kp_phi1_range, Kd_phi1_range, delay, resolution=20):
+    """
+    Computes the stability chart of the delayed PD control of the first rod angle,
+    ddq = -(K_p phi_1 + K_d dphi_1), as in the PD tuning simulations.
+
+    Args:
+        sys_consts (list): Constants of the double pendulum.
+        Kp_phi1_range (np.ndarray): Values of K_p.
+        Kd_phi1_range (np.ndarray): Values of K_d.
+        delay (float): Control loop delay in seconds.
+        resolution (int): Number of semi-discretization steps per delay (default: 20).
+
+    Returns:
+        np.ndarray: Spectral abscissa of shape (len(Kp_phi1_range), len(Kd_phi1_range)).
+    """
+    A, B = linearized_sys_matrices(sys_consts)
+    Kp, Kd = np.meshgrid(Kp_phi1_range, Kd_phi1_range, indexing="ij")
+    K = np.stack([Kp, np.zeros_like(Kp), Kd, np.zeros_like(Kp)], axis=-1)
+    return spectral_abscissa(A, B, K, delay, resolution)
+
+def stability_chart(sys_consts, K, delay, resolution=20):
+    """
+    Computes the stability chart of a full state feedback ddq = -K x over any grid of the
+    four gains, e.g. a 4-dimensional meshgrid or a plane through it.
+
+    Args:
+        sys_consts (list): Constants of the double pendulum.
+        K (np.ndarray): Gains (K_1, K_2, K_3, K_4) of shape (..., 4).
+        delay (float): Control loop delay in seconds.
+        resolution (int): Number of semi-discretization steps per delay (default: 20).
+
+    Returns:
+        np.ndarray: Spectral abscissa of shape (...).
+    """
+    A, B = linearized_sys_matrices(sys_consts)
+    return spectral_abscissa(A, B, K, delay, resolution)
+
+def stability_boundary(x_range, y_range, sigma):
+    """
+    Locates the stability boundary, the zero level of the spectral abscissa, on a 2D chart
+    by linear interpolation between neighbouring grid points of different sign.
+
+    Args:
+        x_range (np.ndarray): Values of the first axis.
+        y_range (np.ndarray): Values of the second axis.
+        sigma (np.ndarray): Spectral abscissa of shape (len(x_range), len(y_range)).
+
+    Returns:
+        np.ndarray: Boundary points of shape (N, 2).
+    """
+    x = np.asarray(x_range, dtype=float)
+    y = np.asarray(y_range, dtype=float)
+    points = []
+
+    # Along the first axis
+    s0, s1 = sigma[:-1, :], sigma[1:, :]
+    i, j = np.nonzero(np.sign(s0) != np.sign(s1))
+    t = s0[i, j] / (s0[i, j] - s1[i, j])
+    points.append(np.column_stack([x[i] + t * (x[i + 1] - x[i]), y[j]]))
+
+    # Along the second axis
+    s0, s1 = sigma[:, :-1], sigma[:, 1:]
+    i, j = np.nonzero(np.sign(s0) != np.sign(s1))
+    t = s0[i, j] / (s0[i, j] - s1[i, j])
+    points.append(np.column_stack([x[i], y[j] + t * (y[j + 1] - y[j])]))
+
+    return np.vstack(points)
+
+def plot_stability_chart(Kp_phi1_range, Kd_phi1_range, sigma, ax=None):
+    """
+    Plots the spectral abscissa of a PD stability chart with its stability boundary.
+
+    Args:
+        Kp_phi1_range (np.ndarray): Values of K_p.
+        Kd_phi1_range (np.ndarray): Values of K_d.
+        sigma (np.ndarray): Spectral abscissa from pd_stability_chart().
+        ax (matplotlib.axes.Axes, optional): Axes to draw into; a new figure is created and shown if None.
+
+    Returns:
+        matplotlib.axes.Axes: The axes.
+    """
+    show = ax is None
+    if show:
+        _, ax = plt.subplots(figsize=(8, 6))
+
+    limit = np.max(np.abs(sigma))
+    mesh = ax.pcolormesh(Kp_phi1_range, Kd_phi1_range, sigma.T, cmap='RdYlGn_r', vmin=-limit, vmax=limit, shading='auto')
+    plt.colorbar(mesh, ax=ax, label=r'spectral abscissa [1/s]')
+    ax.contour(Kp_phi1_range, Kd_phi1_range, sigma.T, levels=[0], colors='black', linewidths=2)
+
+    ax.set_xlabel(r'$p$ (P-axis)')
+    ax.set_ylabel(r'$d$ (D-axis)')
+    ax.set_title('Stability chart')
+    ax.grid(True)
+    if show:
+        plt.show()
+    return ax
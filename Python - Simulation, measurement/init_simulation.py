@@ -2,9 +2,12 @@ from libs.varstructs import SIM_STATE
 from libs import set_displays
 from libs import pointer_enhance
 from libs import get_dpi_scaling
+from libs import span_tracer
 from threads_.diag import diag_t
 from threads_.numsim import numsim_t
+from threads_.numsim import numsim_proc_t
 from threads_.simgui import simgui_t
+from threads_.session import session_orchestrator
 import threads_.diag.diag_gui as diag_gui
 
 class simulationManager:
@@ -18,9 +21,10 @@ class simulationManager:
         SIM_STATE (SIM_STATE): Manages the state variables and configurations of the simulation.
         disp_settings: Display settings used for infinite space mode.
         simgui_thread (simgui_t): The graphical interface thread for the simulation.
-        numsim_thread (numsim_t): The numerical simulation thread.
+        numsim_thread (numsim_t or numsim_proc_t): The numerical simulation thread, or the thread mirroring the physics process.
         diag_gui (diag_gui_widget): The GUI for diagnostics.
-        diag_thread (diag_t): The diagnostic thread.
+        diag_thread (diag_t): The diagnostic thread, or None if the session is orchestrated by asyncio.
+        orchestrator (session_orchestrator): The asyncio session orchestrator, or None in the thread mode.
     """
 
     def __init__(self, config_dict_ref, diag_frame_ref) -> None:
@@ -39,6 +43,7 @@ class simulationManager:
 
         # Initialize the simulation state
         self.SIM_STATE = SIM_STATE.SIM_STATE(self.config_dict, DPI_SCALE)
+        span_tracer.configure(self.config_dict)
         self._init_threads()
 
     def _init_threads(self):
@@ -61,18 +66,34 @@ class simulationManager:
 
         # Initialize GUI, numerical simulation, and diagnostic threads
         self.simgui_thread = simgui_t.simgui_t(self.config_dict, self.SIM_STATE) 
-        self.numsim_thread = numsim_t.numsim_t(self.config_dict, self.SIM_STATE)
+        if self.config_dict["simulation_config"].get("numsim_execution_mode", "thread") == "process":
+            self.numsim_thread = numsim_proc_t.numsim_proc_t(self.config_dict, self.SIM_STATE)
+        else:
+            self.numsim_thread = numsim_t.numsim_t(self.config_dict, self.SIM_STATE)
         self.diag_gui = diag_gui.diag_gui_widget(self.diag_frame_ref, self.SIM_STATE)
-        self.diag_thread = diag_t.diag_t(self.config_dict, self.SIM_STATE, self.diag_gui)
+
+        # The asyncio orchestrator runs the numsim ticks and the diag refresh as tasks instead of threads
+        self.diag_thread = None
+        self.orchestrator = None
+        if self.config_dict["simulation_config"].get("orchestration_mode", "threads") == "asyncio":
+            self.orchestrator = session_orchestrator.session_orchestrator(
+                self.config_dict, self.SIM_STATE, self.simgui_thread, self.numsim_thread, self.diag_gui)
+        else:
+            self.diag_thread = diag_t.diag_t(self.config_dict, self.SIM_STATE, self.diag_gui)
         
     def start_threads(self):
         """
         Starts the threads for GUI, numerical simulation, and diagnostics.
         Sets the initial run status and ensures proper thread startup.
         """
+        self.SIM_STATE.gc_policy.freeze_startup()
         self.SIM_STATE.set_run_status(1)
         self.simgui_thread.set_stop_callback_function(self.after_threads_stops, self)
         
+        if self.orchestrator is not None:
+            self.orchestrator.start()
+            return
+
         # Start the simulation GUI, numerical simulation, and diagnostic threads
         self.simgui_thread.start()
         self.numsim_thread.start()
@@ -81,8 +102,12 @@ class simulationManager:
     def after_threads_stops(self):
         """
         Callback function executed after the simulation threads stop.
-        Restores display settings and pointer precision to their original state.
+        Restores display settings and pointer precision to their original state,
+        and saves the trace if tracing is still on.
         """
+        if span_tracer.is_enabled():
+            span_tracer.set_enabled(False)
+            self.SIM_STATE.data_saver_obj.save_trace()
         set_displays.restore_og_display_settings(self.disp_settings)
         pointer_enhance.set_enhance_pointer_precision(True)
         pointer_enhance.is_enhance_pointer_precision_enabled()
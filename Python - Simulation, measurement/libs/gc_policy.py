@@ -0,0 +1,166 @@
+import gc
+import time
+from libs.varstructs import sim_events
+
+# Policies of the automatic collection during a round
+GC_POLICY_OFF = "off"           # CPython default behaviour
+GC_POLICY_RAISE = "raise"       # Raise the generation 0 threshold while a round runs
+GC_POLICY_DISABLE = "disable"   # No automatic collection while a round runs
+
+class gc_policy:
+    """
+    Garbage collector control around the simulation rounds.
+
+    The histories of a round are a large number of small, long-lived objects, and every
+    generational collection of CPython traverses them, which shows up as pause spikes in
+    the tick timing. With the policy active:
+
+    - freeze_startup() collects once and moves the long-lived startup objects into the
+      permanent generation (gc.freeze), so no later collection traverses them
+    - at the start of a round the survivors so far are frozen as well and the automatic
+      collection is restricted (a raised generation 0 threshold, or disabled)
+    - at the end of a round the automatic collection is restored and a full collection
+      runs in static-run time, before the next round can start
+
+    Every collection during a round and the collection at its end are timed through
+    gc.callbacks; the per-round statistics are kept in run_conditions.gc_stats and saved
+    with the round.
+
+    Attributes:
+        policy (str): GC_POLICY_OFF, GC_POLICY_RAISE or GC_POLICY_DISABLE.
+        round_threshold (int): Generation 0 threshold during a round with GC_POLICY_RAISE.
+        stats (dict): Statistics of the running round, or None between rounds.
+    """
+
+    def __init__(self, config_dict, SIM_STATE_ref) -> None:
+        """
+        Initializes the policy and follows the run status of the simulation state.
+
+        Args:
+            config_dict (dict): The simulation configuration dictionary.
+            SIM_STATE_ref (SIM_STATE): The simulation state whose rounds are followed.
+        """
+        sim_config = config_dict["simulation_config"]
+        self.policy = sim_config.get("gc_policy", GC_POLICY_RAISE)
+        self.round_threshold = int(sim_config.get("gc_round_threshold", 100000))
+        self.SIM_STATE = SIM_STATE_ref
+        self.stats = None
+
+        self._saved_thresholds = gc.get_threshold()
+        self._saved_enabled = gc.isenabled()
+        self._pause_start = None
+        self.subscription = None
+        if self.enabled():
+            gc.callbacks.append(self._on_gc)
+            self.subscription = self.SIM_STATE.events.subscribe(
+                (sim_events.EVT_RUN_STATUS,), sim_events.POLICY_IMMEDIATE, self._on_run_status)
+
+    def enabled(self):
+        """
+        Returns:
+            bool: True if the collector is controlled.
+        """
+        return self.policy in (GC_POLICY_RAISE, GC_POLICY_DISABLE)
+
+    def freeze_startup(self):
+        """
+        Collects once and freezes the objects that survived the start of the simulation.
+        """
+        if not self.enabled():
+            return
+        gc.collect()
+        gc.freeze()
+        print(f"gc_policy: {gc.get_freeze_count()} startup objects frozen.")
+
+    def _on_run_status(self, event_type, payload):
+        """
+        Restricts the collector during a round and collects at its end.
+        """
+        prev_state, new_state = payload
+        if new_state == 2 and prev_state != 2:
+            self._start_round()
+        elif prev_state == 2 and new_state != 2:
+            self._end_round()
+        if new_state == 0:
+            self._restore()
+            gc.unfreeze()
+            self.detach()
+
+    def _start_round(self):
+        """
+        Freezes the objects alive at the start of the round and restricts the automatic collection.
+        """
+        gc.freeze()
+        self.stats = {
+            "policy": self.policy,
+            "collections": 0,
+            "gen0": 0,
+            "gen1": 0,
+            "gen2": 0,
+            "collected": 0,
+            "total_pause_s": 0.0,
+            "max_pause_s": 0.0,
+            "round_end_collect_s": 0.0
+        }
+        self.SIM_STATE.set_data_by_key("run_conditions.gc_stats", self.stats)
+
+        if self.policy == GC_POLICY_DISABLE:
+            gc.disable()
+        else:
+            gc.set_threshold(self.round_threshold, *self._saved_thresholds[1:])
+
+    def _end_round(self):
+        """
+        Restores the automatic collection and collects the garbage of the round. Called
+        before the round is saved, so the collection time is saved with it.
+        """
+        stats = self.stats
+        self.stats = None
+        self._restore()
+
+        t_start = time.perf_counter()
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+        if stats is not None:
+            stats["round_end_collect_s"] = time.perf_counter() - t_start
+            print(f"gc: collections: {stats['collections']} (gen0/1/2: {stats['gen0']}/{stats['gen1']}/{stats['gen2']}), "
+                  f"total pause: {stats['total_pause_s'] * 1000:.3f} ms, max pause: {stats['max_pause_s'] * 1000:.3f} ms, "
+                  f"round end collection: {stats['round_end_collect_s'] * 1000:.3f} ms")
+
+    def _on_gc(self, phase, info):
+        """
+        gc.callbacks hook: times the collections of the running round.
+        """
+        if phase == "start":
+            self._pause_start = time.perf_counter()
+            return
+        stats = self.stats
+        if stats is None or self._pause_start is None:
+            return
+        pause = time.perf_counter() - self._pause_start
+        self._pause_start = None
+        stats["collections"] += 1
+        stats[f"gen{info['generation']}"] += 1
+        stats["collected"] += info["collected"]
+        stats["total_pause_s"] += pause
+        if pause > stats["max_pause_s"]:
+            stats["max_pause_s"] = pause
+
+    def _restore(self):
+        """
+        Restores the automatic collection settings of the interpreter.
+        """
+        gc.set_threshold(*self._saved_thresholds)
+        if self._saved_enabled:
+            gc.enable()
+
+    def detach(self):
+        """
+        Stops following the simulation state, leaving the collector settings as they are.
+        """
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self.subscription is not None:
+            self.SIM_STATE.events.unsubscribe(self.subscription)
+            self.subscription = None
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import deque
+from libs.varstructs import sim_events
+
+# Shedding levels, in the order the work is shed. Physics and input sampling are never shed.
+LEVEL_NONE = 0
+LEVEL_DIAG_PLOTS = 1      # The diag plots are not refreshed
+LEVEL_OVERLAY_TEXT = 2    # The info overlay text of the simulation window is not drawn
+LEVEL_RENDER_RATE = 3     # The simulation window renders at half the frame rate
+LEVEL_NAMES = ("none", "diag plots", "overlay text", "render rate")
+
+class overload_controller:
+    """
+    Central load shedding when the pipeline falls behind real time.
+
+    The owners of a deadline (the physics ticks, the render frames) report every deadline
+    with report(). When more than overload_miss_ratio of the deadlines reported within
+    overload_window_s were missed, the shedding level goes up by one, and after
+    overload_recover_s without a missed deadline it goes down by one. Each level change
+    waits for a full window (or recovery period) at the new level first, so the level does
+    not run away on a single burst.
+
+    The consumers of the level shed their work with sheds(): the diag plots first, then
+    the overlay text, then the render frame rate. The level changes of a round are logged
+    in run_conditions.overload_log as [time since the round start in s, level] and saved
+    with the round.
+
+    Attributes:
+        enabled (bool): False to never shed.
+        window_s (float): Window of the miss ratio in seconds.
+        miss_ratio (float): Ratio of missed deadlines that raises the level.
+        recover_s (float): Time without a missed deadline that lowers the level.
+        level (int): Current shedding level.
+    """
+
+    def __init__(self, config_dict, SIM_STATE_ref) -> None:
+        """
+        Initializes the controller at LEVEL_NONE.
+
+        Args:
+            config_dict (dict): The simulation configuration dictionary.
+            SIM_STATE_ref (SIM_STATE): The simulation state the log is kept in.
+        """
+        sim_config = config_dict["simulation_config"]
+        self.enabled = sim_config.get("overload_control", True)
+        self.window_s = sim_config.get("overload_window_s", 1.0)
+        self.miss_ratio = sim_config.get("overload_miss_ratio", 0.1)
+        self.recover_s = sim_config.get("overload_recover_s", 3.0)
+        self.SIM_STATE = SIM_STATE_ref
+        self.level = LEVEL_NONE
+
+        self._lock = threading.Lock()
+        self._reports = deque()
+        self._misses = 0
+        self._last_miss = 0.0
+        self._last_change = time.perf_counter()
+        self._round_start = None
+        self.subscription = self.SIM_STATE.events.subscribe(
+            (sim_events.EVT_RUN_STATUS,), sim_events.POLICY_IMMEDIATE, self._on_run_status)
+
+    def sheds(self, level):
+        """
+        Args:
+            level (int): One of the LEVEL_ constants.
+
+        Returns:
+            bool: True if the work of the given level is shed.
+        """
+        return self.level >= level
+
+    def report(self, missed):
+        """
+        Reports a deadline and adjusts the shedding level.
+
+        Args:
+            missed (bool): True if the deadline was missed.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            self._reports.append((now, missed))
+            if missed:
+                self._misses += 1
+                self._last_miss = now
+            while self._reports and self._reports[0][0] < now - self.window_s:
+                if self._reports.popleft()[1]:
+                    self._misses -= 1
+
+            since_change = now - self._last_change
+            if (self.level < LEVEL_RENDER_RATE and since_change >= self.window_s
+                    and self._misses > self.miss_ratio * len(self._reports)):
+                self._set_level(self.level + 1, now)
+            elif (self.level > LEVEL_NONE and since_change >= self.recover_s
+                    and now - self._last_miss >= self.recover_s):
+                self._set_level(self.level - 1, now)
+
+    def _set_level(self, level, now):
+        """
+        Changes the shedding level and logs the change. Called with the lock held.
+        """
+        self.level = level
+        self._last_change = now
+        print(f"overload: shedding level {level} ({LEVEL_NAMES[level]})")
+        if self._round_start is not None:
+            self.SIM_STATE.SIM_STATE_VAR["run_conditions"]["overload_log"].append([now - self._round_start, level])
+
+    def _on_run_status(self, event_type, payload):
+        """
+        Starts the log of a new round.
+        """
+        prev_state, new_state = payload
+        with self._lock:
+            if new_state == 2 and prev_state != 2:
+                self._round_start = time.perf_counter()
+                self.SIM_STATE.set_data_by_key("run_conditions.overload_log", [[0.0, self.level]])
+            elif prev_state == 2:
+                self._round_start = None
+        if new_state == 0:
+            self.detach()
+
+    def detach(self):
+        """
+        Stops following the run status of the simulation state.
+        """
+        if self.subscription is not None:
+            self.SIM_STATE.events.unsubscribe(self.subscription)
+            self.subscription = None
@@ -0,0 +1,183 @@
+import os
+import ctypes
+import ctypes.util
+import threading
+
+# Profiles
+PROFILE_OFF = "off"
+PROFILE_REALTIME = "realtime"
+
+# Roles of the threads; physics and input run on the dedicated core, the others on the rest
+ROLE_PHYSICS = "physics"
+ROLE_INPUT = "input"
+ROLE_RENDER = "render"
+ROLE_DIAG = "diag"
+ROLE_IO = "io"
+REALTIME_ROLES = (ROLE_PHYSICS, ROLE_INPUT)
+
+# Bits of the mask returned by rt_profile.apply()
+APPLIED_AFFINITY = 1
+APPLIED_SCHEDULER = 2
+APPLIED_MEMLOCK = 4
+
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+
+class rt_profile:
+    """
+    Optional real-time profile of the simulation threads (Linux).
+
+    With simulation_config.rt_profile set to "realtime", the physics thread or process and
+    the cursor sampler are pinned to a dedicated core and request the SCHED_FIFO or SCHED_RR
+    policy, the memory of the physics process is optionally locked with mlockall, and the
+    render, diag and io threads are pinned to the remaining cores. Every step that is not
+    supported on the platform or not permitted (no CAP_SYS_NICE, RLIMIT_RTPRIO or
+    RLIMIT_MEMLOCK) is skipped, and the thread runs on with the default scheduling.
+
+    Each thread applies the profile to itself, as CPU affinity and scheduling policy are per
+    thread on Linux. What was applied is kept in `record`, which SIM_STATE stores under
+    run_conditions.rt_profile, so it is saved with every round.
+
+    Attributes:
+        profile (str): PROFILE_OFF or PROFILE_REALTIME.
+        policy (str): "fifo" or "rr".
+        priority (int): Real-time priority of the physics and input threads.
+        lock_memory (bool): True to mlockall the physics process.
+        physics_cpus (set): CPUs of the physics and input threads.
+        other_cpus (set): CPUs of the other threads.
+        record (dict): Description of the profile and of what was applied per role.
+    """
+
+    def __init__(self, config_dict) -> None:
+        """
+        Initializes the profile from the simulation configuration. Nothing is applied yet.
+
+        Args:
+            config_dict (dict): The simulation configuration dictionary.
+        """
+        sim_config = config_dict["simulation_config"]
+        self.profile = sim_config.get("rt_profile", PROFILE_OFF)
+        self.policy = str(sim_config.get("rt_policy", "fifo")).lower()
+        self.priority = int(sim_config.get("rt_priority", 50))
+        self.lock_memory = bool(sim_config.get("rt_lock_memory", False))
+        self._lock = threading.Lock()
+
+        self.physics_cpus = set()
+        self.other_cpus = set()
+        if self.enabled() and hasattr(os, "sched_getaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+            if len(cpus) > 1:
+                physics_cpu = int(sim_config.get("rt_physics_cpu", -1))
+                physics_cpu = cpus[physics_cpu] if physics_cpu < 0 else physics_cpu
+                if physics_cpu in cpus:
+                    self.physics_cpus = {physics_cpu}
+                    self.other_cpus = set(cpus) - self.physics_cpus
+                else:
+                    print(f"rt_profile: CPU {physics_cpu} is not available, CPU affinity is not set.")
+
+        self.record = {"profile": self.profile}
+        if self.enabled():
+            self.record["physics_cpus"] = _cpu_list_str(self.physics_cpus)
+            self.record["other_cpus"] = _cpu_list_str(self.other_cpus)
+            self.record["policy"] = f"{self.policy} {self.priority}"
+
+    def enabled(self):
+        """
+        Returns:
+            bool: True if the real-time profile is active.
+        """
+        return self.profile == PROFILE_REALTIME
+
+    def apply(self, role):
+        """
+        Applies the profile of a role to the calling thread and records the result.
+
+        Args:
+            role (str): One of the ROLE_ constants.
+
+        Returns:
+            int: Mask of the APPLIED_ bits that took effect.
+        """
+        if not self.enabled():
+            return 0
+        applied = 0
+        realtime = role in REALTIME_ROLES
+
+        cpus = self.physics_cpus if realtime else self.other_cpus
+        if cpus and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, cpus)
+                applied |= APPLIED_AFFINITY
+            except OSError as e:
+                print(f"rt_profile: CPU affinity of the {role} thread not set: {e}")
+
+        if realtime:
+            if self._set_scheduler(role):
+                applied |= APPLIED_SCHEDULER
+            if role == ROLE_PHYSICS and self.lock_memory and _mlockall():
+                applied |= APPLIED_MEMLOCK
+
+        self.record_role(role, applied)
+        return applied
+
+    def _set_scheduler(self, role):
+        """
+        Requests the real-time scheduling policy for the calling thread.
+
+        Returns:
+            bool: True if the policy was set.
+        """
+        policy = getattr(os, "SCHED_RR" if self.policy == "rr" else "SCHED_FIFO", None)
+        if policy is None or not hasattr(os, "sched_setscheduler"):
+            return False
+        try:
+            priority = min(max(self.priority, os.sched_get_priority_min(policy)), os.sched_get_priority_max(policy))
+            os.sched_setscheduler(0, policy, os.sched_param(priority))
+            return True
+        except OSError as e:
+            print(f"rt_profile: real-time scheduling of the {role} thread not permitted, using the default policy: {e}")
+            return False
+
+    def record_role(self, role, applied):
+        """
+        Records what was applied for a role, e.g. reported by the physics process.
+
+        Args:
+            role (str): One of the ROLE_ constants.
+            applied (int): Mask of the APPLIED_ bits that took effect.
+        """
+        parts = []
+        if applied & APPLIED_AFFINITY:
+            parts.append("affinity")
+        if applied & APPLIED_SCHEDULER:
+            parts.append(self.policy)
+        if applied & APPLIED_MEMLOCK:
+            parts.append("mlockall")
+        with self._lock:
+            self.record[role] = " ".join(parts) if parts else "default"
+
+def _cpu_list_str(cpus):
+    """
+    Returns:
+        str: The CPUs as a space separated list, or "-" if there are none.
+    """
+    return " ".join(str(cpu) for cpu in sorted(cpus)) if cpus else "-"
+
+def _mlockall():
+    """
+    Locks the current and future memory of the process.
+
+    Returns:
+        bool: True if the memory was locked.
+    """
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        return False
+    try:
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if libc.mlockall(_MCL_CURRENT | _MCL_FUTURE) == 0:
+            return True
+        print(f"rt_profile: mlockall not permitted: {os.strerror(ctypes.get_errno())}")
+    except (OSError, AttributeError) as e:
+        print(f"rt_profile: mlockall not available: {e}")
+    return False
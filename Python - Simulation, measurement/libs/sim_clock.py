@@ -0,0 +1,38 @@
+"""
+Clock of the timestamps of the physics steps and the controller.
+
+now() returns time.time() unless a virtual time is set. The replay of recorded rounds sets
+the recorded step times with set_virtual(), so the physics integrates the recorded time
+steps while it runs as fast as the CPU allows. The virtual time is process-wide: it is
+only set by a replay, never while the simulation threads run.
+"""
+
+import time
+
+_virtual_time = None
+
+def now():
+    """
+    Returns:
+        float: The virtual time if one is set, time.time() otherwise.
+    """
+    if _virtual_time is None:
+        return time.time()
+    return _virtual_time
+
+def set_virtual(timestamp):
+    """
+    Sets the virtual time.
+
+    Args:
+        timestamp (float or None): The time now() returns, or None for the wall clock.
+    """
+    global _virtual_time
+    _virtual_time = timestamp
+
+def is_virtual():
+    """
+    Returns:
+        bool: True if a virtual time is set.
+    """
+    return _virtual_time is not None
@@ -0,0 +1,182 @@
+"""
+Low-overhead span tracer of the simulation threads.
+
+Sections are wrapped in `with span_tracer.span("name"):`. While tracing is off, span()
+returns a shared no-op context, so an instrumented section costs one flag check. While it
+is on, the begin and end timestamps are written into a preallocated ring of the calling
+thread, without locks or allocations beyond the span object. export_chrome_trace() writes
+the rings as Chrome trace-event JSON, which opens in chrome://tracing or ui.perfetto.dev
+with one track per thread.
+"""
+
+import json
+import os
+import threading
+import time
+
+_enabled = False
+_capacity = 65536
+_rings = []
+_rings_lock = threading.Lock()
+_local = threading.local()
+
+class _thread_ring:
+    """
+    Ring of the spans of one thread. Only the owning thread writes to it.
+
+    Attributes:
+        tid (int): Identifier of the thread.
+        thread_name (str): Name of the thread.
+        thread (threading.Thread): The thread.
+        names (list): Names of the spans.
+        begins (list): Begin timestamps in ns.
+        ends (list): End timestamps in ns.
+        written (int): Number of spans written so far.
+    """
+
+    def __init__(self, capacity) -> None:
+        thread = threading.current_thread()
+        self.thread = thread
+        self.tid = thread.ident
+        self.thread_name = thread.name
+        self.capacity = capacity
+        self.names = [None] * capacity
+        self.begins = [0] * capacity
+        self.ends = [0] * capacity
+        self.written = 0
+
+    def record(self, name, begin_ns, end_ns):
+        i = self.written % self.capacity
+        self.names[i] = name
+        self.begins[i] = begin_ns
+        self.ends[i] = end_ns
+        self.written += 1
+
+    def spans(self):
+        """
+        Returns:
+            list: (name, begin_ns, end_ns) of the spans in the ring, oldest first.
+        """
+        written = self.written
+        first = max(0, written - self.capacity)
+        return [(self.names[i % self.capacity], self.begins[i % self.capacity], self.ends[i % self.capacity])
+                for i in range(first, written)]
+
+class _span:
+    """
+    Context of a traced section.
+    """
+    __slots__ = ("name", "begin_ns")
+
+    def __init__(self, name) -> None:
+        self.name = name
+
+    def __enter__(self):
+        self.begin_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        ring = getattr(_local, "ring", None)
+        if ring is None:
+            ring = _thread_ring(_capacity)
+            _local.ring = ring
+            with _rings_lock:
+                _rings.append(ring)
+        ring.record(self.name, self.begin_ns, end_ns)
+        return False
+
+class _null_span:
+    """
+    No-op context returned while tracing is off.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _null_span()
+
+def span(name):
+    """
+    Returns the context of a traced section.
+
+    Args:
+        name (str): Name of the section in the trace.
+
+    Returns:
+        context manager: Records the section while tracing is on, does nothing otherwise.
+    """
+    if _enabled:
+        return _span(name)
+    return _NULL_SPAN
+
+def configure(config_dict):
+    """
+    Sets the ring capacity and the initial state of the tracer from the configuration.
+
+    Args:
+        config_dict (dict): The simulation configuration dictionary.
+    """
+    global _capacity
+    sim_config = config_dict["simulation_config"]
+    _capacity = int(sim_config.get("trace_capacity", 65536))
+    set_enabled(sim_config.get("trace_enabled", False))
+
+def set_enabled(enabled):
+    """
+    Switches tracing on or off. Switching it on starts a new trace.
+
+    Args:
+        enabled (bool): True to record spans.
+    """
+    global _enabled
+    if enabled and not _enabled:
+        clear()
+    _enabled = bool(enabled)
+
+def is_enabled():
+    """
+    Returns:
+        bool: True if spans are recorded.
+    """
+    return _enabled
+
+def clear():
+    """
+    Discards the recorded spans. Rings of running threads are reset, not replaced, and
+    the rings of finished threads are dropped.
+    """
+    with _rings_lock:
+        _rings[:] = [ring for ring in _rings if ring.thread.is_alive()]
+        for ring in _rings:
+            ring.written = 0
+
+def export_chrome_trace(file_path):
+    """
+    Writes the recorded spans as Chrome trace-event JSON.
+
+    Args:
+        file_path (str): Path of the JSON file.
+
+    Returns:
+        int: Number of exported spans.
+    """
+    pid = os.getpid()
+    events = []
+    with _rings_lock:
+        rings = list(_rings)
+    for ring in rings:
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": ring.tid, "args": {"name": ring.thread_name}})
+        for name, begin_ns, end_ns in ring.spans():
+            events.append({"name": name, "ph": "X", "pid": pid, "tid": ring.tid,
+                           "ts": begin_ns / 1000, "dur": (end_ns - begin_ns) / 1000})
+
+    with open(file_path, "w") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+    n_spans = len(events) - len(rings)
+    print(f"Trace with {n_spans} spans written to {file_path}")
+    return n_spans
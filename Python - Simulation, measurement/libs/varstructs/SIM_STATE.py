@@ -2,6 +2,25 @@ import time
 import numpy as np
 from threads_.numsim.libs import output_data_saver as ods
 from threads_.numsim.libs.state_space import state_space
+from threads_.numsim.libs.state_space_fs.design_cache import design_cache
+from threads_.numsim.libs.design_worker import design_worker
+from threads_.numsim.libs.gain_schedule import gain_schedule, planned_rod_lengths
+from threads_.numsim.libs.input_backends.input_backend import create_input_backend
+from threads_.numsim.libs import derivative_estimators
+from libs.varstructs.buffer_pool import buffer_pool, history_buffer
+from libs.varstructs.snapshot_ring import snapshot_ring
+from libs.varstructs.gain_set import gain_set
+from libs.varstructs import sim_events
+from libs.rt_profile import rt_profile
+from libs.gc_policy import gc_policy
+from libs.overload_controller import overload_controller
+from libs import span_tracer
+from libs import sim_clock
+
+# Per-round history stores that are leased from the buffer pool
+MOUSE_INPUT_HISTORY_KEYS = ["x", "dx", "ddx", "ddx_m", "h_s", "q_array_list"]
+STATE_VARS_HISTORY_KEYS = ["sys_state", "phi_np_array_list", "sys_reports"]
+PLOTABLE_DATASET_KEYS = ["x", "dx", "ddx", "x_m", "dx_m", "ddx_m", "phi_1", "phi_2", "dphi_1", "dphi_2", "ddphi_1", "ddphi_2", "F"]
 
 class SIM_STATE:
     """
@@ -14,21 +33,50 @@ class SIM_STATE:
         config_dict (dict): Configuration dictionary for the simulation.
         data_saver_obj (output_data_saver): Object for saving simulation output data.
         pointer_enhance_status (bool): Status flag for pointer enhancement.
+        buffer_pool (buffer_pool): Pooled allocator the per-round history stores lease from.
+        events (event_bus): Change notifications raised by the writers of the simulation state.
+        snapshot_ring (snapshot_ring): Ring of periodic state snapshots used to restart a round from a prior state.
+        save_rounds (bool): Whether finished rounds are saved. Disabled for the replica run by a physics process.
+        round_save_handler (callable): If set, finished rounds are frozen and handed to it instead of being written
+            by the thread that ended the round.
+        data_epoch (int): Counter of the resets of the per-round data (round ends and snapshot restores).
+        rt_profile (rt_profile): Real-time scheduling profile of the simulation threads.
+        gc_policy (gc_policy): Garbage collector control around the rounds.
+        overload (overload_controller): Load shedding level of the GUI work.
+        input_backend (input_backend): Source of the cursor input, or None for a replay state.
+        derivative_estimator (derivative_estimator): Streaming estimator of the cursor derivatives, or None for
+            the window fit of the sampler.
+        state_space_ref (state_space): State space of the current rod lengths.
+        design_worker (design_worker): Background worker of the full control design reports.
+        gain_schedule (gain_schedule): Gains of the rod lengths of the rod length schedule, designed ahead of the rounds.
+        gains (gain_set): Gains the PD control uses; replaced as a whole when new gains are published.
         phi_var_0 (numpy.array): Initial state of the pendulum variables.
         SIM_STATE_VAR (dict): Dictionary containing all simulation state variables and configurations.
     """
 
-    def __init__(self, config_dict, DPI_SCALEING) -> None:
+    def __init__(self, config_dict, DPI_SCALEING, replay=False) -> None:
         """
         Initializes the SIM_STATE class with the given configuration dictionary.
 
         Args:
             config_dict (dict): Configuration dictionary containing simulation parameters.
             DPI_SCALEING (float): DPI scaling factor for screen dimensions.
+            replay (bool): If True, the state only replays recorded rounds: it has no input backend,
+                saves no rounds and designs no gain schedule ahead (default: False).
         """
         self.config_dict = config_dict
         self.data_saver_obj = ods.output_data_saver(self.config_dict)
         self.pointer_enhance_status = False
+        self.save_rounds = not replay
+        self.round_save_handler = None
+        self.data_epoch = 0
+        self.events = sim_events.event_bus()
+        self.rt_profile = rt_profile(config_dict)
+        self.gc_policy = gc_policy(config_dict, self)
+        self.overload = overload_controller(config_dict, self)
+        self.buffer_pool = buffer_pool(
+            config_dict["simulation_config"].get("history_buffer_min_capacity", 4096)
+        )
 
         # Initialize LQR control parameters
         LQR_Q = np.diag(config_dict["PD_control"]["LQR_Q"])
@@ -36,12 +84,33 @@ class SIM_STATE:
         if pd_ft > 0:
             pd_ft -= 1
 
-        self.state_space_ref = state_space(
+        state_space_args = (
             config_dict["geometry_config"]["double_pendulum"], 
             LQR_Q, 
             config_dict["PD_control"]["LQR_R"],
             config_dict["simulation_config"]["sample_rate_s"],
-            config_dict["PD_control"]["time_delay_s"]
+            config_dict["PD_control"]["time_delay_s"],
+            design_cache(
+                config_dict["PD_control"].get("design_cache_size", 32),
+                config_dict["PD_control"].get("design_cache_dir", "")
+            )
+        )
+        self.state_space_ref = state_space(*state_space_args)
+        # The reports run on their own state space instance, sharing the design cache
+        self.design_worker = design_worker(state_space(*state_space_args))
+        self.gain_schedule = gain_schedule(
+            state_space_args,
+            config_dict["geometry_config"]["rod_a_m/l_ratio_kg/m"],
+            config_dict["geometry_config"]["rod_b_m/l_ratio_kg/m"],
+            config_dict["simulation_config"]["gravitational_force_m/s^2"],
+            config_dict["PD_control"].get("gain_schedule_workers", 4)
+        )
+        self.gains = gain_set(
+            0,
+            config_dict["PD_control"]["optimal_control_calc_method"],
+            self._get_custom_PD_K_vector(),
+            None,
+            None
         )
 
         idofs = self.config_dict["simulation_config"]["model_initial_dof_values_rad"]
@@ -86,7 +155,7 @@ class SIM_STATE:
                 "PD_K_4": config_dict["PD_control"]["k4_-"],
                 "PD_PHI_1_D": config_dict["PD_control"]["desired_phi_rad"],
                 "PD_PHI_2_D": config_dict["PD_control"]["desired_phi_rad"],
-                "PD_control_stack": [],
+                "PD_control_stack": self.buffer_pool.lease("PD_control.PD_control_stack"),
                 "LQR_Q": LQR_Q,
                 "LQR_R": config_dict["PD_control"]["LQR_R"]
             },
@@ -95,6 +164,14 @@ class SIM_STATE:
                 "fps": 0,
                 "FRAME_TRIM": 0,
                 "TIME_DELAY_S": config_dict["simulation_config"]["time_delay_s"],
+                "scheduler_stats": {},
+                "rt_profile": self.rt_profile.record,
+                "gc_stats": {},
+                "overload_log": [],
+                "input_estimator": {},
+                "input_clock": {},
+                "wrap_log": [],
+                "input_stats": {},
                 "simulation_timer": {
                     "start": None,
                     "end": None,
@@ -102,38 +179,9 @@ class SIM_STATE:
                     "dtime": 0
                 }
             },
-            "mouse_input": {
-                "x": [],
-                "dx": [],
-                "ddx": [],
-                "ddx_m": [],
-                "h_s": [],
-                "q_array_list": [],  # Contains arrays: [x_m, dx_m, ddx_m, timestamp]
-                "cursor_replace_flag": 0,  # 0 - no replace method, 1 - replace method start, 2 - replace method finished
-                "replace_counter": 0
-            },
-            "stateVars": {
-                "sys_state": [],  # System state variables to be filled by self.update_sys_variables
-                "phi_np_array_list": [
-                    [phi_var_0, np.array([[0], [0], [0], [0]]), None, .0, .0]
-                ],  # List of np arrays: [phi1, phi2, dphi1, dphi2]
-                "sys_reports": []
-            },
-            "plotable_datasets": {
-                "x": [],
-                "dx": [],
-                "ddx": [],
-                "x_m": [],
-                "dx_m": [],
-                "ddx_m": [],
-                "phi_1": [],
-                "phi_2": [],
-                "dphi_1": [],
-                "dphi_2": [],
-                "ddphi_1": [],
-                "ddphi_2": [],
-                "F": []
-            }
+            "mouse_input": self._lease_mouse_input(),
+            "stateVars": self._lease_state_vars(phi_var_0),
+            "plotable_datasets": self.buffer_pool.lease_dict("plotable_datasets", PLOTABLE_DATASET_KEYS)
         }
 
         self.update_sys_variables(
@@ -142,6 +190,48 @@ class SIM_STATE:
         )
         self.calculate_frame_trim()
 
+        # The rod lengths of the schedule are known, their gains are designed before the first round
+        if not config_dict["simulation_config"]["constant_rod_length"] and not replay:
+            self.gain_schedule.precompute(
+                str(self.SIM_STATE_VAR["PD_control"]["CONTROL_METHOD"]).lower(),
+                planned_rod_lengths(config_dict, config_dict["PD_control"].get("gain_schedule_size", 256))
+            )
+
+        # Periodic snapshots for restarting a failed round from a prior state
+        sim_config = config_dict["simulation_config"]
+        self.snapshot_period_s = sim_config.get("snapshot_period_s", 0.25)
+        self.snapshot_rewind_s = sim_config.get("snapshot_rewind_s", 3.0)
+        self.snapshot_ring = snapshot_ring(
+            np.ceil(sim_config.get("snapshot_history_s", 60.0) / self.snapshot_period_s),
+            max(self.get_frame_trim(), self.get_frame_trim(True)) + 2
+        )
+        self._last_snapshot_ts = 0.0
+        self._restored_snapshot = None
+        self.last_round_end_ts = None
+
+        # Source of the cursor input, selected by input_config.input_backend; a replay feeds the recorded input
+        self.input_backend = None
+        if not replay:
+            self.input_backend = create_input_backend(
+                config_dict["input_config"], self.SIM_STATE_VAR["GUI_conditions"]["SCREEN_WIDTH_PX"])
+            # Clock offset of the event timestamps, kept up to date by the backend
+            source_clock = self.input_backend.source_clock
+            self.SIM_STATE_VAR["run_conditions"]["input_clock"] = source_clock.record if source_clock is not None else {"source": "poll"}
+
+        # Estimator of the cursor derivatives; characterized at the rate it is fed when a round is saved
+        input_config = config_dict["input_config"]
+        self.derivative_estimator = derivative_estimators.create_estimator(input_config)
+        sample_rate_hz = input_config.get("cursor_sample_rate_hz", 1000)
+        self._input_estimator_rate_hz = sample_rate_hz if sample_rate_hz > 0 else 1 / self.get_data_by_key("simulation_config.SAMPLERATE_S")
+
+    def close(self):
+        """
+        Detaches the garbage collector control and the load shedding from the run status. Called
+        when a state that never runs a session, e.g. a replay state, is no longer used.
+        """
+        self.gc_policy.detach()
+        self.overload.detach()
+
     def run_status(self):
         """
         Retrieves the current run status of the simulation.
@@ -174,6 +264,8 @@ class SIM_STATE:
         self.SIM_STATE_VAR["run_conditions"]["run_status"] = new_state
 
         print(f"prev_state: {prev_state},\t new_state: {new_state}")
+        if prev_state != new_state:
+            self.events.publish(sim_events.EVT_RUN_STATUS, (prev_state, new_state))
 
         if prev_state == 0:
             if new_state == 1:  # Start simulation with static run.
@@ -189,6 +281,14 @@ class SIM_STATE:
                 pass
             elif new_state == 2:  # Start numsim from static run (start balancing).
                 self.SIM_STATE_VAR["run_conditions"]["simulation_timer"]["start"] = time.time()
+                self.gain_schedule.wait()
+                self._start_snapshot_round()
+                # The cursor warps of the infinite space are logged per round
+                self.input_backend.accumulator.wrap_log = self.SIM_STATE_VAR["run_conditions"]["wrap_log"] = []
+                # Loss and latency of the input, for backends that keep statistics
+                self.input_backend.reset_stats()
+                stats = self.input_backend.stats
+                self.SIM_STATE_VAR["run_conditions"]["input_stats"] = stats if stats is not None else {}
             else:
                 # Same state, do nothing.
                 return
@@ -205,13 +305,20 @@ class SIM_STATE:
                 - plotable_datasets.*
                 """
                 self.SIM_STATE_VAR["run_conditions"]["simulation_timer"]["end"] = time.time()
+                self.last_round_end_ts = self.SIM_STATE_VAR["run_conditions"]["simulation_timer"]["end"]
                 self.SIM_STATE_VAR["run_conditions"]["simulation_timer"]["interrupted"] = user_interrupted
                 self.SIM_STATE_VAR["run_conditions"]["simulation_timer"]["dtime"] = (
                     self.SIM_STATE_VAR["run_conditions"]["simulation_timer"]["end"] - self.SIM_STATE_VAR["run_conditions"]["simulation_timer"]["start"]
                 )
 
-                # Save data
-                self.data_saver_obj.save_new_round(self.SIM_STATE_VAR)
+                # Save data, with the reports still computed in the background
+                self.design_worker.wait()
+                if self.save_rounds and self.round_save_handler is not None:
+                    self.round_save_handler(self.freeze_round_data())
+                elif self.save_rounds:
+                    self.describe_input_estimator()
+                    csv_file_path = self.data_saver_obj.save_new_round(self.SIM_STATE_VAR)
+                    self.events.publish(sim_events.EVT_ROUND_SAVED, csv_file_path)
 
                 # Reset data
                 self.reset_numsim_round_data()
@@ -233,24 +340,21 @@ class SIM_STATE:
         """
         idofs = self.config_dict["simulation_config"]["model_initial_dof_values_rad"]
         phi_var_0 = np.array([[idofs[0]], [idofs[1]], [0.0], [0.0]])
+        self.data_epoch += 1
 
-        self.SIM_STATE_VAR["mouse_input"] = {
-            "x": [],
-            "dx": [],
-            "ddx": [],
-            "ddx_m": [],
-            "h_s": [],
-            "q_array_list": [],  # np array containing [x_m, dx_m, ddx_m, timestamp]
-            "cursor_replace_flag": 0,  # 0 - no replace method, 1 - replace method start, 2 - replace method finished
-            "replace_counter": 0
-        }
-        self.SIM_STATE_VAR["stateVars"] = {
-            "sys_state": [],  # System constants to be filled by self.update_sys_variables
-            "phi_np_array_list": [
-                [phi_var_0, np.array([[0], [0], [0], [0]]), None, .0, .0]
-            ],  # List of phi angles and associated values
-            "sys_reports": []
-        }
+        # The background reports append to the round's stateVars.sys_reports
+        self.design_worker.wait()
+
+        # Hand the finished round's buffers back to the pool before leasing presized ones. Only
+        # buffers released by earlier resets are leased, the ones released here stay quarantined
+        self.buffer_pool.recycle()
+        self.buffer_pool.release_dict(self.SIM_STATE_VAR["mouse_input"])
+        self.buffer_pool.release_dict(self.SIM_STATE_VAR["stateVars"])
+        self.buffer_pool.release_dict(self.SIM_STATE_VAR["plotable_datasets"])
+        self.buffer_pool.release(self.SIM_STATE_VAR["PD_control"]["PD_control_stack"])
+
+        self.SIM_STATE_VAR["mouse_input"] = self._lease_mouse_input()
+        self.SIM_STATE_VAR["stateVars"] = self._lease_state_vars(phi_var_0)
         self.update_sys_variables(
             self.config_dict["geometry_config"]["rod_a_length_m"],
             self.config_dict["geometry_config"]["rod_b_length_m"]
@@ -263,26 +367,73 @@ class SIM_STATE:
             "dtime": 0
         }
 
-        self.SIM_STATE_VAR["PD_control"]["PD_control_stack"] = []
-
-        self.SIM_STATE_VAR["plotable_datasets"] = {
-            "x": [],
-            "dx": [],
-            "ddx": [],
-            "x_m": [],
-            "dx_m": [],
-            "ddx_m": [],
-            "phi_1": [],
-            "phi_2": [],
-            "dphi_1": [],
-            "dphi_2": [],
-            "ddphi_1": [],
-            "ddphi_2": [],
-            "F": []
-        }
+        self.SIM_STATE_VAR["PD_control"]["PD_control_stack"] = self.buffer_pool.lease("PD_control.PD_control_stack")
+
+        self.SIM_STATE_VAR["plotable_datasets"] = self.buffer_pool.lease_dict("plotable_datasets", PLOTABLE_DATASET_KEYS)
 
         self.calculate_frame_trim()
 
+    def freeze_round_data(self):
+        """
+        Copies SIM_STATE_VAR so that the round can be written after its buffers are released.
+        History buffers become plain lists, dictionaries and lists are copied one level deep.
+
+        Returns:
+            dict: A copy of SIM_STATE_VAR that later appends and resets do not affect.
+        """
+        def freeze(value):
+            if isinstance(value, dict):
+                return {key: freeze(item) for key, item in value.items()}
+            if isinstance(value, history_buffer):
+                return value.tolist()
+            if isinstance(value, list):
+                return list(value)
+            return value
+
+        self.describe_input_estimator()
+        return freeze(self.SIM_STATE_VAR)
+
+    def describe_input_estimator(self):
+        """
+        Characterizes the cursor derivative estimator into run_conditions.input_estimator the
+        first time a round is saved, so states that never save a round skip it.
+
+        Returns:
+            dict: The estimator description.
+        """
+        run_conditions = self.SIM_STATE_VAR["run_conditions"]
+        if not run_conditions["input_estimator"]:
+            run_conditions["input_estimator"] = derivative_estimators.describe(
+                self.config_dict["input_config"], self._input_estimator_rate_hz)
+        return run_conditions["input_estimator"]
+
+    def _lease_mouse_input(self):
+        """
+        Builds the mouse_input dictionary of a new round from pooled buffers.
+
+        Returns:
+            dict: The mouse_input dictionary.
+        """
+        mouse_input = self.buffer_pool.lease_dict("mouse_input", MOUSE_INPUT_HISTORY_KEYS)
+        # q_array_list contains arrays: [x_m, dx_m, ddx_m, timestamp]
+        mouse_input["x_offset_px"] = 0  # Added to the cursor position, set when a snapshot is restored
+        return mouse_input
+
+    def _lease_state_vars(self, phi_var_0):
+        """
+        Builds the stateVars dictionary of a new round from pooled buffers.
+
+        Args:
+            phi_var_0 (numpy.array): Initial state of the pendulum variables.
+
+        Returns:
+            dict: The stateVars dictionary. sys_state is filled by self.update_sys_variables.
+        """
+        state_vars = self.buffer_pool.lease_dict("stateVars", STATE_VARS_HISTORY_KEYS)
+        # List of np arrays: [phi1, phi2, dphi1, dphi2]
+        state_vars["phi_np_array_list"].append([phi_var_0, np.array([[0], [0], [0], [0]]), None, .0, .0])
+        return state_vars
+
     def get_all_items(self):
         """
         Retrieves all key-value pairs from the simulation state variable.
@@ -423,11 +574,16 @@ class SIM_STATE:
             plotable_datasets["ddphi_1"].append(value[1][2][0])
             plotable_datasets["ddphi_2"].append(value[1][3][0])
             plotable_datasets["F"].append(value[3])
+        self.events.publish(sim_events.EVT_NEW_STEP, len(self.SIM_STATE_VAR["stateVars"]["phi_np_array_list"]))
 
     def update_sys_variables(self, l1, l2=None):
         """
         Updates the system variables using the given lengths and configuration parameters.
 
+        Only the gain of the selected control method is designed before this returns. The
+        full design report is computed by the design worker and appended to
+        stateVars.sys_reports when it is done; rounds that are not saved skip it.
+
         Args:
             l1 (float): The length of rod A.
             l2 (float, optional): The length of rod B. Defaults to None.
@@ -436,11 +592,16 @@ class SIM_STATE:
         rho2 = self.config_dict["geometry_config"]["rod_b_m/l_ratio_kg/m"]
         g = self.config_dict["simulation_config"]["gravitational_force_m/s^2"]
 
-        self.state_space_ref.update_system_constants(rho1, rho2, l1, l2, g)
+        with span_tracer.span("update_system_constants"):
+            self.state_space_ref.update_system_constants(rho1, rho2, l1, l2, g)
         sys_consts = self.state_space_ref.get_system_constants()
-        self.SIM_STATE_VAR["stateVars"]["sys_reports"].append(self.state_space_ref.doReport())
-        timestamp = time.time()
+        with span_tracer.span("design_gain"):
+            self.update_control_K_vector()
+        if self.save_rounds:
+            self.design_worker.submit(self.SIM_STATE_VAR["stateVars"]["sys_reports"], rho1, rho2, l1, l2, g)
+        timestamp = sim_clock.now()
         self.SIM_STATE_VAR["stateVars"]["sys_state"].append([l1, l2, sys_consts, timestamp])
+        self.events.publish(sim_events.EVT_ROD_LENGTH, (l1, l2))
 
     def calculate_frame_trim(self, measured_sample_rate=None):
         """
@@ -497,12 +658,12 @@ class SIM_STATE:
         else:
             return dataset
 
-    def get_PD_K_vector(self, update=True):
+    def get_PD_K_vector(self, update=False):
         """
         Retrieves the Proportional-Derivative (PD) K vector values.
 
         Args:
-            update (bool): Whether to update the K vector values before retrieval (default: True).
+            update (bool): Whether to design and publish the K vector values before retrieval (default: False).
 
         Returns:
             tuple: The K vector values (K_1, K_2, K_3, K_4).
@@ -510,16 +671,13 @@ class SIM_STATE:
         if update:
             self.update_control_K_vector()
 
-        return (
-            self.get_data_by_key("PD_control.PD_K_1"),
-            self.get_data_by_key("PD_control.PD_K_2"),
-            self.get_data_by_key("PD_control.PD_K_3"),
-            self.get_data_by_key("PD_control.PD_K_4")
-        )
+        return self.gains.K
 
     def update_control_K_vector(self):
         """
-        Updates the Proportional-Derivative (PD) K vector based on the control method.
+        Designs the Proportional-Derivative (PD) K vector of the control method and publishes
+        it as a new gain set. Called when the rod lengths change; only the gain of the
+        selected method is computed, or taken from the gain schedule if it was designed ahead.
 
         Supported control methods:
         - "custom": Uses custom K vector values from the configuration.
@@ -529,32 +687,49 @@ class SIM_STATE:
         Returns:
             tuple: The control indicator and K vector values (control_method, K_1, K_2, K_3, K_4).
         """
-        control_method = str(self.get_data_by_key("PD_control.CONTROL_METHOD"))
-
-        pole_place_K, riccati_K, cnt_K_H_inf = self.state_space_ref.get_K()
+        control_method = str(self.get_data_by_key("PD_control.CONTROL_METHOD")).lower()
 
         control_indicator = None
+        K = (None, None, None, None)
 
-        if control_method.lower() == "custom":
-            K_1, K_2, K_3, K_4 = self._get_custom_PD_K_vector()
+        if control_method == "custom":
+            K = self._get_custom_PD_K_vector()
             control_indicator = "custom"
-        elif control_method.lower() == "h_inf":
-            K_1, K_2, K_3, K_4 = cnt_K_H_inf.flatten()
-            control_indicator = "h_inf"
-        elif control_method.lower() == "lqr":
-            K_1, K_2, K_3, K_4 = riccati_K.flatten()
-            control_indicator = "lqr"
-        else:
-            K_1, K_2, K_3, K_4 = None, None, None, None
+        elif control_method in ("h_inf", "lqr"):
+            scheduled_K = self.gain_schedule.lookup(control_method, self.state_space_ref.l1, self.state_space_ref.l2)
+            if scheduled_K is not None:
+                K = scheduled_K
+            else:
+                designed_K = self.state_space_ref.design_gain(control_method)
+                if designed_K is not None:
+                    K = tuple(designed_K.flatten())
+            control_indicator = control_method
+
+        self._publish_gains(control_indicator, K)
+
+        return (control_indicator,) + K
+
+    def _publish_gains(self, control_method, K):
+        """
+        Replaces the gain set used by the PD control and mirrors it into PD_control for
+        display and saving. EVT_GAIN is raised if the method or the gains changed.
+
+        Args:
+            control_method (str): Control method of the gains, or None.
+            K (tuple): The gains (K_1, K_2, K_3, K_4).
+        """
+        previous = self.gains
+        gains = gain_set(previous.version + 1, control_method, K, self.state_space_ref.l1, self.state_space_ref.l2)
 
-        self.set_data_by_key("PD_control.PD_K_1", K_1)
-        self.set_data_by_key("PD_control.PD_K_2", K_2)
-        self.set_data_by_key("PD_control.PD_K_3", K_3)
-        self.set_data_by_key("PD_control.PD_K_4", K_4)
+        PD_control = self.SIM_STATE_VAR["PD_control"]
+        PD_control["PD_K_1"], PD_control["PD_K_2"], PD_control["PD_K_3"], PD_control["PD_K_4"] = K
+        PD_control["CONTROL_METHOD"] = control_method
 
-        self.set_data_by_key("PD_control.CONTROL_METHOD", control_indicator)
+        # A single reference assignment: the control loop sees either the old or the new set
+        self.gains = gains
 
-        return control_indicator, K_1, K_2, K_3, K_4
+        if (control_method,) + K != (previous.method,) + previous.K:
+            self.events.publish(sim_events.EVT_GAIN, (control_method,) + K)
 
     def _get_custom_PD_K_vector(self):
         """
@@ -655,7 +830,7 @@ class SIM_STATE:
             dphi_1_act = dof_state_stack[2][0]
             dphi_2_act = dof_state_stack[3][0]
 
-            K_1, K_2, K_3, K_4 = self.get_PD_K_vector()
+            K_1, K_2, K_3, K_4 = self.gains.K
 
             # Calculate cart acceleration
             ddq_u = -(K_1 * phi_1_act + K_2 * phi_2_act + K_3 * dphi_1_act + K_4 * dphi_2_act)
@@ -666,13 +841,13 @@ class SIM_STATE:
             if len_PD_cs > 1:
                 pre_u = self.read_PD_u_q()
                 ts_p = pre_u[3]
-                ts_n = time.time()
+                ts_n = sim_clock.now()
                 dt_s = ts_n - ts_p
                 du = ddq_u * dt_s
 
                 u_q_l = [ddq_u, du, du * dt_s, ts_n]  # [ddu, du, u, ts]
             else:
-                u_q_l = [ddq_u, 0.0, 0.0, time.time()]  # [ddu, du, u, ts]
+                u_q_l = [ddq_u, 0.0, 0.0, sim_clock.now()]  # [ddu, du, u, ts]
 
             PD_s = {
                 "PD_phi_1_act": phi_1_act,
@@ -683,3 +858,154 @@ class SIM_STATE:
             }
 
             self.SIM_STATE_VAR["PD_control"]["PD_control_stack"].append(PD_s)
+
+    def maybe_take_snapshot(self):
+        """
+        Takes a snapshot if the simulation is running and the snapshot period has elapsed.
+        """
+        if self.run_status() != 2:
+            return
+        now = time.time()
+        if now - self._last_snapshot_ts >= self.snapshot_period_s:
+            self._last_snapshot_ts = now
+            self.take_snapshot(now)
+
+    def take_snapshot(self, timestamp=None):
+        """
+        Copies the current pendulum state, delay lines, controller memory, cursor offset and
+        rod lengths into the snapshot ring.
+
+        Args:
+            timestamp (float, optional): Timestamp of the snapshot. Defaults to the current time.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        depth = self.snapshot_ring.depth
+        phi_list = self.SIM_STATE_VAR["stateVars"]["phi_np_array_list"]
+        pd_stack = self.SIM_STATE_VAR["PD_control"]["PD_control_stack"]
+        round_start = self.SIM_STATE_VAR["run_conditions"]["simulation_timer"]["start"]
+
+        x_hist = self.read_mouse_input("x", True)
+        x_px = x_hist[-1][0] if len(x_hist) > 0 else 0
+
+        self.snapshot_ring.push(
+            timestamp,
+            timestamp - round_start if round_start is not None else 0.0,
+            self.get_l1(),
+            self.get_l2(),
+            x_px,
+            phi_list[-depth:],
+            pd_stack[-depth:]
+        )
+
+    def restore_snapshot_before_last_fall(self, rewind_s=None):
+        """
+        Restores the latest snapshot taken at least `rewind_s` seconds before the end of the last round.
+
+        Args:
+            rewind_s (float, optional): Seconds to rewind. Defaults to the configured snapshot_rewind_s.
+
+        Returns:
+            bool: True if a snapshot was restored, False otherwise.
+        """
+        if self.last_round_end_ts is None:
+            return False
+        rewind_s = self.snapshot_rewind_s if rewind_s is None else rewind_s
+
+        index = self.snapshot_ring.find_before(self.last_round_end_ts - rewind_s)
+        if index is None:
+            if len(self.snapshot_ring) == 0:
+                return False
+            index = 0  # The round was shorter than the rewind, restart from its earliest snapshot
+        return self.restore_snapshot(index)
+
+    def restore_snapshot(self, index=-1):
+        """
+        Restores a snapshot into the state of the next round. Only possible during static run.
+
+        The DoF state stack, the PD control stack and the rod lengths are replaced by the snapshot
+        contents, and the cursor is offset so that the cart continues from its snapshot position.
+        The round then starts from this state when the simulation is started again.
+
+        Args:
+            index (int): Snapshot index (0: oldest, -1: latest).
+
+        Returns:
+            bool: True if the snapshot was restored, False otherwise.
+        """
+        if self.run_status() != 1 or len(self.snapshot_ring) == 0:
+            return False
+        if len(self.SIM_STATE_VAR["mouse_input"]["x"]) == 0:
+            return False
+
+        snapshot = self.snapshot_ring.get(index)
+        self.apply_snapshot(snapshot)
+        self.events.publish(sim_events.EVT_SNAPSHOT_RESTORED, snapshot)
+        return True
+
+    def apply_snapshot(self, snapshot):
+        """
+        Replaces the state of the next round with the contents of a snapshot.
+
+        Args:
+            snapshot (dict): A snapshot as returned by snapshot_ring.get().
+        """
+        self.data_epoch += 1
+
+        # Rod lengths
+        if snapshot["l1"] != self.get_l1() or snapshot["l2"] != self.get_l2():
+            self.update_sys_variables(snapshot["l1"], snapshot["l2"])
+
+        # Pendulum state and its delay line
+        phi_list = self.SIM_STATE_VAR["stateVars"]["phi_np_array_list"]
+        phi_list.clear()
+        for x, dx, (F1, ddq) in zip(snapshot["phi"], snapshot["dphi"], snapshot["force"]):
+            phi_list.append([x.reshape(4, 1), dx.reshape(4, 1), None, F1, ddq])
+
+        # Controller memory; timestamps stay relative until the round starts
+        pd_stack = self.SIM_STATE_VAR["PD_control"]["PD_control_stack"]
+        pd_stack.clear()
+        for row in snapshot["pd"]:
+            pd_stack.append({
+                "PD_phi_1_act": row[0],
+                "PD_phi_2_act": row[1],
+                "PD_dphi_1_act": row[2],
+                "PD_dphi_2_act": row[3],
+                "PD_u_q": [row[4], row[5], row[6], row[7]]
+            })
+
+        # Cursor offset: the current unwrapped cursor position maps to the snapshot cart position
+        mouse_input = self.SIM_STATE_VAR["mouse_input"]
+        if len(mouse_input["x"]) > 0:
+            input_x = mouse_input["x"][-1][0] - mouse_input["x_offset_px"]
+        else:
+            input_x = self.input_backend.x_px
+
+        # Restart input sampling so the offset does not show up as a jump in dx/ddx. The physics
+        # and cursor threads keep sampling during the static run, so the released buffers stay
+        # quarantined and fresh ones are swapped in
+        self.buffer_pool.recycle()
+        self.buffer_pool.release_dict(self.SIM_STATE_VAR["mouse_input"])
+        self.buffer_pool.release_dict(self.SIM_STATE_VAR["plotable_datasets"])
+        mouse_input = self._lease_mouse_input()
+        mouse_input["x_offset_px"] = snapshot["x_px"] - input_x
+        self.SIM_STATE_VAR["mouse_input"] = mouse_input
+        self.SIM_STATE_VAR["plotable_datasets"] = self.buffer_pool.lease_dict("plotable_datasets", PLOTABLE_DATASET_KEYS)
+
+        self._restored_snapshot = snapshot
+        print(f"Snapshot restored: {snapshot['round_t']:.2f} s into the round.")
+
+    def _start_snapshot_round(self):
+        """
+        Prepares the snapshot state when a round starts. A fresh round clears the ring, while a
+        round started from a restored snapshot rebases the controller memory timestamps.
+        """
+        now = time.time()
+        self._last_snapshot_ts = now
+        if self._restored_snapshot is None:
+            self.snapshot_ring.clear()
+            return
+
+        for PD_s in self.SIM_STATE_VAR["PD_control"]["PD_control_stack"]:
+            ts_rel = PD_s["PD_u_q"][3]
+            PD_s["PD_u_q"][3] = now if np.isnan(ts_rel) else now + ts_rel
+        self._restored_snapshot = None
@@ -0,0 +1,247 @@
+import threading
+
+class history_buffer:
+    """
+    Append-only, list-like history store backed by a presized slot list.
+
+    The buffer behaves like the plain lists previously used in SIM_STATE_VAR (append, len,
+    positive/negative indexing, slicing, iteration), but appends write into preallocated
+    slots instead of growing a list. Clearing keeps the slot list alive, so a buffer that
+    is returned to its buffer_pool can be leased again without allocating.
+
+    Attributes:
+        name (str): Name of the history store the buffer was leased for (e.g. "mouse_input.x").
+        capacity (int): Number of preallocated slots.
+    """
+
+    __slots__ = ("name", "_items", "_len")
+
+    def __init__(self, name, capacity) -> None:
+        """
+        Initializes an empty buffer with the given number of preallocated slots.
+
+        Args:
+            name (str): Name of the history store the buffer belongs to.
+            capacity (int): Number of slots to preallocate.
+        """
+        self.name = name
+        self._items = [None] * max(1, int(capacity))
+        self._len = 0
+
+    @property
+    def capacity(self):
+        """
+        Returns:
+            int: Number of preallocated slots.
+        """
+        return len(self._items)
+
+    def reserve(self, capacity):
+        """
+        Grows the slot list so that at least `capacity` elements fit without reallocation.
+
+        Args:
+            capacity (int): Required number of slots.
+        """
+        missing = int(capacity) - len(self._items)
+        if missing > 0:
+            self._items.extend([None] * missing)
+
+    def append(self, value):
+        """
+        Appends a value into the next free slot, doubling the slot list if it is full.
+
+        Args:
+            value (Any): The value to append.
+        """
+        if self._len == len(self._items):
+            self._items.extend([None] * len(self._items))
+        self._items[self._len] = value
+        self._len += 1
+
+    def clear(self):
+        """
+        Drops all references held by the buffer but keeps the preallocated slots.
+        """
+        n = self._len
+        self._len = 0
+        items = self._items
+        for i in range(n):
+            items[i] = None
+
+    def tolist(self):
+        """
+        Returns:
+            list: A plain list copy of the stored values.
+        """
+        return self._items[:self._len]
+
+    def __copy__(self):
+        return self.tolist()
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __iter__(self):
+        items = self._items
+        for i in range(self._len):
+            yield items[i]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._items[:self._len][index]
+        if index < 0:
+            index += self._len
+        if index < 0 or index >= self._len:
+            raise IndexError("history_buffer index out of range")
+        return self._items[index]
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += self._len
+        if index < 0 or index >= self._len:
+            raise IndexError("history_buffer assignment index out of range")
+        self._items[index] = value
+
+    def __repr__(self):
+        return f"history_buffer({self.name!r}, len={self._len}, capacity={len(self._items)})"
+
+
+class buffer_pool:
+    """
+    Pooled allocator for the per-round history stores of SIM_STATE.
+
+    History stores lease a history_buffer by name at the start of a round and give it back
+    when the round has been saved. Released buffers are cleared and kept, and the next lease
+    of the same name is presized from the lengths the store reached in previous rounds, so
+    back-to-back rounds start on warm storage that does not need to grow.
+
+    Released buffers are quarantined until the next recycle() call. A reset recycles before
+    it releases, so a buffer is never leased again by the reset that released it, and a
+    physics or cursor tick that still holds the previous round's dictionary appends into a
+    buffer no round is using.
+
+    Attributes:
+        min_capacity (int): Capacity used for a store that has no recorded round yet.
+        headroom (float): Factor applied to the longest recorded round when presizing.
+        history_len (int): Number of previous round lengths remembered per store.
+    """
+
+    def __init__(self, min_capacity=4096, headroom=1.25, history_len=8) -> None:
+        """
+        Initializes an empty pool.
+
+        Args:
+            min_capacity (int): Capacity for stores without a recorded round (default: 4096).
+            headroom (float): Factor applied to the longest recorded round (default: 1.25).
+            history_len (int): Number of round lengths remembered per store (default: 8).
+        """
+        self.min_capacity = int(min_capacity)
+        self.headroom = float(headroom)
+        self.history_len = int(history_len)
+
+        self._free = {}
+        self._quarantine = []
+        self._round_lengths = {}
+        self._lock = threading.Lock()
+        self.stats = {"leased": 0, "reused": 0, "allocated": 0, "grown": 0}
+
+    def suggested_capacity(self, name):
+        """
+        Calculates the capacity a new lease of the given store should have.
+
+        Args:
+            name (str): Name of the history store.
+
+        Returns:
+            int: Suggested number of slots.
+        """
+        lengths = self._round_lengths.get(name)
+        if not lengths:
+            return self.min_capacity
+        return max(self.min_capacity, int(max(lengths) * self.headroom))
+
+    def lease(self, name):
+        """
+        Leases an empty buffer for the given history store.
+
+        Args:
+            name (str): Name of the history store (e.g. "plotable_datasets.phi_1").
+
+        Returns:
+            history_buffer: An empty buffer with at least the suggested capacity.
+        """
+        capacity = self.suggested_capacity(name)
+        with self._lock:
+            self.stats["leased"] += 1
+            free_list = self._free.get(name)
+            buffer = free_list.pop() if free_list else None
+            if buffer is None:
+                self.stats["allocated"] += 1
+                return history_buffer(name, capacity)
+            self.stats["reused"] += 1
+
+        # A thread still holding an earlier round's dictionary may have appended after release
+        if len(buffer) > 0:
+            buffer.clear()
+        if buffer.capacity < capacity:
+            self.stats["grown"] += 1
+            buffer.reserve(capacity)
+        return buffer
+
+    def recycle(self):
+        """
+        Makes the buffers released since the previous call available for leasing.
+        """
+        with self._lock:
+            quarantine, self._quarantine = self._quarantine, []
+            for buffer in quarantine:
+                self._free.setdefault(buffer.name, []).append(buffer)
+
+    def release(self, buffer):
+        """
+        Returns a buffer to the pool, recording how long the finished round made it. The
+        buffer can be leased again after the next recycle() call.
+
+        Args:
+            buffer (history_buffer): The buffer to return. Other objects are ignored.
+        """
+        if not isinstance(buffer, history_buffer):
+            return
+
+        lengths = self._round_lengths.setdefault(buffer.name, [])
+        lengths.append(len(buffer))
+        if len(lengths) > self.history_len:
+            del lengths[0]
+
+        buffer.clear()
+        with self._lock:
+            self._quarantine.append(buffer)
+
+    def lease_dict(self, prefix, keys):
+        """
+        Leases one buffer for each key of a history dictionary.
+
+        Args:
+            prefix (str): Name of the dictionary in SIM_STATE_VAR (e.g. "mouse_input").
+            keys (list): Keys of the dictionary that hold histories.
+
+        Returns:
+            dict: Mapping of each key to a leased buffer.
+        """
+        return {key: self.lease(f"{prefix}.{key}") for key in keys}
+
+    def release_dict(self, dictionary):
+        """
+        Returns every history_buffer found in a dictionary to the pool.
+
+        Args:
+            dictionary (dict): Dictionary whose buffer values should be released.
+        """
+        if dictionary is None:
+            return
+        for value in dictionary.values():
+            self.release(value)
@@ -0,0 +1,9 @@
+from collections import namedtuple
+
+# Immutable state feedback gains of the PD control. A new gain set replaces the previous one
+# as a whole, so the control loop never reads the gains of two designs mixed.
+#   version (int): Increases with every published gain set.
+#   method (str): Control method the gains were designed with ("custom", "lqr", "h_inf"), or None.
+#   K (tuple): The gains (K_1, K_2, K_3, K_4); None entries if the method provides no gains.
+#   l1, l2 (float): Rod lengths the gains were designed for.
+gain_set = namedtuple("gain_set", ("version", "method", "K", "l1", "l2"))
@@ -0,0 +1,162 @@
+import threading
+from collections import deque
+
+# Event types raised by SIM_STATE writers
+EVT_NEW_STEP = "new_step"          # payload: number of entries in the DoF state stack
+EVT_RUN_STATUS = "run_status"      # payload: (prev_state, new_state)
+EVT_ROD_LENGTH = "rod_length"      # payload: (l1, l2)
+EVT_GAIN = "gain"                  # payload: (control_method, K_1, K_2, K_3, K_4)
+EVT_ROUND_SAVED = "round_saved"    # payload: path of the saved CSV file
+EVT_SNAPSHOT_RESTORED = "snapshot_restored"    # payload: the restored snapshot dict
+EVT_CURSOR_SAMPLE = "cursor_sample"    # payload: number of entries in mouse_input.x
+
+ALL_EVENTS = (EVT_NEW_STEP, EVT_RUN_STATUS, EVT_ROD_LENGTH, EVT_GAIN, EVT_ROUND_SAVED, EVT_SNAPSHOT_RESTORED,
+              EVT_CURSOR_SAMPLE)
+
+# Coalescing policies of a subscription
+POLICY_IMMEDIATE = "immediate"     # Callback runs on the publishing thread, nothing is stored
+POLICY_LATEST = "latest"           # Only the latest payload per event type is kept until drained
+POLICY_QUEUE = "queue"             # Every event is kept (bounded) until drained
+
+
+class subscription:
+    """
+    A consumer's view of the event bus.
+
+    Depending on the policy, events are either forwarded to a callback on the publishing
+    thread, or stored until the consumer drains them. A consumer can block in wait() until
+    something arrives, so idle periods cost no wake-ups.
+
+    Attributes:
+        events (frozenset): Event types the subscription receives.
+        policy (str): One of POLICY_IMMEDIATE, POLICY_LATEST, POLICY_QUEUE.
+        callback (callable): Called as callback(event_type, payload) for POLICY_IMMEDIATE.
+    """
+
+    def __init__(self, events, policy=POLICY_LATEST, callback=None, maxlen=256) -> None:
+        """
+        Initializes a subscription.
+
+        Args:
+            events (iterable): Event types to receive.
+            policy (str): Coalescing policy (default: POLICY_LATEST).
+            callback (callable, optional): Callback for POLICY_IMMEDIATE.
+            maxlen (int): Maximum number of stored events for POLICY_QUEUE (default: 256).
+        """
+        if policy == POLICY_IMMEDIATE and callback is None:
+            raise ValueError("An immediate subscription needs a callback.")
+
+        self.events = frozenset(events)
+        self.policy = policy
+        self.callback = callback
+
+        self._latest = {}
+        self._queue = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._flag = threading.Event()
+
+    def _deliver(self, event_type, payload):
+        """
+        Hands a published event to the subscription according to its policy.
+        """
+        if self.policy == POLICY_IMMEDIATE:
+            self.callback(event_type, payload)
+            return
+
+        with self._lock:
+            if self.policy == POLICY_LATEST:
+                self._latest[event_type] = payload
+            else:
+                self._queue.append((event_type, payload))
+        self._flag.set()
+
+    def pending(self):
+        """
+        Returns:
+            bool: True if events arrived since the last drain.
+        """
+        return self._flag.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Blocks until an event arrives or the timeout elapses.
+
+        Args:
+            timeout (float, optional): Timeout in seconds. None waits forever.
+
+        Returns:
+            bool: True if events are pending.
+        """
+        return self._flag.wait(timeout)
+
+    def drain(self):
+        """
+        Takes every stored event.
+
+        Returns:
+            dict or list: For POLICY_LATEST a dict {event_type: latest payload},
+            for POLICY_QUEUE a list of (event_type, payload) in publishing order.
+        """
+        with self._lock:
+            self._flag.clear()
+            if self.policy == POLICY_LATEST:
+                drained, self._latest = self._latest, {}
+            else:
+                drained = list(self._queue)
+                self._queue.clear()
+        return drained
+
+
+class event_bus:
+    """
+    Publish/subscribe hub for SIM_STATE change notifications.
+
+    Writers publish typed events (see EVT_*) and consumers subscribe with their own
+    coalescing policy instead of polling SIM_STATE on a timer.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers = {event_type: () for event_type in ALL_EVENTS}
+        self._lock = threading.Lock()
+
+    def subscribe(self, events=ALL_EVENTS, policy=POLICY_LATEST, callback=None, maxlen=256):
+        """
+        Creates and registers a subscription.
+
+        Args:
+            events (iterable): Event types to receive (default: all).
+            policy (str): Coalescing policy (default: POLICY_LATEST).
+            callback (callable, optional): Callback for POLICY_IMMEDIATE.
+            maxlen (int): Maximum number of stored events for POLICY_QUEUE (default: 256).
+
+        Returns:
+            subscription: The new subscription.
+        """
+        sub = subscription(events, policy, callback, maxlen)
+        with self._lock:
+            for event_type in sub.events:
+                # Tuples are replaced, never mutated, so publish() can iterate without locking
+                self._subscribers[event_type] = self._subscribers.get(event_type, ()) + (sub,)
+        return sub
+
+    def unsubscribe(self, sub):
+        """
+        Removes a subscription from the bus.
+
+        Args:
+            sub (subscription): The subscription to remove.
+        """
+        with self._lock:
+            for event_type in sub.events:
+                self._subscribers[event_type] = tuple(s for s in self._subscribers.get(event_type, ()) if s is not sub)
+
+    def publish(self, event_type, payload=None):
+        """
+        Publishes an event to every subscription of its type.
+
+        Args:
+            event_type (str): One of the EVT_* event types.
+            payload (Any, optional): Event data.
+        """
+        for sub in self._subscribers.get(event_type, ()):
+            sub._deliver(event_type, payload)
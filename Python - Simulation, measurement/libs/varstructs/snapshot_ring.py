@@ -0,0 +1,149 @@
+import numpy as np
+
+class snapshot_ring:
+    """
+    Fixed-size ring of simulation state snapshots stored in preallocated numpy arrays.
+
+    Each slot holds everything needed to continue a round from that moment without replaying
+    its history: the last `depth` entries of the DoF state stack (the delay line read through
+    the frame trims), the last `depth` entries of the PD control stack (controller memory),
+    the cursor position and the rod lengths. Pushing and restoring copy
+    arrays of fixed size, so both are O(state size).
+
+    Attributes:
+        capacity (int): Number of snapshot slots.
+        depth (int): Number of delay-line entries stored per snapshot.
+    """
+
+    # Columns of the meta array
+    META_T = 0          # Absolute timestamp of the snapshot
+    META_ROUND_T = 1    # Seconds since the start of the round
+    META_L1 = 2         # Rod A length
+    META_L2 = 3         # Rod B length (nan for a single pendulum)
+    META_X_PX = 4       # Unwrapped cursor position in pixels
+
+    def __init__(self, capacity, depth) -> None:
+        """
+        Initializes an empty ring.
+
+        Args:
+            capacity (int): Number of snapshot slots.
+            depth (int): Number of delay-line entries stored per snapshot.
+        """
+        self.capacity = max(1, int(capacity))
+        self.depth = max(2, int(depth))
+
+        self.meta = np.full((self.capacity, 5), np.nan)
+        self.phi = np.zeros((self.capacity, self.depth, 4))      # x: [phi1, phi2, dphi1, dphi2]
+        self.dphi = np.zeros((self.capacity, self.depth, 4))     # dx: [dphi1, dphi2, ddphi1, ddphi2]
+        self.force = np.zeros((self.capacity, self.depth, 2))    # [F1, ddq]
+        self.n_phi = np.zeros(self.capacity, dtype=int)
+        self.pd = np.zeros((self.capacity, self.depth, 8))       # [phi1, phi2, dphi1, dphi2, ddu, du, u, ts - t]
+        self.n_pd = np.zeros(self.capacity, dtype=int)
+
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        """
+        Forgets every stored snapshot. The preallocated arrays are kept.
+        """
+        self._next = 0
+        self._count = 0
+
+    def push(self, t, round_t, l1, l2, x_px, phi_entries, pd_entries):
+        """
+        Stores a snapshot in the next slot, overwriting the oldest one when the ring is full.
+
+        Args:
+            t (float): Absolute timestamp of the snapshot.
+            round_t (float): Seconds since the start of the round.
+            l1 (float): Rod A length.
+            l2 (float): Rod B length, or None for a single pendulum.
+            x_px (float): Unwrapped cursor position in pixels.
+            phi_entries (list): Latest DoF state stack entries [x, dx, ts, F1, ddq], oldest first.
+            pd_entries (list): Latest PD control stack entries, oldest first.
+        """
+        slot = self._next
+        phi_entries = phi_entries[-self.depth:]
+        pd_entries = pd_entries[-self.depth:]
+
+        self.meta[slot] = (t, round_t, l1, np.nan if l2 is None else l2, x_px)
+
+        for i, entry in enumerate(phi_entries):
+            self.phi[slot, i] = entry[0][:, 0]
+            self.dphi[slot, i] = entry[1][:, 0]
+            self.force[slot, i] = (entry[3], entry[4])
+        self.n_phi[slot] = len(phi_entries)
+
+        for i, entry in enumerate(pd_entries):
+            ddu, du, u, ts = entry["PD_u_q"]
+            self.pd[slot, i] = (
+                entry["PD_phi_1_act"], entry["PD_phi_2_act"], entry["PD_dphi_1_act"], entry["PD_dphi_2_act"],
+                ddu, du, u, np.nan if ts is None else ts - t
+            )
+        self.n_pd[slot] = len(pd_entries)
+
+        self._next = (slot + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _slot(self, index):
+        """
+        Converts a snapshot index (0: oldest, -1: latest) to a slot index.
+        """
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("snapshot index out of range")
+        return (self._next - self._count + index) % self.capacity
+
+    def timestamps(self):
+        """
+        Returns:
+            numpy.ndarray: Absolute timestamps of the stored snapshots, oldest first.
+        """
+        return np.array([self.meta[self._slot(i), self.META_T] for i in range(self._count)])
+
+    def find_before(self, t):
+        """
+        Finds the latest snapshot taken at or before the given time.
+
+        Args:
+            t (float): Absolute timestamp.
+
+        Returns:
+            int or None: Snapshot index (0: oldest), or None if every snapshot is newer.
+        """
+        for index in range(self._count - 1, -1, -1):
+            if self.meta[self._slot(index), self.META_T] <= t:
+                return index
+        return None
+
+    def get(self, index=-1):
+        """
+        Copies a snapshot out of the ring.
+
+        Args:
+            index (int): Snapshot index (0: oldest, -1: latest).
+
+        Returns:
+            dict: The snapshot with keys t, round_t, l1, l2, x_px, phi, dphi, force and pd.
+        """
+        slot = self._slot(index)
+        meta = self.meta[slot]
+        n_phi = self.n_phi[slot]
+        n_pd = self.n_pd[slot]
+        return {
+            "t": float(meta[self.META_T]),
+            "round_t": float(meta[self.META_ROUND_T]),
+            "l1": float(meta[self.META_L1]),
+            "l2": None if np.isnan(meta[self.META_L2]) else float(meta[self.META_L2]),
+            "x_px": float(meta[self.META_X_PX]),
+            "phi": self.phi[slot, :n_phi].copy(),
+            "dphi": self.dphi[slot, :n_phi].copy(),
+            "force": self.force[slot, :n_phi].copy(),
+            "pd": self.pd[slot, :n_pd].copy()
+        }
@@ -0,0 +1,52 @@
+import threading
+
+class diag_channel:
+    """
+    Coalescing channel that carries label text updates from the diag worker to the Tk main loop.
+
+    The worker pushes compact diffs, {label key: new text}, holding only the labels whose
+    text changed. Pending updates are kept in one dict keyed by label, so a later push for a
+    label overwrites the earlier one that was not displayed yet. The channel is bounded by
+    the number of labels however far the Tk side falls behind, and the Tk side only ever
+    sees the latest text of each label.
+
+    Attributes:
+        pushes (int): Number of non-empty diffs pushed.
+        coalesced (int): Number of label updates overwritten before they were drained.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty channel.
+        """
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.pushes = 0
+        self.coalesced = 0
+
+    def push(self, diff):
+        """
+        Queues the label texts of a diff. Called by the worker.
+
+        Args:
+            diff (dict): Changed label texts, keyed by label.
+        """
+        if not diff:
+            return
+        with self._lock:
+            for key in diff:
+                if key in self._pending:
+                    self.coalesced += 1
+            self._pending.update(diff)
+            self.pushes += 1
+
+    def drain(self):
+        """
+        Takes all pending label texts. Called by the Tk main loop.
+
+        Returns:
+            dict: The latest pending text of each changed label.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
@@ -4,6 +4,11 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.animation import FuncAnimation
 from libs.varstructs.SIM_STATE import SIM_STATE
+from libs.varstructs.buffer_pool import history_buffer
+from libs.varstructs import sim_events
+from threads_.diag.diag_channel import diag_channel
+from libs import overload_controller
+from libs import span_tracer
 
 class diag_gui_widget():
     """
@@ -15,6 +20,8 @@ class diag_gui_widget():
     Attributes:
         left_scrollable_frame (ttk.Frame): Frame containing state variable labels.
         updateable_labels (dict): Stores references to labels for updating displayed values.
+        label_channel (diag_channel): Carries the changed label texts from the diag worker to the Tk main loop.
+        plot_subscription (subscription): Notifies the plots about new simulation steps and cursor samples.
     """
 
     def __init__(self, root, SIM_STATE_VAR: SIM_STATE) -> None:
@@ -101,7 +108,7 @@ class diag_gui_widget():
             self.updateable_labels[main_key] = {}
 
             for key, value in sub_dict.items():
-                if not isinstance(value, str) and isinstance(value, list) and len(value) > 0:
+                if not isinstance(value, str) and isinstance(value, (list, history_buffer)) and len(value) > 0:
                     label = tk.Label(group_frame, text=f"{key}: {value[-1]}", width=40, anchor="w", justify="left")
                 elif isinstance(value, dict) and len(value) > 0:
                     continue
@@ -110,6 +117,22 @@ class diag_gui_widget():
                 label.pack(anchor="w")
                 self.updateable_labels[main_key][key] = label
 
+        # Label texts are formatted by the diag worker and applied on the Tk main loop
+        self.label_channel = diag_channel()
+        self._formatted = {}     # Worker side: (source value, text) last formatted per label
+        self._shown_texts = {}   # Tk side: text currently shown per label
+        display_rate_hz = SIM_STATE_VAR.config_dict["simulation_config"].get("diag_display_rate_hz", 20)
+        self.display_period_ms = max(1, int(1000 / display_rate_hz))
+        self.left_scrollable_frame.after(self.display_period_ms, self._apply_label_updates)
+
+        # Plots are refreshed only when new steps or cursor samples arrived or the plot settings changed
+        self.plot_subscription = SIM_STATE_VAR.events.subscribe(
+            (sim_events.EVT_NEW_STEP, sim_events.EVT_CURSOR_SAMPLE, sim_events.EVT_RUN_STATUS), sim_events.POLICY_LATEST)
+        self.plot_dirty = True
+
+        def mark_plot_dirty(event=None):
+            self.plot_dirty = True
+
         # Setup for dynamic plots in the right scrollable frame
         plot_vars = []
         control_frames = []
@@ -148,6 +171,7 @@ class diag_gui_widget():
             dropdown.pack(side="left", padx=5)
             dropdown.bind("<MouseWheel>", lambda e: "break")
             dropdown.state(["readonly"])
+            dropdown.bind("<<ComboboxSelected>>", mark_plot_dirty)
 
             # Horizontal slider for setting the x-axis range
             x_range_slider = tk.Scale(control_frame, from_=100, to=5000, resolution=10, orient="horizontal", length=150, showvalue=False)
@@ -166,6 +190,7 @@ class diag_gui_widget():
                 Args:
                     event: The Tkinter event triggering the update.
                 """
+                mark_plot_dirty()
                 x_range_value = x_range_slider.get()
                 if x_range_value >= 5000:
                     x_range_entry.delete(0, tk.END)
@@ -181,6 +206,7 @@ class diag_gui_widget():
                 Args:
                     event: The Tkinter event triggering the update.
                 """
+                mark_plot_dirty()
                 try:
                     entry_value = x_range_entry.get()
                     if entry_value == "∞":
@@ -220,6 +246,7 @@ class diag_gui_widget():
 
             # Store the slider for each plot to access in update_plot
             plot_vars.append({"plot_var": plot_var, "slider": x_range_slider, "ax": ax})
+            mark_plot_dirty()
 
             # Start animation for live updating
             self.ani = FuncAnimation(fig, update_plot, init_func=init_plot, blit=False, interval=100)
@@ -286,30 +313,41 @@ class diag_gui_widget():
             if self.paused:
                 return lines  # Return the lines without updating
 
-            # Retrieve the selected data for plotting
-            selected_data = update_selected_lists()
-
-            # Ensure there is data to plot and corresponding lines exist
-            if selected_data and lines:
-                for i, data in enumerate(selected_data):
-                    if i < len(lines):  # Ensure the index is within bounds
-                        ax = lines[i].axes  # Get the axis associated with the line
-                        x_data = range(len(data))
-
-                        if len(data) > 0:  # Ensure the dataset is not empty
-                            # Update the line with new data points
-                            lines[i].set_data(x_data, data)
-
-                            # Adjust x-axis range based on slider value
-                            slider_value = plot_vars[i]["slider"].get()
-                            if slider_value == 1000:  # Treat 1000 as "infinity"
-                                ax.set_xlim(0, len(data))
-                            else:
-                                ax.set_xlim(max(0, len(data) - slider_value), len(data))
-
-                            # Adjust y-axis range dynamically based on data values
-                            ax.set_ylim(min(data) - 10, max(data) + 10)
-                            canvases[i].draw_idle()  # Redraw the canvas for this line
+            # The plots are the first work shed when the simulation falls behind real time
+            if SIM_STATE_VAR.overload.sheds(overload_controller.LEVEL_DIAG_PLOTS):
+                return lines
+
+            # Skip updating if neither the data nor the plot settings changed
+            if not (self.plot_dirty or self.plot_subscription.pending()):
+                return lines
+            self.plot_subscription.drain()
+            self.plot_dirty = False
+
+            with span_tracer.span("diag plots"):
+                # Retrieve the selected data for plotting
+                selected_data = update_selected_lists()
+
+                # Ensure there is data to plot and corresponding lines exist
+                if selected_data and lines:
+                    for i, data in enumerate(selected_data):
+                        if i < len(lines):  # Ensure the index is within bounds
+                            ax = lines[i].axes  # Get the axis associated with the line
+                            x_data = range(len(data))
+
+                            if len(data) > 0:  # Ensure the dataset is not empty
+                                # Update the line with new data points
+                                lines[i].set_data(x_data, data)
+
+                                # Adjust x-axis range based on slider value
+                                slider_value = plot_vars[i]["slider"].get()
+                                if slider_value == 1000:  # Treat 1000 as "infinity"
+                                    ax.set_xlim(0, len(data))
+                                else:
+                                    ax.set_xlim(max(0, len(data) - slider_value), len(data))
+
+                                # Adjust y-axis range dynamically based on data values
+                                ax.set_ylim(min(data) - 10, max(data) + 10)
+                                canvases[i].draw_idle()  # Redraw the canvas for this line
 
             return lines
 
@@ -322,80 +360,107 @@ class diag_gui_widget():
         """
         # Toggle the paused state
         self.paused = not self.paused
+        self.plot_dirty = True
 
         # Update button text based on paused state
         pause_button_text = "Resume Plotting" if self.paused else "Pause Plotting"
         self.button_pause.config(text=pause_button_text)
 
+    @staticmethod
+    def _format_scalar(value):
+        """
+        Formats a value that is not a history for display.
+
+        Parameters:
+        - value: The value to format.
+
+        Returns:
+        - str: The formatted value.
+        """
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        if isinstance(value, dict):
+            return ", ".join(f"{k}: {diag_gui_widget._format_scalar(v)}" for k, v in value.items())
+        return f"{value}"
+
+    @staticmethod
+    def _format_value(value):
+        """
+        Formats the latest entry of a history for display. Floats are shown with two
+        decimals, nested lists and tuples element by element.
+
+        Parameters:
+        - value: The value to format.
+
+        Returns:
+        - str: The formatted value.
+        """
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        if isinstance(value, list):
+            # Format nested lists for display
+            prtin_v_form = ""
+            for sub_pv in value:
+                if isinstance(sub_pv, float):
+                    prtin_v_form += f"{sub_pv:.2f}, "
+                elif isinstance(sub_pv, tuple):
+                    prtin_v_form += f"\n("
+                    for sub_sub_pv in sub_pv:
+                        if isinstance(sub_sub_pv, float):
+                            prtin_v_form += f"{sub_sub_pv:.2f}, "
+                        else:
+                            prtin_v_form += f"{sub_sub_pv}, "
+                    prtin_v_form += f")\n"
+                else:
+                    prtin_v_form += f"{sub_pv}, "
+            return prtin_v_form
+        return f"{value}"
+
     def update_state_var_display(self, SIM_STATE_VAR: SIM_STATE):
         """
-        Updates the displayed state variables in the left scrollable frame.
+        Formats the displayed state variables and pushes the texts that changed into the
+        label channel. Runs on the diag worker and does not touch any Tk widget; the Tk
+        main loop applies the pushed texts in `_apply_label_updates`.
 
-        This method retrieves values from the provided simulation state variable object
-        and formats them appropriately for display. The method handles various data types
-        such as floats, lists, and tuples.
+        For histories only the latest entry is shown. An entry that is the same object as
+        at the previous update is not formatted again, so the nested lists of e.g. sys_state
+        are only formatted when a new entry was appended.
 
         Parameters:
         - SIM_STATE_VAR (SIM_STATE): The simulation state object containing the state variables.
         """
-        # Iterate over the labels and update them with the current simulation state
+        diff = {}
         for main_key, sub_dict in self.updateable_labels.items():
-            for key, _ in sub_dict.items():
+            for key in sub_dict:
                 value = SIM_STATE_VAR.SIM_STATE_VAR[main_key][key]
+                is_history = not isinstance(value, str) and isinstance(value, (list, history_buffer)) and len(value) > 0
+                if is_history:
+                    value = value[-1]
+
+                label_key = (main_key, key)
+                previous = self._formatted.get(label_key)
+                if previous is not None and previous[0] is value and (is_history or not isinstance(value, dict)):
+                    # Dicts held directly (e.g. scheduler_stats) are updated in place, so they are always formatted again
+                    continue
 
-                if not isinstance(value, str) and isinstance(value, list) and len(value) > 0:
-                    # Handle lists with non-string elements
-                    print_val = value[-1]
-                    if isinstance(print_val, float):
-                        self.updateable_labels[main_key][key].configure(text=f"{key}: {print_val:.2f}")
-                    elif isinstance(print_val, list):
-                        # Format nested lists for display
-                        prtin_v_form = ""
-                        for sub_pv in print_val:
-                            if isinstance(sub_pv, float):
-                                prtin_v_form += f"{sub_pv:.2f}, "
-                            elif isinstance(sub_pv, tuple):
-                                prtin_v_form += f"\n("
-                                for sub_sub_pv in sub_pv:
-                                    if isinstance(sub_sub_pv, float):
-                                        prtin_v_form += f"{sub_sub_pv:.2f}, "
-                                    else:
-                                        prtin_v_form += f"{sub_sub_pv}, "
-                                prtin_v_form += f")\n"
-                            else:
-                                prtin_v_form += f"{sub_pv}, "
-                        self.updateable_labels[main_key][key].configure(text=f"{key}: {prtin_v_form}")
-                    else:
-                        self.updateable_labels[main_key][key].configure(text=f"{key}: {print_val}")
+                text = f"{key}: {self._format_value(value) if is_history else self._format_scalar(value)}"
+                if previous is None or previous[1] != text:
+                    diff[label_key] = text
+                self._formatted[label_key] = (value, text)
 
-                elif isinstance(value, dict) and len(value) > 0:
-                    # Handle dictionaries
-                    print_val = value[-1]
-                    if isinstance(print_val, float):
-                        self.updateable_labels[main_key][key].configure(text=f"{key}: {print_val:.2f}")
-                    elif isinstance(print_val, list):
-                        # Format nested lists for display
-                        prtin_v_form = ""
-                        for sub_pv in print_val:
-                            if isinstance(sub_pv, float):
-                                prtin_v_form += f"{sub_pv:.2f}, "
-                            elif isinstance(sub_pv, tuple):
-                                prtin_v_form += f"\n("
-                                for sub_sub_pv in sub_pv:
-                                    if isinstance(sub_sub_pv, float):
-                                        prtin_v_form += f"{sub_sub_pv:.2f}, "
-                                    else:
-                                        prtin_v_form += f"{sub_sub_pv}, "
-                                prtin_v_form += f")\n"
-                            else:
-                                prtin_v_form += f"{sub_pv}, "
-                        self.updateable_labels[main_key][key].configure(text=f"{key}: {prtin_v_form}")
-                    else:
-                        self.updateable_labels[main_key][key].configure(text=f"{key}: {print_val}")
+        self.label_channel.push(diff)
 
-                else:
-                    # Handle other types, including floats and general objects
-                    if isinstance(value, float):
-                        self.updateable_labels[main_key][key].configure(text=f"{key}: {value:.2f}")
-                    else:
-                        self.updateable_labels[main_key][key].configure(text=f"{key}: {value}")
+    def _apply_label_updates(self):
+        """
+        Applies the pending label texts of the channel and reschedules itself at the
+        display rate. Runs on the Tk main loop; only labels whose text changed are configured.
+        Stops once the widget has been destroyed.
+        """
+        if not self.left_scrollable_frame.winfo_exists():
+            return
+        with span_tracer.span("diag labels"):
+            for (main_key, key), text in self.label_channel.drain().items():
+                if self._shown_texts.get((main_key, key)) != text:
+                    self.updateable_labels[main_key][key].configure(text=text)
+                    self._shown_texts[(main_key, key)] = text
+        self.left_scrollable_frame.after(self.display_period_ms, self._apply_label_updates)
@@ -2,6 +2,8 @@ import threading
 import time
 import threads_.diag.diag_update_loop as diag_update_loop
 from libs.varstructs.SIM_STATE import SIM_STATE
+from libs.varstructs import sim_events
+from libs import rt_profile
 
 class diag_t(threading.Thread):
     """
@@ -29,17 +31,30 @@ class diag_t(threading.Thread):
         self.SIM_STATE              = SIM_STATE_ref
         self.diag_gui               = diag_gui
 
+        # Wake up only when the simulation state changes, including the cursor samples of a static run;
+        # bursts are coalesced to the latest values
+        self.subscription           = self.SIM_STATE.events.subscribe(sim_events.ALL_EVENTS, sim_events.POLICY_LATEST)
+
     def run(self):
         """
-        Main execution loop of the diagnostic thread. Continuously updates
-        diagnostic values as long as the simulation is running. It uses the
-        simulation state's `run_status` to determine whether to stop the loop.
+        Main execution loop of the diagnostic thread. Waits for change notifications
+        of the simulation state and updates the diagnostic values when they arrive,
+        as long as the simulation is running. It uses the simulation state's
+        `run_status` to determine whether to stop the loop.
 
-        The update frequency is controlled by the `SAMPLERATE_S` value
-        from the simulation configuration.
+        Notifications arriving within one `SAMPLERATE_S` period are coalesced
+        into a single update, so the display is refreshed at most at the
+        simulation's sampling rate and not at all while nothing changes.
+        The thread never touches Tk widgets; the changed label texts are
+        applied on the Tk main loop at simulation_config.diag_display_rate_hz.
         """
+        self.SIM_STATE.rt_profile.apply(rt_profile.ROLE_DIAG)
         while self.SIM_STATE.run_status() != 0:
+            if not self.subscription.wait(timeout=1.0):
+                continue
+            self.subscription.drain()
             diag_update_loop.diag_update_values(self.SIM_STATE, self.diag_gui)
             time.sleep(self.SIM_STATE.get_data_by_key("simulation_config.SAMPLERATE_S"))
-        
+
+        self.SIM_STATE.events.unsubscribe(self.subscription)
         print("Diag thread stopping...")
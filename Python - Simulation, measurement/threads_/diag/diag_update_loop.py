@@ -1,4 +1,5 @@
 from libs.varstructs.SIM_STATE import SIM_STATE
+from libs import span_tracer
 
 def diag_update_values(SIM_STATE_VAR: SIM_STATE, diag_widget):
     """
@@ -9,7 +10,9 @@ def diag_update_values(SIM_STATE_VAR: SIM_STATE, diag_widget):
         diag_widget: The widget or GUI component responsible for displaying diagnostic information.
 
     This function is called to refresh the diagnostic widget with the latest
-    values from the simulation state. It ensures that the displayed information
-    reflects the current state of the simulation.
+    values from the simulation state. It runs on the diag worker: the widget
+    formats the values and queues the changed label texts, which the Tk main
+    loop applies at the display rate.
     """
-    diag_widget.update_state_var_display(SIM_STATE_VAR)
+    with span_tracer.span("diag update"):
+        diag_widget.update_state_var_display(SIM_STATE_VAR)
@@ -1,25 +1,51 @@
-import pyautogui
-import time
+import numpy as np
+from libs import sim_clock
 
-def get_mouse_position(screen_width_px: int, const_null_pos=False):
+def get_mouse_position(screen_width_px: int, const_null_pos=False, backend=None):
     """
     Get the current mouse position or return a constant null position.
 
     Parameters:
     - screen_width_px (int): The width of the screen in pixels.
     - const_null_pos (bool): If True, returns the screen center as the position.
+    - backend (input_backend): The input backend the position is read from.
 
     Returns:
-    - list: A list containing the mouse position (x-coordinate) and timestamp.
+    - list: The mouse position (x-coordinate), the time of the motion and the time it was polled.
     """
-    timestamp = time.time()
+    timestamp = poll_ts = sim_clock.now()
     pos_x = round(screen_width_px / 2)  # Default to the center of the screen
     if not const_null_pos:
-        pos_x = pyautogui.position()[0]  # Get the actual mouse position
+        positions = backend.read()
+        if positions:
+            pos_x, timestamp, poll_ts = positions[-1]  # The latest input of the backend
+        else:
+            pos_x, timestamp, poll_ts = backend.hold()  # No motion since the previous read
 
-    return [pos_x, timestamp]
+    return [pos_x, timestamp, poll_ts]
 
-def update(cursor_state, plotable_datasets, screen_width_px: int, const_null_pos: bool, meter_per_pixel: float):
+def estimate_from_samples(samples):
+    """
+    Estimates the cursor position, velocity and acceleration at the latest sample by a
+    least-squares quadratic fit over the samples of the window.
+
+    Args:
+        samples (numpy.ndarray): [x_px, timestamp, poll_ts] rows, oldest first.
+
+    Returns:
+        tuple or None: (x, dx, ddx, timestamp) in px, px/s, px/s^2, or None if the window is too
+        short for a fit.
+    """
+    if len(samples) < 3:
+        return None
+    ts = samples[-1, 1]
+    tau = samples[:, 1] - ts
+    if tau[0] >= 0:
+        return None
+    c2, c1, c0 = np.polyfit(tau, samples[:, 0], 2)
+    return c0, c1, 2 * c2, ts
+
+def update(cursor_state, plotable_datasets, screen_width_px: int, const_null_pos: bool, meter_per_pixel: float, sampler_ring=None, fit_window_s=0.03, backend=None, estimator=None):
     """
     Update cursor state and plotable datasets based on mouse movement.
 
@@ -29,20 +55,48 @@ def update(cursor_state, plotable_datasets, screen_width_px: int, const_null_pos
     - screen_width_px (int): The width of the screen in pixels.
     - const_null_pos (bool): If True, sets the cursor position to a constant value.
     - meter_per_pixel (float): Conversion factor from pixels to meters.
+    - sampler_ring (cursor_ring, optional): Ring filled by a high-rate cursor sampler. If given, the
+      position and its derivatives are fitted from the samples of the last fit_window_s seconds. The
+      backend is then read by the sampler thread only, and a tick without a new sample adds nothing.
+    - fit_window_s (float): Length of the fitted sample window in seconds (default: 0.03).
+    - backend (input_backend): The input backend the cursor is read from without a sampler.
+    - estimator (derivative_estimator, optional): Streaming estimator of the position and its derivatives. If
+      given, it replaces the window fit and the finite differences; every sample is fed to it.
 
     Returns:
     - None
     """
-    # Check if cursor state needs to be updated
-    if cursor_state["cursor_replace_flag"] == 2:
-        cursor_state["cursor_replace_flag"] = 0
-    elif cursor_state["cursor_replace_flag"] == 1:
-        return  # Skip updating if replace flag is active
-
-    # Get mouse position and apply offset for replacement counter
-    x, x_ts = get_mouse_position(screen_width_px, const_null_pos)
-    x += cursor_state["replace_counter"] * (screen_width_px - 2)
-    cursor_state["x"].append([x, x_ts])
+    # A new round or a restored snapshot restarts the cursor data with new offsets
+    if estimator is not None and len(cursor_state["x"]) == 0:
+        estimator.reset()
+
+    if sampler_ring is not None and not const_null_pos:
+        if _update_from_samples(cursor_state, plotable_datasets, meter_per_pixel, sampler_ring, fit_window_s, estimator):
+            return
+        # The sampler thread is the only reader of the backend; fall back to its latest sample
+        latest = sampler_ring.latest()
+        if latest is None or (len(cursor_state["x"]) > 0 and latest[1] <= cursor_state["x"][-1][1]):
+            return  # Nothing newer than the previous tick
+        x, x_ts, poll_ts = latest
+    else:
+        # Get the unwrapped mouse position
+        x, x_ts, poll_ts = get_mouse_position(screen_width_px, const_null_pos, backend)
+        if len(cursor_state["x"]) > 0 and x_ts <= cursor_state["x"][-1][1]:
+            return  # Clamped to the previous sample; the position is taken up by the next tick
+
+    # Apply the offset of a restored snapshot
+    x += cursor_state["x_offset_px"]
+    if estimator is not None:
+        estimator.update(x, x_ts)
+        estimate = estimator.estimate()
+        if estimate is None:
+            cursor_state["x"].append([x, x_ts, poll_ts])
+            plotable_datasets["x"].append(x)
+        else:
+            _append_estimate(cursor_state, plotable_datasets, meter_per_pixel, *estimate, poll_ts)
+        return
+
+    cursor_state["x"].append([x, x_ts, poll_ts])
     plotable_datasets["x"].append(x)
 
     # Calculate velocity if there are at least two position samples
@@ -64,12 +118,73 @@ def update(cursor_state, plotable_datasets, screen_width_px: int, const_null_pos
         cursor_state["ddx"].append([ddx, at, dt])
         plotable_datasets["ddx"].append(ddx)
 
-        # Convert values to meters
-        x_m = x * meter_per_pixel
-        dx_m = dx * meter_per_pixel
-        ddx_m = ddx * meter_per_pixel
-        cursor_state["ddx_m"].append(ddx_m)
-        cursor_state["q_array_list"].append([x_m, dx_m, ddx_m, x_ts])
-        plotable_datasets["x_m"].append(x_m)
-        plotable_datasets["dx_m"].append(dx_m)
-        plotable_datasets["ddx_m"].append(ddx_m)
+        _append_q(cursor_state, plotable_datasets, meter_per_pixel, x, dx, ddx, x_ts)
+
+def _append_q(cursor_state, plotable_datasets, meter_per_pixel, x, dx, ddx, x_ts):
+    """
+    Append the input state of the physics step (in meters) to the cursor state and plotable datasets.
+    """
+    # Convert values to meters
+    x_m = x * meter_per_pixel
+    dx_m = dx * meter_per_pixel
+    ddx_m = ddx * meter_per_pixel
+    cursor_state["ddx_m"].append(ddx_m)
+    cursor_state["q_array_list"].append([x_m, dx_m, ddx_m, x_ts])
+    plotable_datasets["x_m"].append(x_m)
+    plotable_datasets["dx_m"].append(dx_m)
+    plotable_datasets["ddx_m"].append(ddx_m)
+
+def _update_from_samples(cursor_state, plotable_datasets, meter_per_pixel, sampler_ring, fit_window_s, estimator=None):
+    """
+    Update the cursor state from the samples of a high-rate cursor sampler.
+
+    Position, velocity and acceleration at the latest sample are taken from a quadratic
+    least-squares fit over the last fit_window_s seconds of samples, or from the estimator
+    after feeding it the samples it has not seen yet.
+
+    Returns:
+    - bool: False if there is no new sample or too few samples to fit, so the caller should
+      fall back to the latest sample of the ring.
+    """
+    latest = sampler_ring.latest()
+    if latest is None:
+        return False
+    if len(cursor_state["x"]) > 0 and latest[1] <= cursor_state["x"][-1][1]:
+        return False  # The sampler has not delivered since the previous tick
+
+    if estimator is None:
+        estimate = estimate_from_samples(sampler_ring.window(latest[1] - fit_window_s))
+        if estimate is None:
+            return False
+        x, dx, ddx, x_ts = estimate
+        x += cursor_state["x_offset_px"]
+    else:
+        x_offset_px = cursor_state["x_offset_px"]
+        t_from = latest[1] - fit_window_s if estimator.t is None else estimator.t
+        for x_s, t_s, _ in sampler_ring.window(t_from):
+            estimator.update(x_s + x_offset_px, t_s)
+        estimate = estimator.estimate()
+        if estimate is None:
+            return False
+        x, dx, ddx, x_ts = estimate
+
+    _append_estimate(cursor_state, plotable_datasets, meter_per_pixel, x, dx, ddx, x_ts, latest[2])
+    return True
+
+def _append_estimate(cursor_state, plotable_datasets, meter_per_pixel, x, dx, ddx, x_ts, poll_ts):
+    """
+    Append an estimate of the position and its derivatives at x_ts to the cursor state and plotable datasets.
+    """
+    dt = x_ts - cursor_state["x"][-1][1] if len(cursor_state["x"]) > 0 else 0.0
+    cursor_state["x"].append([x, x_ts, poll_ts])
+    plotable_datasets["x"].append(x)
+    if len(cursor_state["x"]) < 2:
+        return
+
+    cursor_state["dx"].append([dx, x_ts, dt])
+    plotable_datasets["dx"].append(dx)
+    cursor_state["h_s"].append(dt)
+    cursor_state["ddx"].append([ddx, x_ts, dt])
+    plotable_datasets["ddx"].append(ddx)
+
+    _append_q(cursor_state, plotable_datasets, meter_per_pixel, x, dx, ddx, x_ts)
@@ -0,0 +1,133 @@
+import threading
+import numpy as np
+from libs import rt_profile
+from threads_.numsim.libs.deadline_scheduler import deadline_scheduler, POLICY_SKIP
+
+class cursor_ring:
+    """
+    Single-producer, single-consumer ring of timestamped cursor positions.
+
+    The sampler thread writes a slot and only then publishes it by advancing the write
+    counter, so the physics thread can read every published slot without taking a lock.
+    Positions are stored unwrapped (the cursor replace counter already applied).
+
+    Attributes:
+        capacity (int): Number of samples kept.
+    """
+
+    def __init__(self, capacity=4096) -> None:
+        """
+        Initializes an empty ring.
+
+        Args:
+            capacity (int): Number of samples kept (default: 4096).
+        """
+        self.capacity = max(4, int(capacity))
+        self._data = np.zeros((self.capacity, 3))   # [x_px, timestamp, poll_ts]
+        self._written = 0
+
+    def __len__(self):
+        return min(self._written, self.capacity)
+
+    def push(self, x_px, timestamp, poll_ts):
+        """
+        Writes a sample. Called by the producer thread only.
+
+        Args:
+            x_px (float): Unwrapped cursor position in pixels.
+            timestamp (float): Time of the motion on the simulation clock.
+            poll_ts (float): Time the sample was polled on the simulation clock.
+        """
+        slot = self._written % self.capacity
+        self._data[slot, 0] = x_px
+        self._data[slot, 1] = timestamp
+        self._data[slot, 2] = poll_ts
+        self._written += 1
+
+    def latest(self):
+        """
+        Returns:
+            tuple or None: The latest (x_px, timestamp, poll_ts) sample, or None if the ring is empty.
+        """
+        written = self._written
+        if written == 0:
+            return None
+        x_px, timestamp, poll_ts = self._data[(written - 1) % self.capacity]
+        return x_px, timestamp, poll_ts
+
+    def window(self, t_from):
+        """
+        Copies the samples taken at or after the given time.
+
+        Args:
+            t_from (float): Start of the window on the simulation clock.
+
+        Returns:
+            numpy.ndarray: Array of shape (n, 3) with [x_px, timestamp, poll_ts] rows, oldest first.
+        """
+        written = self._written
+        # Leave a margin of slots the producer may be overwriting while we copy
+        n = min(written, self.capacity - 2)
+        if n <= 0:
+            return np.zeros((0, 3))
+        idx = np.arange(written - n, written) % self.capacity
+        samples = self._data[idx]
+        return samples[samples[:, 1] >= t_from]
+
+class cursor_sampler_t(threading.Thread):
+    """
+    Lightweight thread that samples the cursor at a high rate into a cursor_ring.
+
+    The physics step runs at the simulation rate and consumes the samples taken since its
+    previous tick, so its input derivatives are estimated from many samples instead of the
+    difference of two sparse ones.
+
+    Attributes:
+        ring (cursor_ring): The ring the samples are written into.
+        rate_hz (float): Sampling rate.
+    """
+
+    def __init__(self, SIM_STATE_ref, rate_hz=1000, capacity=4096) -> None:
+        """
+        Initializes the sampler thread.
+
+        Args:
+            SIM_STATE_ref (SIM_STATE): Reference to the simulation state.
+            rate_hz (float): Sampling rate (default: 1000).
+            capacity (int): Number of samples kept in the ring (default: 4096).
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.SIM_STATE = SIM_STATE_ref
+        self.rate_hz = float(rate_hz)
+        self.ring = cursor_ring(capacity)
+        self.running = True
+
+    def sample(self):
+        """
+        Takes one sample.
+
+        The backend delivers unwrapped positions, so samples taken around a cursor warp of
+        the infinite space are kept like any other. Every motion event of a relative backend
+        since the previous sample is pushed with its own timestamp, and the unchanged position
+        with the current time if there was none.
+        """
+        backend = self.SIM_STATE.input_backend
+        positions = backend.read() or [backend.hold()]
+        for x, x_ts, poll_ts in positions:
+            self.ring.push(x, x_ts, poll_ts)
+
+    def stop(self):
+        """
+        Requests the thread to stop after the current sample.
+        """
+        self.running = False
+
+    def run(self) -> None:
+        """
+        Samples the cursor until stopped or until the simulation stops.
+        """
+        self.SIM_STATE.rt_profile.apply(rt_profile.ROLE_INPUT)
+        scheduler = deadline_scheduler(1 / self.rate_hz, POLICY_SKIP, spin_s=0)
+        while self.running and self.SIM_STATE.run_status() != 0:
+            self.sample()
+            scheduler.wait()
@@ -0,0 +1,171 @@
+import math
+import time
+
+# Policies for ticks whose deadline has already passed
+POLICY_CATCH_UP = "catch_up"   # Run the missed ticks back-to-back (at most max_catch_up of them)
+POLICY_SKIP = "skip"           # Drop the missed ticks and realign to the next deadline on the grid
+
+class deadline_scheduler:
+    """
+    Fixed-rate tick scheduler driven by absolute deadlines.
+
+    Deadlines lie on the grid start + n * period, so the time spent on the work of a tick
+    and the oversleep of the OS do not accumulate into drift. Waiting sleeps until shortly
+    before the deadline and spins the rest of the way. Every tick is accounted for: its
+    lateness against the deadline, whether it overran, and how many ticks were skipped.
+
+    Attributes:
+        period_s (float): Target tick period in seconds.
+        policy (str): POLICY_CATCH_UP or POLICY_SKIP.
+        spin_s (float): Time before a deadline that is spun instead of slept.
+        max_catch_up (int): Maximum number of missed ticks run back-to-back with POLICY_CATCH_UP.
+        stats (dict): Statistics of the ticks since the last reset_stats() call.
+        last_overrun (bool): True if the latest tick was an overrun.
+    """
+
+    def __init__(self, period_s, policy=POLICY_CATCH_UP, spin_s=0.002, max_catch_up=3, clock=time.perf_counter, sleep=time.sleep) -> None:
+        """
+        Initializes the scheduler. The grid starts at the first start() or wait() call.
+
+        Args:
+            period_s (float): Target tick period in seconds.
+            policy (str): Policy for late ticks (default: POLICY_CATCH_UP).
+            spin_s (float): Spin time before each deadline in seconds (default: 0.002).
+            max_catch_up (int): Maximum number of missed ticks to catch up (default: 3).
+            clock (callable): Monotonic clock in seconds (default: time.perf_counter).
+            sleep (callable): Sleep function (default: time.sleep).
+        """
+        if period_s <= 0:
+            raise ValueError("The tick period must be positive.")
+        if policy not in (POLICY_CATCH_UP, POLICY_SKIP):
+            raise ValueError(f"Unknown tick policy: {policy}")
+
+        self.period_s = float(period_s)
+        self.policy = policy
+        self.spin_s = max(0.0, float(spin_s))
+        self.max_catch_up = max(0, int(max_catch_up))
+        self.clock = clock
+        self.sleep = sleep
+
+        self._next_deadline = None
+        self._last_tick = None
+        self.last_overrun = False
+        self.reset_stats()
+
+    def start(self):
+        """
+        (Re)starts the deadline grid one period from now.
+        """
+        self._next_deadline = self.clock() + self.period_s
+        self._last_tick = None
+
+    def reset_stats(self):
+        """
+        Starts a new statistics window. The previous stats dict is left untouched, so a
+        reference to it (e.g. in a round being saved) keeps its values.
+
+        Returns:
+            dict: The new, empty stats dict.
+        """
+        self._period_sum = 0.0
+        self._period_sq_sum = 0.0
+        self._period_count = 0
+        self.stats = {
+            "policy": self.policy,
+            "target_period_s": self.period_s,
+            "ticks": 0,
+            "overruns": 0,
+            "skipped_ticks": 0,
+            "max_lateness_s": 0.0,
+            "mean_period_s": 0.0,
+            "period_jitter_s": 0.0,
+            "achieved_rate_hz": 0.0
+        }
+        return self.stats
+
+    def _wait_until(self, deadline):
+        """
+        Sleeps until spin_s before the deadline, then spins until the deadline.
+        """
+        remaining = deadline - self.clock()
+        if remaining > self.spin_s:
+            self.sleep(remaining - self.spin_s)
+        while self.clock() < deadline:
+            # Yield the GIL so the other threads are not starved while spinning
+            self.sleep(0)
+
+    def wait(self):
+        """
+        Blocks until the next tick is due and advances the deadline grid.
+
+        Returns:
+            float: Lateness of the tick against its deadline in seconds (0 or positive).
+        """
+        waited = self.time_to_deadline() > 0
+        if waited:
+            self._wait_until(self._next_deadline)
+        return self.mark_tick(waited)
+
+    def time_to_deadline(self):
+        """
+        Returns:
+            float: Seconds until the next deadline (negative if it has passed).
+        """
+        if self._next_deadline is None:
+            self.start()
+        return self._next_deadline - self.clock()
+
+    def mark_tick(self, waited=True):
+        """
+        Accounts for a tick and advances the deadline grid, for callers that do their own
+        waiting (e.g. an asyncio task sleeping until time_to_deadline()).
+
+        Args:
+            waited (bool): False if the deadline had already passed before waiting, which counts as an overrun.
+
+        Returns:
+            float: Lateness of the tick against its deadline in seconds (0 or positive).
+        """
+        if self._next_deadline is None:
+            self.start()
+
+        deadline = self._next_deadline
+        now = self.clock()
+        self.last_overrun = not waited
+        if waited:
+            self._next_deadline = deadline + self.period_s
+        else:
+            # Overrun: the previous tick's work ended after this tick's deadline
+            self.stats["overruns"] += 1
+            missed = int((now - deadline) // self.period_s)
+            if self.policy == POLICY_SKIP:
+                skipped = missed
+            else:
+                skipped = max(0, missed - self.max_catch_up)
+            self.stats["skipped_ticks"] += skipped
+            self._next_deadline = deadline + (skipped + 1) * self.period_s
+
+        lateness = max(0.0, now - deadline)
+        self._record_tick(now, lateness)
+        return lateness
+
+    def _record_tick(self, now, lateness):
+        """
+        Updates the statistics with a tick that fired at `now`.
+        """
+        stats = self.stats
+        stats["ticks"] += 1
+        if lateness > stats["max_lateness_s"]:
+            stats["max_lateness_s"] = lateness
+
+        if self._last_tick is not None:
+            period = now - self._last_tick
+            self._period_count += 1
+            self._period_sum += period
+            self._period_sq_sum += period * period
+
+            mean = self._period_sum / self._period_count
+            stats["mean_period_s"] = mean
+            stats["period_jitter_s"] = math.sqrt(max(0.0, self._period_sq_sum / self._period_count - mean * mean))
+            stats["achieved_rate_hz"] = 1 / mean if mean > 0 else 0.0
+        self._last_tick = now
@@ -0,0 +1,398 @@
+import math
+import threading
+from collections import deque
+import numpy as np
+
+# Names of the estimators in input_config.derivative_estimator
+ESTIMATOR_FIT = "fit"           # Quadratic fit over the sampler window, finite differences without a sampler
+ESTIMATOR_ABG = "abg"
+ESTIMATOR_KALMAN = "kalman"
+ESTIMATOR_SAVGOL = "savgol"
+
+# Results of describe() per (estimator, settings, rate); the characterization is deterministic
+_descriptions = {}
+_descriptions_lock = threading.Lock()
+
+class derivative_estimator:
+    """
+    Streaming estimator of the cursor position, velocity and acceleration.
+
+    Samples are fed one by one with update(); estimate() returns the estimate at the latest
+    sample. The work per sample does not grow with the length of the history. Samples not
+    newer than the latest one are ignored.
+
+    Attributes:
+        t (float): Timestamp of the latest sample, or None before the first one.
+    """
+
+    def reset(self):
+        """
+        Forgets the samples, e.g. at the start of a round.
+        """
+        raise NotImplementedError
+
+    def update(self, x, t):
+        """
+        Feeds a sample.
+
+        Args:
+            x (float): Position in px.
+            t (float): Timestamp in s.
+        """
+        raise NotImplementedError
+
+    def estimate(self):
+        """
+        Returns:
+            tuple or None: (x, dx, ddx, t) in px, px/s, px/s^2 at the latest sample, or None
+            before the estimator has settled on enough samples.
+        """
+        raise NotImplementedError
+
+    def settings(self):
+        """
+        Returns:
+            dict: The parameters that set the latency and noise trade-off of the estimator.
+        """
+        return {}
+
+class alpha_beta_gamma_estimator(derivative_estimator):
+    """
+    Alpha-beta-gamma tracker with a constant acceleration model over the actual sample
+    intervals. Larger gains follow the input faster but pass more noise. The cheapest of
+    the estimators, but with fixed gains it is only near-optimal for regular sampling.
+
+    Attributes:
+        alpha (float): Position gain.
+        beta (float): Velocity gain.
+        gamma (float): Acceleration gain.
+    """
+
+    def __init__(self, alpha=0.5, beta=0.1, gamma=0.01) -> None:
+        """
+        Args:
+            alpha (float): Position gain (default: 0.5).
+            beta (float): Velocity gain (default: 0.1).
+            gamma (float): Acceleration gain (default: 0.01).
+        """
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.reset()
+
+    def settings(self):
+        return {"alpha": self.alpha, "beta": self.beta, "gamma": self.gamma}
+
+    def reset(self):
+        self.x = self.dx = self.ddx = 0.0
+        self.t = None
+        self.n = 0
+        self._dt = None
+
+    def update(self, x, t):
+        if self.t is None:
+            self.x, self.t, self.n = x, t, 1
+            return
+        dt = t - self.t
+        if dt <= 0:
+            return
+        # Predict with the constant acceleration model, then correct by the residual
+        x_p = self.x + self.dx * dt + 0.5 * self.ddx * dt * dt
+        dx_p = self.dx + self.ddx * dt
+        r = x - x_p
+
+        # The corrections are scaled with the mean interval: scaled with the interval itself,
+        # a short interval after a long one amplifies the residual enough to diverge
+        self._dt = dt if self._dt is None else self._dt + 0.05 * (dt - self._dt)
+        self.x = x_p + self.alpha * r
+        self.dx = dx_p + self.beta * r / self._dt
+        self.ddx = self.ddx + 2 * self.gamma * r / (self._dt * self._dt)
+        self.t = t
+        self.n += 1
+
+    def estimate(self):
+        if self.n < 3:
+            return None
+        return self.x, self.dx, self.ddx, self.t
+
+class kalman_estimator(derivative_estimator):
+    """
+    Kalman filter with a constant acceleration model driven by white jerk. The process
+    noise is discretized over the actual sample intervals, so non-uniform sampling is
+    handled exactly.
+
+    Attributes:
+        jerk_psd (float): Spectral density of the jerk in px^2/s^5. Larger values follow
+            the input faster but pass more noise.
+        measurement_std_px (float): Standard deviation of the position noise in px.
+    """
+
+    def __init__(self, jerk_psd=1e7, measurement_std_px=1.0) -> None:
+        """
+        Args:
+            jerk_psd (float): Spectral density of the jerk in px^2/s^5 (default: 1e7).
+            measurement_std_px (float): Position noise in px (default: 1.0).
+        """
+        self.jerk_psd = jerk_psd
+        self.measurement_std_px = measurement_std_px
+        self.reset()
+
+    def settings(self):
+        return {"jerk_psd": self.jerk_psd, "measurement_std_px": self.measurement_std_px}
+
+    def reset(self):
+        # State [x, dx, ddx] and the upper triangle of its covariance, as scalars: a 3x3
+        # filter step in plain floats is several times faster than with numpy arrays
+        self.x = self.dx = self.ddx = 0.0
+        self.p00, self.p01, self.p02, self.p11, self.p12, self.p22 = 1e6, 0.0, 0.0, 1e8, 0.0, 1e10
+        self.t = None
+        self.n = 0
+
+    def update(self, x, t):
+        if self.t is None:
+            self.x, self.t, self.n = x, t, 1
+            return
+        dt = t - self.t
+        if dt <= 0:
+            return
+        h = 0.5 * dt * dt
+
+        # Predict: s = F s, P = F P F^T + Q with F = [[1, dt, h], [0, 1, dt], [0, 0, 1]]
+        x_p = self.x + dt * self.dx + h * self.ddx
+        dx_p = self.dx + dt * self.ddx
+        ddx_p = self.ddx
+        p00, p01, p02, p11, p12, p22 = self.p00, self.p01, self.p02, self.p11, self.p12, self.p22
+        a00 = p00 + dt * p01 + h * p02
+        a01 = p01 + dt * p11 + h * p12
+        a02 = p02 + dt * p12 + h * p22
+        a11 = p11 + dt * p12
+        a12 = p12 + dt * p22
+        q = self.jerk_psd
+        dt3 = dt * dt * dt
+        p00 = a00 + dt * a01 + h * a02 + q * dt3 * dt * dt / 20
+        p01 = a01 + dt * a02 + q * dt3 * dt / 8
+        p02 = a02 + q * dt3 / 6
+        p11 = a11 + dt * a12 + q * dt3 / 3
+        p12 = a12 + q * h
+        p22 = p22 + q * dt
+
+        # Correct with the position measurement, H = [1, 0, 0]
+        S = p00 + self.measurement_std_px ** 2
+        k0, k1, k2 = p00 / S, p01 / S, p02 / S
+        r = x - x_p
+        self.x = x_p + k0 * r
+        self.dx = dx_p + k1 * r
+        self.ddx = ddx_p + k2 * r
+        self.p00, self.p01, self.p02 = p00 - k0 * p00, p01 - k0 * p01, p02 - k0 * p02
+        self.p11, self.p12, self.p22 = p11 - k1 * p01, p12 - k1 * p02, p22 - k2 * p02
+        self.t = t
+        self.n += 1
+
+    def estimate(self):
+        if self.n < 3:
+            return None
+        return self.x, self.dx, self.ddx, self.t
+
+class savgol_estimator(derivative_estimator):
+    """
+    Causal Savitzky-Golay estimator: a least-squares polynomial fit over the last `window`
+    samples evaluated at the newest one. The fit coefficients are computed once for a
+    uniform grid and scaled with the mean sample interval of the window, so a sample costs
+    one fixed-length dot product per derivative. Jitter of the sample intervals shows up as
+    noise of the derivatives, mostly of the acceleration.
+
+    Attributes:
+        window (int): Number of samples of the fit.
+        order (int): Polynomial order of the fit (at least 2).
+    """
+
+    def __init__(self, window=15, order=2) -> None:
+        """
+        Args:
+            window (int): Number of samples of the fit (default: 15).
+            order (int): Polynomial order of the fit (default: 2).
+        """
+        self.order = max(2, int(order))
+        self.window = max(self.order + 1, int(window))
+        tau = np.arange(-(self.window - 1), 1, dtype=float)
+        A = np.vander(tau, self.order + 1, increasing=True)
+        coeffs = np.linalg.pinv(A)  # Row k gives the k-th polynomial coefficient at tau = 0
+        self._c_x = coeffs[0]
+        self._c_dx = coeffs[1]
+        self._c_ddx = 2 * coeffs[2]
+        self.reset()
+
+    def settings(self):
+        return {"window": self.window, "order": self.order}
+
+    def reset(self):
+        self._xs = deque(maxlen=self.window)
+        self._ts = deque(maxlen=self.window)
+        self.t = None
+
+    def update(self, x, t):
+        if self.t is not None and t <= self.t:
+            return
+        self._xs.append(x)
+        self._ts.append(t)
+        self.t = t
+
+    def estimate(self):
+        if len(self._xs) < self.window:
+            return None
+        xs = np.fromiter(self._xs, float, self.window)
+        dt = (self._ts[-1] - self._ts[0]) / (self.window - 1)
+        return (float(self._c_x @ xs), float(self._c_dx @ xs) / dt,
+                float(self._c_ddx @ xs) / (dt * dt), self._ts[-1])
+
+class window_fit_estimator(derivative_estimator):
+    """
+    Quadratic least-squares fit over the samples of the last window_s seconds, the estimator
+    of ESTIMATOR_FIT. Its cost grows with the number of samples in the window, so the
+    simulation fits the sampler ring directly; this class is used to characterize it.
+
+    Attributes:
+        window_s (float): Length of the fitted window in seconds.
+    """
+
+    def __init__(self, window_s=0.03) -> None:
+        """
+        Args:
+            window_s (float): Length of the fitted window in seconds (default: 0.03).
+        """
+        self.window_s = window_s
+        self.reset()
+
+    def settings(self):
+        return {"fit_window_s": self.window_s}
+
+    def reset(self):
+        self._samples = deque()
+        self.t = None
+
+    def update(self, x, t):
+        if self.t is not None and t <= self.t:
+            return
+        self._samples.append((x, t))
+        while self._samples[0][1] < t - self.window_s:
+            self._samples.popleft()
+        self.t = t
+
+    def estimate(self):
+        if len(self._samples) < 3:
+            return None
+        xs, ts = np.array(self._samples).T
+        c2, c1, c0 = np.polyfit(ts - self.t, xs, 2)
+        return c0, c1, 2 * c2, self.t
+
+def create_estimator(input_config):
+    """
+    Creates the estimator selected in the input configuration.
+
+    Args:
+        input_config (dict): The input_config section of the simulation configuration.
+
+    Returns:
+        derivative_estimator or None: The estimator, or None for ESTIMATOR_FIT.
+    """
+    name = input_config.get("derivative_estimator", ESTIMATOR_FIT)
+    if name == ESTIMATOR_ABG:
+        return alpha_beta_gamma_estimator(*input_config.get("estimator_abg_gains", [0.5, 0.1, 0.01]))
+    if name == ESTIMATOR_KALMAN:
+        return kalman_estimator(*input_config.get("estimator_kalman_noise", [1e7, 1.0]))
+    if name == ESTIMATOR_SAVGOL:
+        return savgol_estimator(input_config.get("estimator_savgol_window", 15))
+    if name != ESTIMATOR_FIT:
+        raise ValueError(f"Unknown derivative estimator: {name}")
+    return None
+
+def characterize(estimator, rate_hz, freq_hz=1.0, amplitude_px=200.0, noise_std_px=1.0, jitter=0.2, duration_s=5.0, seed=0):
+    """
+    Measures the latency and the noise gain of an estimator at a sample rate.
+
+    The latency is the phase lag of the velocity and acceleration estimates on a sinusoidal
+    movement of freq_hz, expressed in seconds. The noise gain is the standard deviation of
+    the estimates on white position noise of noise_std_px. The samples are taken with a
+    uniform jitter of the sample times, as the sampler and the ticks see it. The estimator
+    is reset afterwards.
+
+    Args:
+        estimator (derivative_estimator): The estimator.
+        rate_hz (float): Sample rate the estimator is fed at.
+        freq_hz (float): Frequency of the test movement (default: 1.0).
+        amplitude_px (float): Amplitude of the test movement (default: 200.0).
+        noise_std_px (float): Standard deviation of the test noise (default: 1.0).
+        jitter (float): Jitter of the sample times as a fraction of the sample period (default: 0.2).
+        duration_s (float): Length of each test (default: 5.0).
+        seed (int): Seed of the test noise (default: 0).
+
+    Returns:
+        dict: dx_lag_s, ddx_lag_s, dx_noise_std, ddx_noise_std.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(0.0, duration_s, 1 / rate_hz)
+    t += rng.uniform(-jitter, jitter, len(t)) / rate_hz
+    w = 2 * math.pi * freq_hz
+
+    def run(xs):
+        estimator.reset()
+        out = []
+        half = len(t) // 2  # Past the transient of the start
+        for i, (x_i, t_i) in enumerate(zip(xs, t)):
+            estimator.update(x_i, t_i)
+            if i < half:
+                continue
+            estimate = estimator.estimate()
+            if estimate is not None:
+                out.append((t_i, estimate[1], estimate[2]))
+        estimator.reset()
+        return np.array(out).reshape(-1, 3)
+
+    est = run(amplitude_px * np.sin(w * t))
+    noise = run(noise_std_px * rng.standard_normal(len(t)))
+    if len(est) < 3 or len(noise) < 3:
+        raise ValueError("The estimator gives no estimates at this sample rate")
+    basis = np.column_stack([np.sin(w * est[:, 0]), np.cos(w * est[:, 0])])
+
+    def lag(values, true_phase):
+        a, b = np.linalg.lstsq(basis, values, rcond=None)[0]
+        dphi = (true_phase - math.atan2(b, a) + math.pi) % (2 * math.pi) - math.pi
+        return dphi / w
+
+    return {
+        "dx_lag_s": lag(est[:, 1], math.pi / 2),
+        "ddx_lag_s": lag(est[:, 2], math.pi),
+        "dx_noise_std": float(np.std(noise[:, 1])),
+        "ddx_noise_std": float(np.std(noise[:, 2]))
+    }
+
+def describe(input_config, rate_hz):
+    """
+    Characterizes the estimator selected in the input configuration at the rate it is fed.
+    The result is kept in run_conditions.input_estimator and saved with every round. It is
+    computed once per estimator, settings and rate, later calls return a copy of it.
+
+    Args:
+        input_config (dict): The input_config section of the simulation configuration.
+        rate_hz (float): Rate of the cursor samples (the sampler rate, or the tick rate without one).
+
+    Returns:
+        dict: The estimator, its parameters and the results of characterize().
+    """
+    name = input_config.get("derivative_estimator", ESTIMATOR_FIT)
+    estimator = create_estimator(input_config)
+    if estimator is None:
+        if input_config.get("cursor_sample_rate_hz", 1000) <= 0:
+            # Without a sampler the fit falls back to the finite differences of the tick reads
+            return {"estimator": "finite differences", "rate_hz": rate_hz}
+        estimator = window_fit_estimator(input_config.get("cursor_fit_window_s", 0.03))
+    record = {"estimator": name, **estimator.settings(), "rate_hz": rate_hz}
+    key = (type(estimator).__name__, repr(sorted(record.items())))
+    with _descriptions_lock:
+        if key in _descriptions:
+            return dict(_descriptions[key])
+        record.update(characterize(estimator, rate_hz))
+        _descriptions[key] = dict(record)
+    print(f"cursor estimator: {name}, dx lag: {record['dx_lag_s'] * 1000:.2f} ms, ddx lag: {record['ddx_lag_s'] * 1000:.2f} ms, "
+          f"noise per px: dx {record['dx_noise_std']:.1f} px/s, ddx {record['ddx_noise_std']:.0f} px/s^2")
+    return record
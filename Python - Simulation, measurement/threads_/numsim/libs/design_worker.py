@@ -0,0 +1,70 @@
+import queue
+import threading
+from libs import span_tracer
+
+class design_worker:
+    """
+    Computes the full control design reports of the rod length changes in the background.
+
+    A rod length change only needs the gain of the selected control method before the next
+    control step; the report with the eigenvalues, the controllability matrix and the gains
+    of every method is only saved with the round. The worker runs the reports on its own
+    thread with its own state_space instance, so the state space used by the simulation is
+    never changed behind its back. With a shared design cache, a report of a geometry seen
+    before is a cache hit.
+
+    Attributes:
+        state_space (state_space): State space the reports are computed with.
+        reports_done (int): Number of reports finished.
+    """
+
+    def __init__(self, state_space_obj) -> None:
+        """
+        Initializes the worker. The thread starts with the first submitted report.
+
+        Args:
+            state_space_obj (state_space): State space used only by the worker.
+        """
+        self.state_space = state_space_obj
+        self.reports_done = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def submit(self, reports, rho1, rho2, l1, l2, g):
+        """
+        Queues the report of a geometry.
+
+        Args:
+            reports (list): History the finished report is appended to.
+            rho1, rho2 (float): Mass densities of the rods.
+            l1, l2 (float): Lengths of the rods (l2 None for a single pendulum).
+            g (float): Gravitational acceleration.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="design reports", daemon=True)
+            self._thread.start()
+        self._queue.put((reports, (rho1, rho2, l1, l2, g)))
+
+    def wait(self):
+        """
+        Blocks until every submitted report is appended.
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self):
+        """
+        Computes the queued reports in submission order.
+        """
+        while True:
+            reports, params = self._queue.get()
+            try:
+                self.state_space.update_system_constants(*params)
+                with span_tracer.span("doReport"):
+                    reports.append(self.state_space.doReport())
+                self.reports_done += 1
+            except Exception as e:
+                print(f"design worker: report failed: {e}")
+                reports.append(None)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,165 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threads_.numsim.libs.state_space import state_space
+
+def planned_rod_lengths(config_dict, max_entries=256):
+    """
+    Lists the rod lengths a round goes through with the rod length schedule.
+
+    Follows the decreases of rod_length_schedule: with equal periods both rods are shortened
+    together, otherwise each rod on its own period, rod A first when both are due. The
+    polls of the schedule can reorder two decreases that are due close together, so the
+    lengths of the other order are listed as well. The list ends before a rod would reach
+    zero length.
+
+    Args:
+        config_dict (dict): The simulation configuration dictionary.
+        max_entries (int): Largest number of listed lengths (default: 256).
+
+    Returns:
+        list: (l1, l2) tuples, starting with the configured lengths.
+    """
+    geometry_config = config_dict["geometry_config"]
+    sim_config = config_dict["simulation_config"]
+    l1 = geometry_config["rod_a_length_m"]
+    l2 = geometry_config["rod_b_length_m"]
+    lengths = [(l1, l2)]
+    if sim_config["constant_rod_length"]:
+        return lengths
+
+    dl1, dt1 = sim_config["rod_a_dl_m"], sim_config["rod_a_dt_s"]
+    dl2, dt2 = sim_config["rod_b_dl_m"], sim_config["rod_b_dt_s"]
+    if dt1 == dt2:
+        steps = [((dl1, dl2), dt1)]
+    else:
+        steps = [((dl1, 0), dt1), ((0, dl2), dt2)]
+    # Decreases that change nothing are left out, so every step reaches new lengths
+    steps = [(dl, dt) for dl, dt in steps if dt > 0.0001 and (dl[0] != 0 or (l2 is not None and dl[1] != 0))]
+    next_ts = [dt for _, dt in steps]
+
+    def shrink(pair, dl):
+        return pair[0] - dl[0], None if pair[1] is None else pair[1] - dl[1]
+
+    def valid(pair):
+        return pair[0] > 0 and (pair[1] is None or pair[1] > 0)
+
+    seen = {lengths[0]}
+    current = lengths[0]
+    while steps and len(lengths) < max_entries:
+        i_due = min(range(len(steps)), key=lambda i: next_ts[i])
+        for i, (dl, _) in enumerate(steps):
+            other = shrink(current, dl)
+            if i != i_due and valid(other) and other not in seen:
+                seen.add(other)
+                lengths.append(other)
+        current = shrink(current, steps[i_due][0])
+        next_ts[i_due] += steps[i_due][1]
+        if not valid(current):
+            break
+        if current not in seen:
+            seen.add(current)
+            lengths.append(current)
+    return lengths[:max_entries]
+
+def _length_key(l1, l2):
+    return round(l1, 9), None if l2 is None else round(l2, 9)
+
+class gain_schedule:
+    """
+    State feedback gains of the rod lengths a round goes through, designed ahead of the round.
+
+    precompute() designs the gains of a list of rod lengths on a pool of worker threads,
+    each with its own state_space instance; the Riccati solvers spend most of their time in
+    LAPACK, outside the GIL, so the designs run in parallel. The gains are kept in a table
+    indexed by (l1, l2), and a rod length change during the round takes its gain from the
+    table instead of designing it.
+
+    Attributes:
+        method (str): Control method of the table, or None before precompute().
+        workers (int): Number of worker threads.
+        stats (dict): Numbers of table hits and table misses.
+    """
+
+    def __init__(self, state_space_args, rho1, rho2, g, workers=4) -> None:
+        """
+        Initializes an empty table.
+
+        Args:
+            state_space_args (tuple): Arguments of the state_space instances of the workers.
+            rho1, rho2 (float): Mass densities of the rods.
+            g (float): Gravitational acceleration.
+            workers (int): Number of worker threads (default: 4).
+        """
+        self.state_space_args = state_space_args
+        self.rho1 = rho1
+        self.rho2 = rho2
+        self.g = g
+        self.workers = max(1, int(workers))
+        self.method = None
+        self.stats = {"hits": 0, "misses": 0}
+        self._table = {}
+        self._futures = []
+        self._start_ts = None
+        self._local = threading.local()
+
+    def precompute(self, method, lengths):
+        """
+        Starts designing the gains of the given rod lengths in the background.
+
+        Args:
+            method (str): Control method, "lqr" or "h_inf"; other methods need no table.
+            lengths (list): (l1, l2) tuples.
+        """
+        if method not in ("lqr", "h_inf"):
+            return
+        self.method = method
+        self._table = {}
+        self._start_ts = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="gain schedule")
+        self._futures = [executor.submit(self._design, method, l1, l2) for l1, l2 in lengths]
+        executor.shutdown(wait=False)
+
+    def wait(self):
+        """
+        Blocks until the gains started by precompute() are designed.
+        """
+        futures, self._futures = self._futures, []
+        if not futures:
+            return
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"gain schedule: design failed: {e}")
+        print(f"gain schedule: {len(self._table)} {self.method} gains designed in {time.perf_counter() - self._start_ts:.2f} s")
+
+    def lookup(self, method, l1, l2):
+        """
+        Looks up the gains of rod lengths.
+
+        Args:
+            method (str): Control method.
+            l1, l2 (float): Lengths of the rods.
+
+        Returns:
+            tuple: The gains (K_1, K_2, K_3, K_4), or None if the table has none.
+        """
+        if method != self.method:
+            return None
+        K = self._table.get(_length_key(l1, l2))
+        self.stats["hits" if K is not None else "misses"] += 1
+        return K
+
+    def _design(self, method, l1, l2):
+        """
+        Designs the gains of one pair of rod lengths on a worker thread.
+        """
+        state_space_obj = getattr(self._local, "state_space", None)
+        if state_space_obj is None:
+            state_space_obj = self._local.state_space = state_space(*self.state_space_args)
+            state_space_obj.verbose = False
+        state_space_obj.update_system_constants(self.rho1, self.rho2, l1, l2, self.g)
+        K = state_space_obj.design_gain(method)
+        if K is not None:
+            self._table[_length_key(state_space_obj.l1, state_space_obj.l2)] = tuple(K.flatten())
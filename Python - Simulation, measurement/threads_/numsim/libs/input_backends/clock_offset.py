@@ -0,0 +1,151 @@
+from collections import deque
+import numpy as np
+
+class clock_offset_estimator:
+    """
+    Maps the timestamps of an input source clock onto the simulation clock.
+
+    Devices and the OS stamp their events on their own clocks (the kernel input clock of
+    evdev, the SDL tick counter). For every event the difference between the simulation
+    time it was received at and its source timestamp is the clock offset plus the delivery
+    delay of that event. The delivery delay is never negative, so the minimum difference
+    over a sliding window is the best estimate of the offset; the window lets the estimate
+    follow a drift of the two clocks. A source timestamp plus the offset is the time of the
+    event on the simulation clock, free of the delivery and polling jitter.
+
+    The estimate and the delivery delays are kept in record, which the simulation state
+    saves with every round as run_conditions.input_clock.
+
+    Attributes:
+        source (str): Name of the source clock.
+        window_s (float): Length of the sliding window in seconds.
+        offset_s (float): Current offset estimate (simulation time - source time), or None.
+        record (dict): Offset estimate and delivery delay statistics.
+    """
+
+    def __init__(self, source, window_s=5.0) -> None:
+        """
+        Initializes the estimator without an offset.
+
+        Args:
+            source (str): Name of the source clock.
+            window_s (float): Length of the sliding window in seconds (default: 5.0).
+        """
+        self.source = source
+        self.window_s = window_s
+        self.offset_s = None
+        # Offset candidates of the window as [received, offset], increasing in both
+        self._candidates = deque()
+        self.record = {
+            "source": source,
+            "offset_s": None,
+            "events": 0,
+            "mean_delay_s": 0.0,
+            "max_delay_s": 0.0
+        }
+
+    def to_sim(self, source_ts, received_ts):
+        """
+        Converts an event timestamp and updates the offset estimate with it.
+
+        Args:
+            source_ts (float): Timestamp of the event on the source clock in seconds.
+            received_ts (float): Simulation time the event was received at.
+
+        Returns:
+            float: Time of the event on the simulation clock.
+        """
+        self.offset_s = self._update_offset(source_ts, received_ts)
+
+        sim_ts = source_ts + self.offset_s
+        delay = received_ts - sim_ts
+        record = self.record
+        record["events"] += 1
+        record["offset_s"] = self.offset_s
+        record["mean_delay_s"] += (delay - record["mean_delay_s"]) / record["events"]
+        if delay > record["max_delay_s"]:
+            record["max_delay_s"] = delay
+        return sim_ts
+
+    def _update_offset(self, source_ts, received_ts):
+        """
+        Returns:
+            float: The offset for an event, the minimum offset of the window.
+        """
+        offset = received_ts - source_ts
+        candidates = self._candidates
+        while candidates and candidates[-1][1] >= offset:
+            candidates.pop()
+        candidates.append((received_ts, offset))
+        while candidates[0][0] < received_ts - self.window_s:
+            candidates.popleft()
+        return candidates[0][1]
+
+class clock_drift_estimator(clock_offset_estimator):
+    """
+    Clock offset estimator that also follows a rate difference (drift) of the source clock.
+
+    A sender on another machine runs on a clock that is offset and drifts against the
+    simulation clock. The minimum offset is taken per bucket of bucket_s seconds; the minima
+    of the latest buckets lie on the offset line of the two clocks, and a least-squares line
+    through them gives the offset and the drift. Until three buckets are complete, the
+    sliding-window minimum is used.
+
+    Attributes:
+        drift (float): Offset change per second of the source clock.
+    """
+
+    def __init__(self, source, bucket_s=0.5, buckets=20) -> None:
+        """
+        Initializes the estimator without an offset.
+
+        Args:
+            source (str): Name of the source clock.
+            bucket_s (float): Length of a bucket in seconds (default: 0.5).
+            buckets (int): Number of bucket minima the line is fitted to (default: 20).
+        """
+        super().__init__(source, bucket_s * buckets)
+        self.bucket_s = bucket_s
+        self.drift = 0.0
+        self._minima = deque(maxlen=buckets)    # (source_ts, offset) of the completed buckets
+        self._bucket = None                     # [start, source_ts, offset] of the current bucket
+        self._line = None                       # (source_ts, offset) of the line at its reference point
+        self.record["drift_ppm"] = 0.0
+
+    def _update_offset(self, source_ts, received_ts):
+        """
+        Returns:
+            float: The offset for an event, from the fitted line if there is one.
+        """
+        offset = received_ts - source_ts
+        bucket = self._bucket
+        if bucket is None or received_ts - bucket[0] >= self.bucket_s:
+            if bucket is not None:
+                self._minima.append((bucket[1], bucket[2]))
+                self._fit_line()
+            self._bucket = bucket = [received_ts, source_ts, offset]
+        elif offset < bucket[2]:
+            bucket[1], bucket[2] = source_ts, offset
+
+        if self._line is None:
+            return super()._update_offset(source_ts, received_ts)
+        ref_ts, ref_offset = self._line
+        # A bucket minimum below the line means the clocks moved since the fit
+        return min(ref_offset + self.drift * (source_ts - ref_ts), bucket[2])
+
+    def _fit_line(self):
+        """
+        Fits the offset line to the bucket minima.
+        """
+        if len(self._minima) < 3:
+            return
+        ts = np.array([m[0] for m in self._minima])
+        offsets = np.array([m[1] for m in self._minima])
+        ref_ts = ts[-1]
+        tau = ts - ref_ts
+        tau_mean = tau.mean()
+        offset_mean = offsets.mean()
+        var = np.sum((tau - tau_mean) ** 2)
+        self.drift = float(np.sum((tau - tau_mean) * (offsets - offset_mean)) / var) if var > 0 else 0.0
+        self._line = (ref_ts, float(offset_mean - self.drift * tau_mean))
+        self.record["drift_ppm"] = self.drift * 1e6
@@ -0,0 +1,101 @@
+import threading
+import select
+from threads_.numsim.libs.input_backends.input_backend import input_backend
+from threads_.numsim.libs.input_backends.clock_offset import clock_offset_estimator
+
+try:
+    import evdev
+    from evdev import ecodes
+except ImportError:
+    evdev = None
+
+class evdev_backend(input_backend):
+    """
+    Raw relative counts of a Linux input device through evdev.
+
+    A reader thread blocks on the device and queues every REL_X event with its kernel
+    timestamp, mapped onto the simulation clock by the clock offset estimator. This is the
+    lowest latency input available without a kernel driver. The
+    counts are scaled to pixels by counts_per_px; there is no pointer acceleration and no
+    screen edge. Reading /dev/input/event* needs read access to the device (the input group).
+
+    Attributes:
+        device_path (str): Path of the device, or "" to use the first device with a REL_X axis.
+        counts_per_px (float): Device counts per screen pixel.
+    """
+
+    relative = True
+
+    def __init__(self, screen_width_px, device_path="", counts_per_px=1.0) -> None:
+        """
+        Initializes the backend. The device is opened in start().
+
+        Args:
+            screen_width_px (float): Width of the screen in pixels.
+            device_path (str): Path of the device (default: the first relative pointer).
+            counts_per_px (float): Device counts per screen pixel (default: 1.0).
+        """
+        super().__init__(screen_width_px)
+        if evdev is None:
+            raise RuntimeError("The evdev input backend needs the evdev package (pip install evdev).")
+        self.device_path = device_path
+        self.counts_per_px = float(counts_per_px) if counts_per_px else 1.0
+        self.source_clock = clock_offset_estimator("evdev")
+        self._device = None
+        self._thread = None
+        self._running = False
+
+    @staticmethod
+    def find_pointer_device():
+        """
+        Returns:
+            str or None: Path of the first input device with a REL_X axis.
+        """
+        for path in evdev.list_devices():
+            device = evdev.InputDevice(path)
+            rel_axes = device.capabilities().get(ecodes.EV_REL, [])
+            device.close()
+            if ecodes.REL_X in rel_axes:
+                return path
+        return None
+
+    def start(self):
+        """
+        Opens the device and starts the reader thread.
+        """
+        if self._thread is not None:
+            return
+        path = self.device_path or evdev_backend.find_pointer_device()
+        if path is None:
+            raise RuntimeError("The evdev input backend found no relative pointer device.")
+        self._device = evdev.InputDevice(path)
+        print(f"evdev input backend: {self._device.name} ({path})")
+        self._running = True
+        self._thread = threading.Thread(target=self._read_loop, name="evdev input", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the reader thread and closes the device.
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._device is not None:
+            self._device.close()
+            self._device = None
+
+    def _read_loop(self):
+        """
+        Queues the REL_X events of the device until stopped.
+        """
+        fd = self._device.fd
+        while self._running:
+            # Wake up regularly to notice stop()
+            readable, _, _ = select.select([fd], [], [], 0.1)
+            if not readable:
+                continue
+            for event in self._device.read():
+                if event.type == ecodes.EV_REL and event.code == ecodes.REL_X:
+                    self.push_source_delta(event.value / self.counts_per_px, event.timestamp())
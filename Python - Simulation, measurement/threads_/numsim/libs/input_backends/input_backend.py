@@ -0,0 +1,209 @@
+import threading
+from collections import deque
+from libs import sim_clock
+from threads_.numsim.libs.input_backends.motion_accumulator import motion_accumulator
+
+# Names of the backends in input_config.input_backend
+BACKEND_PYAUTOGUI = "pyautogui"
+BACKEND_PYGAME = "pygame"
+BACKEND_EVDEV = "evdev"
+BACKEND_X11 = "x11"
+BACKEND_NETWORK = "network"
+
+class input_backend:
+    """
+    Source of the horizontal cursor input of the simulation.
+
+    A backend delivers timestamped horizontal position deltas in screen pixels. Absolute
+    backends (pyautogui, x11) query the pointer position and report the difference to the
+    previous query. Relative backends (pygame, evdev) report the motion events of the
+    device with the timestamps of the events; as relative motion is not stopped by the
+    screen edges, they need no cursor warping for the infinite space.
+
+    read() turns the input into an unwrapped cursor position with the motion accumulator of
+    the backend: the position of a relative backend is the sum of its deltas, starting at
+    the screen center; the queried position of an absolute backend is unwrapped across the
+    pointer warps of the infinite space, which the GUI announces to the accumulator.
+
+    Every position carries two times on the simulation clock: the time of the motion and
+    the time it was polled. Backends whose events carry a source timestamp push them with
+    push_source_delta(), which maps the source clock onto the simulation clock with the
+    clock offset estimator of the backend; otherwise the motion time is the time the
+    motion was received or queried. The times delivered by read() and hold() never step
+    back: hold() stamps the current time, and an event that arrives later with an older
+    mapped time is clamped to the latest delivered time and counted in stats.
+
+    Subclasses either override read() (polled absolute backends) or call push_delta() from
+    the thread that receives the device events (relative backends).
+
+    Attributes:
+        relative (bool): True if the backend reports relative motion.
+        screen_width_px (float): Width of the screen in pixels.
+        accumulator (motion_accumulator): Unwrapped position of the backend.
+        x_px (float): Unwrapped position after the latest read.
+        source_clock (clock_offset_estimator): Offset estimate of the event source clock, or None
+            if the events carry no source timestamp.
+        stats (dict): Input statistics of the current round, or None if the backend keeps none.
+    """
+
+    relative = False
+
+    def __init__(self, screen_width_px, maxlen=8192) -> None:
+        """
+        Initializes the backend with the position at the screen center.
+
+        Args:
+            screen_width_px (float): Width of the screen in pixels.
+            maxlen (int): Maximum number of deltas kept between two reads (default: 8192).
+        """
+        self.screen_width_px = screen_width_px
+        self.accumulator = motion_accumulator(round(screen_width_px / 2))
+        self._deltas = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._started = False
+        self.source_clock = None
+        self.stats = None
+        self._last_ts = None
+
+    @property
+    def x_px(self):
+        return self.accumulator.x_px
+
+    def start(self):
+        """
+        Starts delivering input. Called by the first read(), on the thread that reads the backend.
+        """
+
+    def stop(self):
+        """
+        Stops delivering input and releases the device.
+        """
+
+    def reset_stats(self):
+        """
+        Starts the input statistics of a new round.
+        """
+        self.stats = {"clamped_events": 0}
+
+    def push_delta(self, dx_px, timestamp):
+        """
+        Queues a delta received from the device.
+
+        Args:
+            dx_px (float): Horizontal motion in pixels.
+            timestamp (float): Time of the motion on the simulation clock.
+        """
+        with self._lock:
+            self._deltas.append((dx_px, timestamp))
+
+    def push_source_delta(self, dx_px, source_ts):
+        """
+        Queues a delta stamped by the device or the OS, converting its timestamp to the
+        simulation clock.
+
+        Args:
+            dx_px (float): Horizontal motion in pixels.
+            source_ts (float): Time of the motion on the source clock in seconds.
+        """
+        self.push_delta(dx_px, self.source_clock.to_sim(source_ts, sim_clock.now()))
+
+    def read_deltas(self):
+        """
+        Takes the deltas received since the previous call.
+
+        Returns:
+            list: (dx_px, timestamp) tuples, oldest first.
+        """
+        with self._lock:
+            deltas = list(self._deltas)
+            self._deltas.clear()
+        return deltas
+
+    def read(self):
+        """
+        Reads the input since the previous call as positions.
+
+        Returns:
+            list: (x_px, timestamp, poll_ts) tuples, oldest first. Empty if there was no motion.
+        """
+        self._ensure_started()
+        poll_ts = sim_clock.now()
+        positions = []
+        for dx_px, timestamp in self.read_deltas():
+            if self._last_ts is not None and timestamp < self._last_ts:
+                # Older than a position already delivered, e.g. a hold() before the event was fed
+                timestamp = self._last_ts
+                if self.stats is not None:
+                    self.stats["clamped_events"] += 1
+            self._last_ts = timestamp
+            positions.append((self.accumulator.move(dx_px), timestamp, poll_ts))
+        return positions
+
+    def hold(self):
+        """
+        Reports the unchanged position when read() delivered nothing.
+
+        Returns:
+            tuple: (x_px, timestamp, poll_ts) of the position now, the timestamp not older than
+            the latest delivered one.
+        """
+        now = sim_clock.now()
+        if self._last_ts is None or now > self._last_ts:
+            self._last_ts = now
+        return self.x_px, self._last_ts, now
+
+    def _ensure_started(self):
+        if not self._started:
+            self._started = True
+            self.start()
+
+class polled_input_backend(input_backend):
+    """
+    Absolute backend that queries the pointer position on every read.
+
+    Subclasses implement query(). The pointer position carries no timestamp, so the motion
+    time and the poll time of a position are both the time of the query.
+    """
+
+    def query(self):
+        """
+        Returns:
+            tuple: (x_px, timestamp) of the pointer now.
+        """
+        raise NotImplementedError
+
+    def read(self):
+        self._ensure_started()
+        raw_x_px, timestamp = self.query()
+        return [(self.accumulator.track(raw_x_px), timestamp, timestamp)]
+
+def create_input_backend(input_config, screen_width_px):
+    """
+    Creates the backend selected in the input configuration.
+
+    Args:
+        input_config (dict): The input_config section of the simulation configuration.
+        screen_width_px (float): Width of the screen in pixels.
+
+    Returns:
+        input_backend: The backend.
+    """
+    name = input_config.get("input_backend", BACKEND_PYAUTOGUI)
+    # The backends are imported on demand, their platform dependencies are optional
+    if name == BACKEND_PYGAME:
+        from threads_.numsim.libs.input_backends.pygame_backend import pygame_backend
+        return pygame_backend(screen_width_px)
+    if name == BACKEND_EVDEV:
+        from threads_.numsim.libs.input_backends.evdev_backend import evdev_backend
+        return evdev_backend(screen_width_px, input_config.get("input_device", ""), input_config.get("input_counts_per_px", 1.0))
+    if name == BACKEND_X11:
+        from threads_.numsim.libs.input_backends.x11_backend import x11_backend
+        return x11_backend(screen_width_px)
+    if name == BACKEND_NETWORK:
+        from threads_.numsim.libs.input_backends.network_backend import network_backend
+        min_delay_s, max_delay_s = input_config.get("input_jitter_buffer_s", [0.002, 0.05])
+        return network_backend(screen_width_px, input_config.get("input_address", "udp://127.0.0.1:9870"), min_delay_s, max_delay_s)
+    if name != BACKEND_PYAUTOGUI:
+        raise ValueError(f"Unknown input backend: {name}")
+    from threads_.numsim.libs.input_backends.pyautogui_backend import pyautogui_backend
+    return pyautogui_backend(screen_width_px)
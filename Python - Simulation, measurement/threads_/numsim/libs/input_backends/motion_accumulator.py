@@ -0,0 +1,142 @@
+import threading
+import numpy as np
+from libs import sim_clock
+
+class motion_accumulator:
+    """
+    Unwrapped horizontal cursor position of an input backend.
+
+    Relative motion is summed up with move(), and the positions of an external device are
+    set with place(). An absolute pointer position is unwrapped with track() for the
+    infinite space, in which the GUI warps the pointer to the opposite screen edge: the GUI
+    announces every warp with warp() before it moves the pointer, and the announced warps
+    add up to the published shift. A read that jumps by the part of the
+    shift not applied yet was taken after the warp, and the jump is removed from its motion;
+    a read that does not show the jump was taken before the warp and is used as it is. So
+    no sample is dropped around a warp and the unwrapped position never jumps, whichever
+    thread runs first.
+
+    The published shift can be placed in shared memory with share(), so the warps announced
+    in the GUI process unwrap the reads of the physics process; unshare() copies it back
+    before the shared memory is released.
+
+    Attributes:
+        x_px (float): Unwrapped position in pixels.
+        wrap_log (list): Announced warps as [timestamp, from_px, to_px].
+    """
+
+    def __init__(self, x_px) -> None:
+        """
+        Initializes the accumulator at a position.
+
+        Args:
+            x_px (float): Initial position in pixels.
+        """
+        self.x_px = x_px
+        self.wrap_log = []
+        self._published = np.zeros(2)   # [warps, shift_px]
+        self._applied_px = 0.0          # Part of the published shift contained in x_px
+        self._raw_x_px = None
+        self._lock = threading.Lock()
+
+    def share(self, published):
+        """
+        Uses an external array, e.g. slots of a shared memory block, as the published shift.
+
+        Args:
+            published (numpy.ndarray): Array of 2 values [warps, shift_px].
+        """
+        with self._lock:
+            self._published = published
+            self._raw_x_px = None
+
+    def unshare(self):
+        """
+        Continues with a private copy of the published shift.
+        """
+        with self._lock:
+            self._published = np.array(self._published)
+
+    @property
+    def warps(self):
+        """
+        Returns:
+            int: Number of warps announced so far.
+        """
+        return int(self._published[0])
+
+    @property
+    def shift_px(self):
+        """
+        Returns:
+            float: Sum of the announced warps; the unwrapped position minus the pointer position.
+        """
+        return self._published[1]
+
+    def warp(self, from_px, to_px):
+        """
+        Announces a warp of the pointer. Called right before the pointer is moved.
+
+        Args:
+            from_px (float): Pointer position before the warp.
+            to_px (float): Pointer position after the warp.
+        """
+        with self._lock:
+            self.wrap_log.append([sim_clock.now(), from_px, to_px])
+            self._published[1] += from_px - to_px
+            self._published[0] += 1
+
+    def move(self, dx_px):
+        """
+        Adds relative motion.
+
+        Args:
+            dx_px (float): Horizontal motion in pixels.
+
+        Returns:
+            float: The unwrapped position.
+        """
+        with self._lock:
+            self.x_px += dx_px
+            return self.x_px
+
+    def place(self, x_px):
+        """
+        Sets a position that needs no unwrapping, e.g. of an external position device.
+
+        Args:
+            x_px (float): Position in pixels.
+
+        Returns:
+            float: The position.
+        """
+        with self._lock:
+            self.x_px = x_px
+            return x_px
+
+    def track(self, raw_x_px):
+        """
+        Unwraps a pointer position.
+
+        Args:
+            raw_x_px (float): Pointer position in pixels.
+
+        Returns:
+            float: The unwrapped position.
+        """
+        with self._lock:
+            shift_px = self._published[1]
+            if self._raw_x_px is None:
+                # First read: the pointer has taken every warp announced so far
+                self._applied_px = shift_px
+                self.x_px = raw_x_px + shift_px
+            else:
+                dx_px = raw_x_px - self._raw_x_px
+                pending_px = shift_px - self._applied_px
+                # The pending warps moved the pointer by -pending_px since the previous read
+                if pending_px != 0 and abs(dx_px + pending_px) < abs(dx_px):
+                    dx_px += pending_px
+                    self._applied_px = shift_px
+                self.x_px += dx_px
+            self._raw_x_px = raw_x_px
+            return self.x_px
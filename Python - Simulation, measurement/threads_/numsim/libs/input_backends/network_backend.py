@@ -0,0 +1,287 @@
+import heapq
+import os
+import socket
+import struct
+import threading
+from libs import sim_clock
+from threads_.numsim.libs.input_backends.input_backend import input_backend
+from threads_.numsim.libs.input_backends.clock_offset import clock_drift_estimator
+
+# Position packet: sequence number, sender time in s, position in px from the screen center
+PACKET = struct.Struct("<Idd")
+
+def parse_address(address):
+    """
+    Parses the address of a position stream.
+
+    Args:
+        address (str): "udp://host:port" or "unix:///path/of/socket".
+
+    Returns:
+        tuple: (socket family, address) of a datagram socket.
+    """
+    if address.startswith("udp://"):
+        host, _, port = address[len("udp://"):].rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    if address.startswith("unix://"):
+        return socket.AF_UNIX, address[len("unix://"):]
+    raise ValueError(f"Unknown input address: {address}")
+
+class jitter_buffer:
+    """
+    Adaptive playout buffer of timestamped samples.
+
+    Samples are released in timestamp order once the playout clock, the simulation time
+    minus the playout delay, passes their timestamp, so reordered packets are put back in
+    order and the samples reach the physics evenly spaced. The target delay follows the
+    delivery delay: its exponential average plus four times the average deviation (the
+    adaptive playout of packet audio), clamped to [min_delay_s, max_delay_s]. The delay
+    moves towards the target by at most slew seconds per second, so the playout clock
+    never steps back; a sample arriving behind the playout clock is dropped as late.
+
+    Attributes:
+        delay_s (float): Current playout delay.
+        playout_ts (float): Current playout clock, or None before the first advance().
+        late (int): Number of samples dropped as late.
+    """
+
+    def __init__(self, min_delay_s=0.002, max_delay_s=0.05, alpha=0.99, slew=0.5) -> None:
+        """
+        Initializes an empty buffer.
+
+        Args:
+            min_delay_s (float): Smallest playout delay (default: 0.002).
+            max_delay_s (float): Largest playout delay (default: 0.05).
+            alpha (float): Weight of the history in the delay averages (default: 0.99).
+            slew (float): Largest change of the delay per second, below 1 (default: 0.5).
+        """
+        self.min_delay_s = min_delay_s
+        self.max_delay_s = max_delay_s
+        self.alpha = alpha
+        self.slew = slew
+        self.delay_s = min_delay_s
+        self.playout_ts = None
+        self.late = 0
+        self._target_delay_s = min_delay_s
+        self._mean_delay_s = None
+        self._deviation_s = 0.0
+        self._now = None
+        self._heap = []
+
+    def push(self, timestamp, received_ts, x_px):
+        """
+        Buffers a sample.
+
+        Args:
+            timestamp (float): Time of the sample on the simulation clock.
+            received_ts (float): Simulation time the sample was received at.
+            x_px (float): Position in pixels.
+
+        Returns:
+            bool: False if the sample was dropped as late.
+        """
+        delay = received_ts - timestamp
+        if self._mean_delay_s is None:
+            self._mean_delay_s = delay
+        a = self.alpha
+        self._mean_delay_s = a * self._mean_delay_s + (1 - a) * delay
+        self._deviation_s = a * self._deviation_s + (1 - a) * abs(delay - self._mean_delay_s)
+        self._target_delay_s = min(max(self._mean_delay_s + 4 * self._deviation_s, self.min_delay_s), self.max_delay_s)
+
+        if self.playout_ts is not None and timestamp <= self.playout_ts:
+            self.late += 1
+            return False
+        heapq.heappush(self._heap, (timestamp, x_px))
+        return True
+
+    def advance(self, now):
+        """
+        Advances the playout clock and takes the samples it passed.
+
+        Args:
+            now (float): Current simulation time.
+
+        Returns:
+            list: (timestamp, x_px) tuples, oldest first.
+        """
+        if self._now is None:
+            self.delay_s = self._target_delay_s
+        else:
+            step = self.slew * max(0.0, now - self._now)
+            self.delay_s += min(max(self._target_delay_s - self.delay_s, -step), step)
+        self._now = now
+        playout_ts = now - self.delay_s
+        if self.playout_ts is None or playout_ts > self.playout_ts:
+            self.playout_ts = playout_ts
+
+        ready = []
+        heap = self._heap
+        while heap and heap[0][0] <= self.playout_ts:
+            ready.append(heapq.heappop(heap))
+        return ready
+
+class network_backend(input_backend):
+    """
+    Positions of an external device (a force handle, a motion tracker) received over UDP
+    or a Unix datagram socket.
+
+    The sender publishes PACKET datagrams of timestamped positions. A receiver thread maps
+    the sender timestamps onto the simulation clock with a clock offset and drift
+    estimator and queues the positions in an adaptive jitter buffer. read() releases the
+    positions due for playout, and hold() stamps the unchanged position with the playout
+    clock, so the timestamps of the input never step back. The position is measured from
+    the screen center and not bound by the screen edges, so, like a relative backend, it
+    needs no cursor warping.
+
+    The packet loss, the late packets and the latency from the sender timestamp to the
+    playout are collected in stats, which restarts with every round.
+
+    Attributes:
+        address (str): Address the backend listens on.
+        jitter_buffer (jitter_buffer): Playout buffer of the received positions.
+        stats (dict): Loss and latency statistics of the current round.
+    """
+
+    relative = True
+
+    def __init__(self, screen_width_px, address="udp://127.0.0.1:9870", min_delay_s=0.002, max_delay_s=0.05) -> None:
+        """
+        Initializes the backend. The socket is opened in start().
+
+        Args:
+            screen_width_px (float): Width of the screen in pixels.
+            address (str): "udp://host:port" or "unix:///path" to listen on (default: udp://127.0.0.1:9870).
+            min_delay_s (float): Smallest playout delay of the jitter buffer (default: 0.002).
+            max_delay_s (float): Largest playout delay of the jitter buffer (default: 0.05).
+        """
+        super().__init__(screen_width_px)
+        self.address = address
+        self._family, self._sock_address = parse_address(address)
+        self.source_clock = clock_drift_estimator("network")
+        self.jitter_buffer = jitter_buffer(min_delay_s, max_delay_s)
+        self._center_px = round(screen_width_px / 2)
+        self._sock = None
+        self._thread = None
+        self._running = False
+        self.reset_stats()
+
+    def start(self):
+        """
+        Opens the socket and starts the receiver thread.
+        """
+        if self._thread is not None:
+            return
+        sock = socket.socket(self._family, socket.SOCK_DGRAM)
+        if self._family == socket.AF_UNIX and os.path.exists(self._sock_address):
+            os.unlink(self._sock_address)  # Left behind by a previous run
+        sock.bind(self._sock_address)
+        # Wake up regularly to notice stop()
+        sock.settimeout(0.1)
+        self._sock = sock
+        print(f"network input backend: listening on {self.address}")
+        self._running = True
+        self._thread = threading.Thread(target=self._receive_loop, name="network input", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the receiver thread and closes the socket.
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            if self._family == socket.AF_UNIX and os.path.exists(self._sock_address):
+                os.unlink(self._sock_address)
+
+    def reset_stats(self):
+        """
+        Starts the statistics of a new round.
+        """
+        with self._lock:
+            self._first_seq = None
+            self._max_seq = None
+            self._latency_sum_s = 0.0
+            self._late_before = self.jitter_buffer.late
+            self.stats = {
+                "address": self.address,
+                "packets": 0,
+                "lost": 0,
+                "late": 0,
+                "loss_ratio": 0.0,
+                "played": 0,
+                "mean_latency_s": 0.0,
+                "max_latency_s": 0.0,
+                "playout_delay_s": self.jitter_buffer.delay_s
+            }
+
+    def _receive_loop(self):
+        """
+        Buffers the received positions until stopped.
+        """
+        while self._running:
+            try:
+                data = self._sock.recv(PACKET.size)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if len(data) != PACKET.size:
+                continue
+            seq, source_ts, x_px = PACKET.unpack(data)
+            received_ts = sim_clock.now()
+            with self._lock:
+                timestamp = self.source_clock.to_sim(source_ts, received_ts)
+                self._count_packet(seq)
+                if not self.jitter_buffer.push(timestamp, received_ts, self._center_px + x_px):
+                    self.stats["late"] = self.jitter_buffer.late - self._late_before
+
+    def _count_packet(self, seq):
+        """
+        Updates the loss statistics with a received sequence number.
+        """
+        stats = self.stats
+        stats["packets"] += 1
+        if self._first_seq is None or seq < self._first_seq:
+            self._first_seq = seq
+        if self._max_seq is None or seq > self._max_seq:
+            self._max_seq = seq
+        expected = self._max_seq - self._first_seq + 1
+        stats["lost"] = max(0, expected - stats["packets"])
+        stats["loss_ratio"] = stats["lost"] / expected
+
+    def read(self):
+        """
+        Reads the positions due for playout.
+
+        Returns:
+            list: (x_px, timestamp, poll_ts) tuples, oldest first. Empty if none is due.
+        """
+        self._ensure_started()
+        poll_ts = sim_clock.now()
+        positions = []
+        with self._lock:
+            stats = self.stats
+            for timestamp, x_px in self.jitter_buffer.advance(poll_ts):
+                positions.append((self.accumulator.place(x_px), timestamp, poll_ts))
+                latency = poll_ts - timestamp
+                stats["played"] += 1
+                self._latency_sum_s += latency
+                stats["mean_latency_s"] = self._latency_sum_s / stats["played"]
+                if latency > stats["max_latency_s"]:
+                    stats["max_latency_s"] = latency
+            stats["playout_delay_s"] = self.jitter_buffer.delay_s
+        return positions
+
+    def hold(self):
+        """
+        Returns:
+            tuple: (x_px, timestamp, poll_ts) of the unchanged position at the playout clock.
+        """
+        poll_ts = sim_clock.now()
+        with self._lock:
+            timestamp = self.jitter_buffer.playout_ts
+        return self.x_px, poll_ts if timestamp is None else timestamp, poll_ts
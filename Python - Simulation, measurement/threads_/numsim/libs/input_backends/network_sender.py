@@ -0,0 +1,115 @@
+import heapq
+import socket
+import sys
+import threading
+import time
+import numpy as np
+from threads_.numsim.libs.input_backends.network_backend import PACKET, parse_address
+
+class synthetic_sender(threading.Thread):
+    """
+    Local stand-in for an external position device, for testing the network backend.
+
+    Sends a sine motion as position packets at a fixed rate. The sender clock is offset
+    and drifts against the local clock, every packet is delivered after a fixed delay plus
+    an exponentially distributed jitter (so packets can overtake each other), and packets
+    are dropped with the given probability.
+
+    Attributes:
+        sent (int): Number of packets sent.
+        dropped (int): Number of packets dropped on purpose.
+    """
+
+    def __init__(self, address, rate_hz=500, amplitude_px=300, freq_hz=0.5, loss=0.0, delay_s=0.001,
+                 jitter_s=0.002, clock_offset_s=0.0, drift_ppm=0.0, duration_s=None, seed=0) -> None:
+        """
+        Initializes the sender.
+
+        Args:
+            address (str): "udp://host:port" or "unix:///path" of the receiving backend.
+            rate_hz (float): Packet rate (default: 500).
+            amplitude_px (float): Amplitude of the motion in pixels (default: 300).
+            freq_hz (float): Frequency of the motion (default: 0.5).
+            loss (float): Probability of dropping a packet (default: 0.0).
+            delay_s (float): Fixed delivery delay (default: 0.001).
+            jitter_s (float): Mean of the random delivery delay (default: 0.002).
+            clock_offset_s (float): Sender clock at the start of the stream (default: 0.0).
+            drift_ppm (float): Rate difference of the sender clock (default: 0.0).
+            duration_s (float, optional): Length of the stream, endless if None.
+            seed (int): Seed of the loss and jitter (default: 0).
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.family, self.sock_address = parse_address(address)
+        self.rate_hz = float(rate_hz)
+        self.amplitude_px = amplitude_px
+        self.freq_hz = freq_hz
+        self.loss = loss
+        self.delay_s = delay_s
+        self.jitter_s = jitter_s
+        self.clock_offset_s = clock_offset_s
+        self.drift = drift_ppm * 1e-6
+        self.duration_s = duration_s
+        self.rng = np.random.default_rng(seed)
+        self.running = True
+        self.sent = 0
+        self.dropped = 0
+
+    def stop(self):
+        """
+        Requests the thread to stop.
+        """
+        self.running = False
+
+    def run(self) -> None:
+        """
+        Generates the packets and sends them at their delivery times.
+        """
+        sock = socket.socket(self.family, socket.SOCK_DGRAM)
+        in_flight = []  # (delivery time, seq, packet)
+        t0 = time.time()
+        next_ts = t0
+        seq = 0
+        try:
+            while self.running:
+                now = time.time()
+                if self.duration_s is not None and now - t0 > self.duration_s and not in_flight:
+                    break
+                while next_ts <= now and (self.duration_s is None or next_ts - t0 <= self.duration_s):
+                    t = next_ts - t0
+                    x_px = self.amplitude_px * np.sin(2 * np.pi * self.freq_hz * t)
+                    if self.rng.random() < self.loss:
+                        self.dropped += 1
+                    else:
+                        sender_ts = self.clock_offset_s + t * (1 + self.drift)
+                        delivery_ts = next_ts + self.delay_s + self.rng.exponential(self.jitter_s) if self.jitter_s > 0 else next_ts + self.delay_s
+                        heapq.heappush(in_flight, (delivery_ts, seq, PACKET.pack(seq, sender_ts, x_px)))
+                    seq += 1
+                    next_ts += 1 / self.rate_hz
+
+                while in_flight and in_flight[0][0] <= now:
+                    try:
+                        sock.sendto(heapq.heappop(in_flight)[2], self.sock_address)
+                        self.sent += 1
+                    except OSError:
+                        pass  # Receiver not listening yet
+
+                wake_ts = min(next_ts, in_flight[0][0]) if in_flight else next_ts
+                time.sleep(max(0.0, min(wake_ts - time.time(), 0.01)))
+        finally:
+            sock.close()
+
+if __name__ == "__main__":
+    # python -m threads_.numsim.libs.input_backends.network_sender [address] [loss] [jitter_s] [duration_s]
+    args = sys.argv[1:]
+    sender = synthetic_sender(
+        args[0] if len(args) > 0 else "udp://127.0.0.1:9870",
+        loss=float(args[1]) if len(args) > 1 else 0.0,
+        jitter_s=float(args[2]) if len(args) > 2 else 0.002,
+        duration_s=float(args[3]) if len(args) > 3 else None
+    )
+    sender.start()
+    try:
+        sender.join()
+    except KeyboardInterrupt:
+        sender.stop()
+    print(f"sent: {sender.sent}, dropped: {sender.dropped}")
@@ -0,0 +1,13 @@
+from libs import sim_clock
+import pyautogui
+from threads_.numsim.libs.input_backends.input_backend import polled_input_backend
+
+class pyautogui_backend(polled_input_backend):
+    """
+    Absolute pointer query through pyautogui. Works on every platform, but each query is a
+    comparatively slow cross-platform call and the position carries no event timestamp.
+    """
+
+    def query(self):
+        timestamp = sim_clock.now()
+        return pyautogui.position()[0], timestamp
@@ -0,0 +1,39 @@
+from libs import sim_clock
+from threads_.numsim.libs.input_backends.input_backend import input_backend
+from threads_.numsim.libs.input_backends.clock_offset import clock_offset_estimator
+
+class pygame_backend(input_backend):
+    """
+    Relative mouse motion from the pygame event queue.
+
+    pygame events can only be pumped by the thread owning the window, so the simulation
+    window feeds the MOUSEMOTION events into the backend with feed_motion(). With the input
+    grabbed and the cursor hidden, SDL reports relative motion that does not stop at the
+    screen edges, so no cursor warping is needed.
+
+    Events carrying the SDL event timestamp (milliseconds of the SDL tick counter) are
+    mapped onto the simulation clock by the clock offset estimator. The pygame releases that
+    do not expose it leave the events stamped when the window pumps them, up to one render
+    frame late. Only the thread execution mode of the physics engine can use this backend.
+    """
+
+    relative = True
+
+    def __init__(self, screen_width_px, maxlen=8192) -> None:
+        super().__init__(screen_width_px, maxlen)
+        self.source_clock = clock_offset_estimator("sdl")
+
+    def feed_motion(self, rel_x, timestamp_ms=None):
+        """
+        Feeds the horizontal motion of a MOUSEMOTION event.
+
+        Args:
+            rel_x (int): event.rel[0] of the event.
+            timestamp_ms (int, optional): SDL timestamp of the event. Defaults to the time it is fed.
+        """
+        if rel_x == 0:
+            return
+        if timestamp_ms is None:
+            self.push_delta(rel_x, sim_clock.now())
+        else:
+            self.push_source_delta(rel_x, timestamp_ms / 1000)
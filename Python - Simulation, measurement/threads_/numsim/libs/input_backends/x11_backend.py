@@ -0,0 +1,69 @@
+import ctypes
+import ctypes.util
+from libs import sim_clock
+from threads_.numsim.libs.input_backends.input_backend import polled_input_backend
+
+class x11_backend(polled_input_backend):
+    """
+    Absolute pointer query with XQueryPointer through libX11 (Linux/X11).
+
+    A direct round trip to the X server, much cheaper than the generic pyautogui query. The
+    display connection is opened by the thread that reads the backend, in start().
+    """
+
+    def __init__(self, screen_width_px) -> None:
+        """
+        Initializes the backend. libX11 is loaded in start().
+
+        Args:
+            screen_width_px (float): Width of the screen in pixels.
+        """
+        super().__init__(screen_width_px)
+        self._xlib = None
+        self._display = None
+        self._root = None
+        self._args = None
+
+    def start(self):
+        """
+        Opens the connection to the X server of $DISPLAY.
+        """
+        if self._display is not None:
+            return
+        lib_name = ctypes.util.find_library("X11")
+        if lib_name is None:
+            raise RuntimeError("The x11 input backend needs libX11.")
+        xlib = ctypes.CDLL(lib_name)
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xlib.XQueryPointer.argtypes = [ctypes.c_void_p, ctypes.c_ulong] + [ctypes.c_void_p] * 7
+        xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+
+        display = xlib.XOpenDisplay(None)
+        if not display:
+            raise RuntimeError("The x11 input backend could not open the X display.")
+        self._xlib = xlib
+        self._display = display
+        self._root = xlib.XDefaultRootWindow(display)
+
+        # Output arguments of XQueryPointer, allocated once
+        root_ret, child_ret = ctypes.c_ulong(), ctypes.c_ulong()
+        root_x, root_y, win_x, win_y = ctypes.c_int(), ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        mask = ctypes.c_uint()
+        self._root_x = root_x
+        self._args = [ctypes.byref(arg) for arg in (root_ret, child_ret, root_x, root_y, win_x, win_y, mask)]
+
+    def stop(self):
+        """
+        Closes the connection to the X server.
+        """
+        if self._display is not None:
+            self._xlib.XCloseDisplay(self._display)
+            self._display = None
+
+    def query(self):
+        timestamp = sim_clock.now()
+        self._xlib.XQueryPointer(self._display, self._root, *self._args)
+        return self._root_x.value, timestamp
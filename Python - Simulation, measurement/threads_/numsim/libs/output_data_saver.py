@@ -3,6 +3,7 @@ from copy import copy
 from datetime import datetime
 import os
 import yaml
+from libs import span_tracer
 
 class output_data_saver:
     """
@@ -33,18 +34,37 @@ class output_data_saver:
 
         Parameters:
             SIM_STATE_VAR (dict): Current state of the simulation.
+
+        Returns:
+            str: Path of the saved CSV file.
+        """
+        with span_tracer.span("save_new_round"):
+            if self.section_folder_path is None:
+                self.new_section()
+
+            self.round_counter += 1
+
+            sim_title = SIM_STATE_VAR["meta"]["SIM_TITLE"]
+            start_time = SIM_STATE_VAR["meta"]["START_SIM_TIMESTAMP"]
+
+            csv_file_name = output_data_saver.gen_file_name(sim_title, start_time, self.round_counter)
+
+            return output_data_saver._save_output_file(csv_file_name, self.section_folder_path, SIM_STATE_VAR)
+
+    def save_trace(self):
+        """
+        Save the recorded span trace into the folder of the current section.
+
+        Returns:
+            str: Path of the saved trace file.
         """
         if self.section_folder_path is None:
             self.new_section()
-        
-        self.round_counter += 1
-
-        sim_title = SIM_STATE_VAR["meta"]["SIM_TITLE"]
-        start_time = SIM_STATE_VAR["meta"]["START_SIM_TIMESTAMP"]
 
-        csv_file_name = output_data_saver.gen_file_name(sim_title, start_time, self.round_counter)
-        
-        output_data_saver._save_output_file(csv_file_name, self.section_folder_path, SIM_STATE_VAR)
+        file_name = f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        file_path = os.path.join(self.section_folder_path, file_name)
+        span_tracer.export_chrome_trace(file_path)
+        return file_path
 
     def new_section(self):
         """
@@ -215,7 +235,15 @@ class output_data_saver:
                                      "PD_PHI_2_D"],
             "run_conditions":       ["FRAME_TRIM",
                                      "TIME_DELAY_S",
-                                     "simulation_timer"]
+                                     "simulation_timer",
+                                     "scheduler_stats",
+                                     "rt_profile",
+                                     "gc_stats",
+                                     "overload_log",
+                                     "input_estimator",
+                                     "input_clock",
+                                     "wrap_log",
+                                     "input_stats"]
         }
 
         # Iterate over the keys and their corresponding values to write them into the CSV
@@ -268,6 +296,14 @@ class output_data_saver:
         SIM_STATE_VAR (dict): The simulation state variables containing the data.
         """
         
+        # x:
+        x_l = SIM_STATE_VAR["mouse_input"]["x"]
+        if x_l is not None:
+            writer.writerow(['#','mouse_input','x'])
+            writer.writerow(['*','x_px',"_"]+[d[0] for d in x_l])
+            writer.writerow(['*','timestamp',"_"]+[d[1] for d in x_l])
+            writer.writerow(['*','poll_timestamp',"_"]+[d[2] for d in x_l])
+
         # q_array_list:
         q_a_l = SIM_STATE_VAR["mouse_input"]["q_array_list"]
         if q_a_l is not None:
@@ -316,6 +352,7 @@ class output_data_saver:
             writer.writerow(['*', "LQR_K_opt", "_"] + [(str(d["LQR_K_opt"].tolist()) if d is not None else "None") for d in sys_reps_l])
             writer.writerow(['*', "t_span", "_"] + [(d["t_span"] if d is not None else "None") for d in sys_reps_l])
             writer.writerow(['*', "H_inf_K", "_"] + [(d["H_inf_K"] if d is not None else "None") for d in sys_reps_l])
+            writer.writerow(['*', "H_inf_gamma", "_"] + [(d["H_inf_gamma"] if d is not None else "None") for d in sys_reps_l])
 
         # PD_control_stack:
         PD_cs_l = SIM_STATE_VAR["PD_control"]["PD_control_stack"]
@@ -340,6 +377,9 @@ class output_data_saver:
         file_name (str): The name of the output file.
         folder_path (str): The directory where the file should be saved.
         SIM_STATE_VAR (dict): The simulation state variables to save.
+
+        Returns:
+        str: Path of the saved CSV file.
         """
         csv_file_path = os.path.join(folder_path, file_name)
 
@@ -357,4 +397,5 @@ class output_data_saver:
             # Write listable data
             output_data_saver.write_listable_datas(writer,SIM_STATE_VAR)
                 
-        print(f"Data successfully saved to {csv_file_path}.")
\ No newline at end of file
+        print(f"Data successfully saved to {csv_file_path}.")
+        return csv_file_path
\ No newline at end of file
@@ -0,0 +1,111 @@
+import time
+from libs.varstructs.SIM_STATE import SIM_STATE
+
+class rod_length_schedule:
+    """
+    Timed decrease of the rod lengths during a round.
+
+    With simulation_config.constant_rod_length disabled, rod A is shortened by rod_a_dl_m every
+    rod_a_dt_s seconds and rod B by rod_b_dl_m every rod_b_dt_s seconds. If both periods are
+    equal, the two rods are shortened together.
+
+    Attributes:
+        config_dict (dict): The simulation configuration dictionary.
+        SIM_STATE (SIM_STATE): The simulation state whose rod lengths are changed.
+    """
+
+    def __init__(self, config_dict_ref, SIM_STATE_ref: SIM_STATE) -> None:
+        """
+        Initializes the schedule.
+
+        Args:
+            config_dict_ref (dict): A reference to the simulation configuration dictionary.
+            SIM_STATE_ref (SIM_STATE): A reference to the SIM_STATE object.
+        """
+        self.config_dict = config_dict_ref
+        self.SIM_STATE = SIM_STATE_ref
+        self.rdt_cntr_strt_1 = -1
+        self.rdt_cntr_strt_2 = -1
+
+    def enabled(self):
+        """
+        Returns:
+            bool: True if the rod lengths change during a round.
+        """
+        return not self.config_dict["simulation_config"]["constant_rod_length"]
+
+    def restart(self, time_now=None):
+        """
+        Restarts the schedule at the start of a round.
+
+        Args:
+            time_now (float, optional): Start time. Defaults to the current time.
+        """
+        if not self.enabled():
+            return
+        time_now = time.time() if time_now is None else time_now
+
+        self.SIM_STATE.SIM_STATE_VAR["simulation_config"]["l1"] = []
+        self.SIM_STATE.SIM_STATE_VAR["simulation_config"]["l1"].append([
+            self.config_dict["geometry_config"]["rod_a_length_m"], 0])
+        self.SIM_STATE.SIM_STATE_VAR["simulation_config"]["l2"] = []
+        self.SIM_STATE.SIM_STATE_VAR["simulation_config"]["l2"].append([
+            self.config_dict["geometry_config"]["rod_b_length_m"], 0])
+        self.rdt_cntr_strt_1 = time_now
+        self.rdt_cntr_strt_2 = time_now
+
+    def next_due(self):
+        """
+        Returns:
+            float or None: Time of the next scheduled decrease, or None if nothing is scheduled.
+        """
+        if not self.enabled():
+            return None
+        sim_config = self.config_dict["simulation_config"]
+        due = []
+        if sim_config["rod_a_dt_s"] > 0.0001:
+            due.append(self.rdt_cntr_strt_1 + sim_config["rod_a_dt_s"])
+        if sim_config["rod_b_dt_s"] > 0.0001 and sim_config["rod_a_dt_s"] != sim_config["rod_b_dt_s"]:
+            due.append(self.rdt_cntr_strt_2 + sim_config["rod_b_dt_s"])
+        return min(due) if due else None
+
+    def poll(self, time_now=None):
+        """
+        Applies the decreases that are due.
+
+        Args:
+            time_now (float, optional): Current time. Defaults to the current time.
+        """
+        if not self.enabled():
+            return
+        time_now = time.time() if time_now is None else time_now
+        sim_config = self.config_dict["simulation_config"]
+
+        if sim_config["rod_a_dt_s"] == sim_config["rod_b_dt_s"]:
+            if sim_config["rod_a_dt_s"] > 0.0001 and self.rdt_cntr_strt_1 + sim_config["rod_a_dt_s"] < time_now:
+                self.rdt_cntr_strt_1 = time_now
+                self.rdt_cntr_strt_2 = time_now
+                self.rod_length_decrease_action(sim_config["rod_a_dl_m"], sim_config["rod_b_dl_m"])
+        else:
+            if sim_config["rod_a_dt_s"] > 0.0001 and self.rdt_cntr_strt_1 + sim_config["rod_a_dt_s"] < time_now:
+                self.rdt_cntr_strt_1 = time_now
+                self.rod_length_decrease_action(sim_config["rod_a_dl_m"], 0)
+
+            if sim_config["rod_b_dt_s"] > 0.0001 and self.rdt_cntr_strt_2 + sim_config["rod_b_dt_s"] < time_now:
+                self.rdt_cntr_strt_2 = time_now
+                self.rod_length_decrease_action(0, sim_config["rod_b_dl_m"])
+
+    def rod_length_decrease_action(self, dL1, dL2):
+        """
+        Decrease the lengths of the rods in the simulation state.
+
+        Args:
+            dL1 (float): Decrease in length for rod A.
+            dL2 (float): Decrease in length for rod B.
+        """
+        l1 = self.SIM_STATE.get_l1()
+        l2 = self.SIM_STATE.get_l2()
+        if l2 is None:
+            self.SIM_STATE.update_sys_variables(l1 - dL1, None)
+        else:
+            self.SIM_STATE.update_sys_variables(l1 - dL1, l2 - dL2)
@@ -0,0 +1,363 @@
+import ast
+import csv
+import glob
+import json
+import os
+import sys
+import time
+import numpy as np
+import yaml
+from libs import sim_clock
+from libs.varstructs.SIM_STATE import SIM_STATE
+import threads_.numsim.num_simulator as num_simulator
+
+# Names of the pendulum state components in the divergence report
+STATE_NAMES = ("phi_1", "phi_2", "dphi_1", "dphi_2")
+
+class recorded_round:
+    """
+    Input, state and controller histories of a finished round, as needed to replay it.
+
+    Attributes:
+        name (str): Name of the round (the file name for a loaded CSV).
+        q_array_list (list): Recorded input [x_m, dx_m, ddx_m, timestamp] rows.
+        phi (list): Recorded pendulum states [x (4x1), dx (4x1), timestamp, F1, ddq]. The
+            leading entries without a timestamp are the initial state and the delay line.
+        pd_stack (list): Recorded PD_control_stack entries.
+        sys_state (list): Recorded [l1, l2, timestamp] rod lengths.
+        constants (dict): FRAME_TRIM, PD_FRAME_TRIM, PD_CONTROL_ON and PD_MOUSE_INPUT of the round.
+    """
+
+    def __init__(self, name, q_array_list, phi, pd_stack, sys_state, constants) -> None:
+        self.name = name
+        self.q_array_list = q_array_list
+        self.phi = phi
+        self.pd_stack = pd_stack
+        self.sys_state = sys_state
+        self.constants = constants
+
+    @classmethod
+    def from_state_var(cls, SIM_STATE_VAR, name="round"):
+        """
+        Takes a round from a simulation state dictionary, e.g. a frozen round handed to
+        SIM_STATE.round_save_handler.
+
+        Args:
+            SIM_STATE_VAR (dict): The simulation state dictionary of the finished round.
+            name (str): Name of the round in the reports (default: "round").
+
+        Returns:
+            recorded_round: The round.
+        """
+        state_vars = SIM_STATE_VAR["stateVars"]
+        pd_control = SIM_STATE_VAR["PD_control"]
+        return cls(
+            name,
+            [list(q) for q in SIM_STATE_VAR["mouse_input"]["q_array_list"]],
+            [list(p) for p in state_vars["phi_np_array_list"]],
+            [{**d, "PD_u_q": list(d["PD_u_q"])} for d in pd_control["PD_control_stack"]],
+            [[s[2][7], s[2][8], s[3]] for s in state_vars["sys_state"]],
+            {
+                "FRAME_TRIM": SIM_STATE_VAR["run_conditions"]["FRAME_TRIM"],
+                "PD_FRAME_TRIM": pd_control["PD_FRAME_TRIM"],
+                "PD_CONTROL_ON": pd_control["PD_CONTROL_ON"],
+                "PD_MOUSE_INPUT": pd_control["PD_MOUSE_INPUT"]
+            }
+        )
+
+    @classmethod
+    def load_csv(cls, file_path):
+        """
+        Loads a round from a CSV file written by output_data_saver.
+
+        Args:
+            file_path (str): Path of the CSV file.
+
+        Returns:
+            recorded_round: The round.
+        """
+        constants, lists = _read_round_csv(file_path)
+
+        q = lists["mouse_input.q_array_list"]
+        q_array_list = [list(row) for row in zip(q["x_m"], q["dx_m"], q["ddx_m"], q["timestamp"])]
+
+        p = lists["stateVars.phi_np_array_list"]
+        phi = []
+        for i, timestamp in enumerate(p["timestamp"]):
+            x = np.array([[p["x.phi_1"][i]], [p["x.phi_2"][i]], [p["x.dphi_1"][i]], [p["x.dphi_2"][i]]])
+            dx = np.array([[p["dx.dphi_1"][i]], [p["dx.dphi_2"][i]], [p["dx.ddphi_1"][i]], [p["dx.ddphi_2"][i]]])
+            phi.append([x, dx, timestamp, p["F1"][i], p["ddq"][i]])
+
+        d = lists.get("PD_control.PD_control_stack", {})
+        pd_stack = [{
+            "PD_phi_1_act": d["PD_phi_1_act"][i],
+            "PD_phi_2_act": d["PD_phi_2_act"][i],
+            "PD_dphi_1_act": d["PD_dphi_1_act"][i],
+            "PD_dphi_2_act": d["PD_dphi_2_act"][i],
+            "PD_u_q": [d["PD_u_q.u_q"][i], d["PD_u_q.du_q"][i], d["PD_u_q.ddu_q"][i], d["PD_u_q.timestamp"][i]]
+        } for i in range(len(d.get("PD_phi_1_act", [])))]
+
+        s = lists["stateVars.sys_state"]
+        sys_state = [[l1, l2, ts] for l1, l2, ts in zip(s["id_7"], s["id_8"], s["timestamp"])]
+
+        return cls(
+            os.path.basename(file_path),
+            q_array_list, phi, pd_stack, sys_state,
+            {
+                "FRAME_TRIM": constants["run_conditions"]["FRAME_TRIM"],
+                "PD_FRAME_TRIM": constants["PD_control"]["PD_FRAME_TRIM"],
+                "PD_CONTROL_ON": constants["PD_control"]["PD_CONTROL_ON"],
+                "PD_MOUSE_INPUT": constants["PD_control"]["PD_MOUSE_INPUT"]
+            }
+        )
+
+def _parse_value(text):
+    """
+    Converts a CSV cell back into the Python value it was written from.
+    """
+    if text == "":
+        return None  # csv.writer writes None as an empty cell
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        if text.startswith("np.float64(") and text.endswith(")"):
+            return float(text[11:-1])
+        return text
+
+def _read_round_csv(file_path):
+    """
+    Reads the two sections of a round CSV written by output_data_saver.
+
+    Returns:
+        tuple: (constants, lists). constants maps the top-level keys to {name: value} with the
+        nested dictionaries as dictionaries; lists maps "group.name" to {row label: values},
+        the row label joining the two label columns unless the second one is "_".
+    """
+    constants = {}
+    lists = {}
+    with open(file_path, newline='') as file:
+        reader = csv.reader(file)
+        group = name = None
+        listable = False
+        for row in reader:
+            if not row:
+                continue
+            if row[0] == "____":
+                listable = True
+                continue
+
+            if listable:
+                if row[0] == "#":
+                    lists[f"{row[1]}.{row[2]}"] = current = {}
+                elif row[0] == "*":
+                    label = row[1] if row[2] == "_" else f"{row[1]}.{row[2]}"
+                    current[label] = [_parse_value(v) for v in row[3:]]
+                continue
+
+            # Constant section: [key, _, _, _], [_, name, value, _] or [_, name, _, _] + [_, _, sub, value]
+            if row[0] != "_":
+                group = constants.setdefault(row[0], {})
+            elif row[1] != "_":
+                name = row[1]
+                group[name] = _parse_value(row[2]) if row[2] != "_" else {}
+            elif row[3] != "_":
+                group[name][row[2]] = _parse_value(row[3])
+            else:
+                if not isinstance(group[name], list):
+                    group[name] = []
+                group[name].append(_parse_value(row[2]))
+    return constants, lists
+
+class round_replay:
+    """
+    Replays recorded rounds through num_sim and the controller, faster than real time.
+
+    The recorded input rows are fed into a simulation state in the order they arrived, and
+    each recorded physics step is repeated with the sim_clock set to its recorded time, so
+    the integration uses the recorded time steps. The controller update of a step runs at
+    the recorded time of its PD entry. Rod length changes are applied at their recorded
+    times. Nothing waits for the wall clock, and the GUI and the input backend are not used.
+
+    After every step the replayed pendulum state is compared with the recorded one. The
+    report of a round gives the maximum and RMS error of each state component, the force
+    error, the first step whose error exceeds the tolerance, and the replay speed.
+
+    Attributes:
+        SIM_STATE (SIM_STATE): The simulation state the rounds are replayed in.
+        tolerance (float): State error above which a step counts as diverged.
+    """
+
+    def __init__(self, config_dict, SIM_STATE_ref=None, tolerance=1e-9) -> None:
+        """
+        Initializes the replay.
+
+        Args:
+            config_dict (dict): The simulation configuration the rounds were recorded with.
+            SIM_STATE_ref (SIM_STATE, optional): The simulation state to replay in. A replay state without an
+                input backend is created if omitted, and detached from the interpreter by close().
+            tolerance (float): State error above which a step counts as diverged (default: 1e-9).
+        """
+        self._own_state = SIM_STATE_ref is None
+        self.SIM_STATE = SIM_STATE(config_dict, 1.0, replay=True) if self._own_state else SIM_STATE_ref
+        self.SIM_STATE.save_rounds = False
+        self.tolerance = tolerance
+
+    def close(self):
+        """
+        Detaches the simulation state created for the replay. A given state is left as it is.
+        """
+        if self._own_state:
+            self.SIM_STATE.close()
+
+    def replay(self, recorded):
+        """
+        Replays a round.
+
+        Args:
+            recorded (recorded_round): The round.
+
+        Returns:
+            dict: The divergence report of the round.
+        """
+        state = self.SIM_STATE
+        state_var = state.SIM_STATE_VAR
+        n_seed = next((i for i, p in enumerate(recorded.phi) if p[2] is not None), len(recorded.phi))
+        steps = recorded.phi[n_seed:]
+        n_steps = len(steps)
+        pd_on = bool(recorded.constants["PD_CONTROL_ON"])
+        # PD entries of the steps; PD switched on during the round leaves the first steps without one
+        n_pd_seed = max(0, len(recorded.pd_stack) - n_steps) if pd_on else 0
+        pd_first_step = n_steps - (len(recorded.pd_stack) - n_pd_seed) if pd_on else n_steps
+
+        t_start = time.perf_counter()
+        try:
+            sim_clock.set_virtual(recorded.sys_state[0][2] if recorded.sys_state else None)
+            state.reset_numsim_round_data()
+            if recorded.sys_state and (recorded.sys_state[0][0], recorded.sys_state[0][1]) != (state.get_l1(), state.get_l2()):
+                state.update_sys_variables(recorded.sys_state[0][0], recorded.sys_state[0][1])
+            state_var["run_conditions"]["FRAME_TRIM"] = recorded.constants["FRAME_TRIM"]
+            state_var["PD_control"]["PD_FRAME_TRIM"] = recorded.constants["PD_FRAME_TRIM"]
+            state_var["PD_control"]["PD_MOUSE_INPUT"] = recorded.constants["PD_MOUSE_INPUT"]
+
+            # Initial state, delay line and controller memory of the round
+            phi_list = state_var["stateVars"]["phi_np_array_list"]
+            phi_list.clear()
+            for p in recorded.phi[:n_seed]:
+                phi_list.append(list(p))
+            pd_stack = state_var["PD_control"]["PD_control_stack"]
+            for d in recorded.pd_stack[:n_pd_seed]:
+                pd_stack.append({**d, "PD_u_q": list(d["PD_u_q"])})
+
+            q_list = state_var["mouse_input"]["q_array_list"]
+            double_pendulum = state_var["simulation_config"]["DOUBLE_PENDULUM"]
+            i_q = 0
+            i_sys = 1
+            errors = np.zeros((n_steps, 4))
+            force_errors = np.zeros(n_steps)
+            for j, step in enumerate(steps):
+                step_ts = step[2]
+                while i_q < len(recorded.q_array_list) and recorded.q_array_list[i_q][3] <= step_ts:
+                    q_list.append(list(recorded.q_array_list[i_q]))
+                    i_q += 1
+                while i_sys < len(recorded.sys_state) and recorded.sys_state[i_sys][2] <= step_ts:
+                    sim_clock.set_virtual(recorded.sys_state[i_sys][2])
+                    state.update_sys_variables(recorded.sys_state[i_sys][0], recorded.sys_state[i_sys][1])
+                    i_sys += 1
+
+                state_var["PD_control"]["PD_CONTROL_ON"] = pd_on and j >= pd_first_step
+                sim_clock.set_virtual(step_ts)
+                result = num_simulator.num_sim(double_pendulum, state)
+                state.append_DoF_State_Stack(result)
+                if state_var["PD_control"]["PD_CONTROL_ON"]:
+                    sim_clock.set_virtual(recorded.pd_stack[n_pd_seed + j - pd_first_step]["PD_u_q"][3])
+                state.update_PD_vals()
+
+                errors[j] = (result[0] - step[0]).ravel()
+                force_errors[j] = result[3] - step[3]
+        finally:
+            sim_clock.set_virtual(None)
+        replay_s = time.perf_counter() - t_start
+
+        abs_errors = np.abs(errors)
+        diverged = np.flatnonzero(abs_errors.max(axis=1) > self.tolerance) if n_steps else []
+        recorded_s = steps[-1][2] - steps[0][2] if n_steps > 1 else 0.0
+        return {
+            "round": recorded.name,
+            "steps": n_steps,
+            "recorded_s": recorded_s,
+            "replay_s": replay_s,
+            "speedup": recorded_s / replay_s if replay_s > 0 else float("inf"),
+            "max_error": dict(zip(STATE_NAMES, abs_errors.max(axis=0).tolist() if n_steps else [0.0] * 4)),
+            "rms_error": dict(zip(STATE_NAMES, np.sqrt((errors ** 2).mean(axis=0)).tolist() if n_steps else [0.0] * 4)),
+            "max_force_error": float(np.abs(force_errors).max()) if n_steps else 0.0,
+            "first_divergent_step": int(diverged[0]) if len(diverged) else None
+        }
+
+    @staticmethod
+    def print_report(report):
+        """
+        Prints the divergence report of a round on one line.
+        """
+        max_error = max(report["max_error"].values())
+        divergence = "none" if report["first_divergent_step"] is None else f"from step {report['first_divergent_step']}"
+        print(f"{report['round']}: steps: {report['steps']}, recorded: {report['recorded_s']:.2f} s, "
+              f"replayed: {report['replay_s'] * 1000:.1f} ms ({report['speedup']:.0f}x), "
+              f"max state error: {max_error:.3e}, max force error: {report['max_force_error']:.3e}, divergence: {divergence}")
+
+def find_round_files(path):
+    """
+    Args:
+        path (str): A round CSV, or a folder searched recursively for them.
+
+    Returns:
+        list: Paths of the round CSV files, sorted.
+    """
+    if os.path.isfile(path):
+        return [path]
+    return sorted(f for f in glob.glob(os.path.join(path, "**", "*.csv"), recursive=True))
+
+def replay_files(paths, config_dict=None):
+    """
+    Replays round CSV files. Each file is replayed with the config_file.yaml saved next to
+    it, or with config_dict if there is none; rounds with the same configuration share one
+    simulation state, whichever folder it was saved in.
+
+    Args:
+        paths (list): Round CSVs or folders of them.
+        config_dict (dict, optional): Configuration of rounds without a saved one.
+
+    Returns:
+        list: The divergence reports of the rounds.
+    """
+    replays = {}
+    reports = []
+    try:
+        for file_path in (f for path in paths for f in find_round_files(path)):
+            config_path = os.path.join(os.path.dirname(file_path), "config_file.yaml")
+            if os.path.isfile(config_path):
+                with open(config_path) as file:
+                    round_config = yaml.safe_load(file)
+            elif config_dict is not None:
+                round_config = config_dict
+            else:
+                print(f"{file_path}: skipped, no configuration.")
+                continue
+
+            config_key = json.dumps(round_config, sort_keys=True, default=repr)
+            if config_key not in replays:
+                replays[config_key] = round_replay(round_config)
+            report = replays[config_key].replay(recorded_round.load_csv(file_path))
+            round_replay.print_report(report)
+            reports.append(report)
+    finally:
+        for replay in replays.values():
+            replay.close()
+
+    diverged = sum(1 for r in reports if r["first_divergent_step"] is not None)
+    print(f"Replayed {len(reports)} rounds, {sum(r['steps'] for r in reports)} steps in "
+          f"{sum(r['replay_s'] for r in reports):.2f} s, diverged: {diverged}")
+    return reports
+
+if __name__ == "__main__":
+    # python -m threads_.numsim.libs.round_replay <round CSV or folder> [...]
+    replay_files(sys.argv[1:] or ["./output_datasets"])
@@ -0,0 +1,114 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+# Flags of a tick record
+F_X = 1          # A cursor position was appended
+F_DX = 2         # A cursor velocity was appended
+F_DDX = 4        # A cursor acceleration and a physics input (q_array_list entry) were appended
+F_STEP = 8       # A DoF state was appended
+F_PD = 16        # A PD control entry was appended
+F_FELL = 32      # The pendulum fell during the tick (run status 2 -> 1)
+
+# Columns of a tick record
+R_FLAGS = 0
+R_EPOCH = 1                 # data_epoch of the physics state at the start of the tick
+R_STATUS = 2                # Run status after the tick
+R_X = 3                     # [x, x_ts]
+R_DX = 5                    # [dx, at, dt]
+R_DDX = 8                   # [ddx, at, dt]
+R_Q = 11                    # [x_m, dx_m, ddx_m, ts]
+R_PHI = 15                  # x: [phi1, phi2, dphi1, dphi2]
+R_DPHI = 19                 # dx: [dphi1, dphi2, ddphi1, ddphi2]
+R_STEP = 23                 # [ts, F1, ddq]
+R_PD_ACT = 26               # [phi1, phi2, dphi1, dphi2]
+R_PD_UQ = 30                # [ddu, du, u, ts]
+R_SCHED = 34                # [ticks, overruns, skipped_ticks, max_lateness_s, mean_period_s, period_jitter_s]
+R_X_POLL = 40               # poll_ts of the cursor position
+RECORD_WIDTH = 41
+
+# Slots of the header
+H_WRITTEN = 0               # Number of records published so far
+H_WARPS = 1                 # Cursor warps announced by the GUI
+H_WARP_SHIFT = 2            # Sum of the cursor warps in pixels, [H_WARPS, H_WARP_SHIFT] is shared by the motion accumulators
+H_RT_APPLIED = 3            # rt_profile APPLIED_ mask of the physics process, + 1 once it is set
+HEADER_WIDTH = 8
+
+SCHED_KEYS = ("ticks", "overruns", "skipped_ticks", "max_lateness_s", "mean_period_s", "period_jitter_s")
+
+class shm_tick_ring:
+    """
+    Single-producer, single-consumer ring of fixed-width tick records in shared memory.
+
+    The physics process writes one record per tick with everything the tick appended to the
+    simulation state, and publishes it by advancing the written counter of the header after
+    the record is complete. The GUI process copies the published records into its own
+    SIM_STATE. The rest of the header is a small control block written by the GUI process
+    (the cursor replacement state) and read by the physics process every tick.
+
+    On x86 the stores of a process become visible to the other process in program order,
+    which is what the publish-after-write protocol relies on.
+
+    Attributes:
+        capacity (int): Number of records in the ring.
+        name (str): Name of the shared memory block, used to attach from another process.
+    """
+
+    def __init__(self, capacity=4096, name=None) -> None:
+        """
+        Creates a new ring, or attaches to an existing one if a name is given.
+
+        Args:
+            capacity (int): Number of records (default: 4096). Must match when attaching.
+            name (str, optional): Name of an existing shared memory block to attach to.
+        """
+        self.capacity = int(capacity)
+        size = (HEADER_WIDTH + self.capacity * RECORD_WIDTH) * 8
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(name=name, create=self._owner, size=size)
+        self.name = self._shm.name
+
+        self.header = np.ndarray((HEADER_WIDTH,), dtype=np.float64, buffer=self._shm.buf)
+        self.records = np.ndarray((self.capacity, RECORD_WIDTH), dtype=np.float64, buffer=self._shm.buf, offset=HEADER_WIDTH * 8)
+        if self._owner:
+            self.header[:] = 0
+        self._read = 0
+        self.lost_records = 0
+
+    def push(self, record):
+        """
+        Writes and publishes a record. Called by the producer only.
+
+        Args:
+            record (numpy.ndarray): Record of RECORD_WIDTH values.
+        """
+        written = int(self.header[H_WRITTEN])
+        self.records[written % self.capacity] = record
+        self.header[H_WRITTEN] = written + 1
+
+    def read_new(self):
+        """
+        Copies the records published since the previous call. Called by the consumer only.
+
+        Returns:
+            numpy.ndarray: Array of shape (n, RECORD_WIDTH), oldest first.
+        """
+        written = int(self.header[H_WRITTEN])
+        if written - self._read > self.capacity - 1:
+            # The consumer fell behind a whole ring; the oldest records are gone
+            self.lost_records += written - self._read - (self.capacity - 1)
+            self._read = written - (self.capacity - 1)
+        if written == self._read:
+            return np.zeros((0, RECORD_WIDTH))
+        idx = np.arange(self._read, written) % self.capacity
+        self._read = written
+        return self.records[idx]
+
+    def close(self):
+        """
+        Detaches from the shared memory block and removes it if this instance created it.
+        """
+        self.header = None
+        self.records = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
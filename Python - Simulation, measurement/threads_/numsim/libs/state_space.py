@@ -4,6 +4,7 @@ from threads_.numsim.libs.state_space_fs.control_tuning import riccati_solution
 from threads_.numsim.libs.state_space_fs.control_tuning import h_inf
 from threads_.numsim.libs.state_space_fs.control_tuning import h_inf_delay
 from threads_.numsim.libs.state_space_fs.control_tuning import lqr_delay
+from threads_.numsim.libs.state_space_fs.design_cache import design_key
 import numpy as np
 from scipy.signal import place_poles
 import time
@@ -28,12 +29,30 @@ class state_space:
         K (np.ndarray): State feedback gain matrix.
         LQR_Q, LQR_R (np.ndarray): LQR weighting matrices.
         report (dict): Contains diagnostic data about the system and controllers.
+        design_cache (design_cache): Cache of the design results, or None.
+        verbose (bool): Whether the linearized matrices are printed when they change.
     """
 
-    def __init__(self, double_pendulum, LQR_Q, LQR_R, sample_rate_s, pd_delay_s) -> None:
+    # Attributes set by the design computations of doReport, cached together
+    DESIGN_ATTRS = (
+        "A_lin_eigvals",
+        "A_lin_natural_frequencies",
+        "A_lin_dominant_frequency",
+        "M",
+        "M_rank",
+        "cnt_pole_place",
+        "cnt_Riccati_sol",
+        "cnt_K_H_inf",
+        "H_inf_gamma",
+        "H_inf_timing"
+    )
+
+    def __init__(self, double_pendulum, LQR_Q, LQR_R, sample_rate_s, pd_delay_s, design_cache=None) -> None:
         self.double_pendulum = double_pendulum
         self.sample_rate_s = sample_rate_s
         self.pd_delay_s = pd_delay_s
+        self.design_cache = design_cache
+        self.verbose = True
 
         # System constants
         self.rho1 = None
@@ -67,6 +86,10 @@ class state_space:
         self.LQR_Q = LQR_Q
         self.LQR_R = LQR_R
 
+        # H-infinity synthesis; the optimal gamma of the previous plant narrows the next search
+        self.H_inf_gamma = None
+        self.H_inf_timing = None
+
         # Report structure
         self.report = {
             "timestamp": None,
@@ -78,6 +101,7 @@ class state_space:
             "LQR_K_opt": None,
             "t_span": None,
             "H_inf_K": None,
+            "H_inf_gamma": None,
         }
 
     def update_system_constants(self, rho1, rho2, l1, l2, g):
@@ -150,8 +174,9 @@ class state_space:
             self.A_lin, self.B_lin = csM.linearized_DIPC_sys_matrices(
                 (self.C1, self.C2, self.C3, self.C4, self.C5, self.m1, self.m2, self.l1, self.l2, self.g)
             )
-            print(f"A_lin: {self.A_lin}")
-            print(f"B_lin: {self.B_lin}")
+            if self.verbose:
+                print(f"A_lin: {self.A_lin}")
+                print(f"B_lin: {self.B_lin}")
         else:
             # Linearization for single pendulum is not implemented
             pass
@@ -199,7 +224,8 @@ class state_space:
         """
         Generate a comprehensive report of the system's state and control properties.
         This includes updating and retrieving system properties, pole placements,
-        Riccati solutions, and H-infinity solutions.
+        Riccati solutions, and H-infinity solutions. With a design cache, the results of a
+        parameter set designed before are taken from the cache instead.
 
         Updates:
         - Eigenvalues and frequencies of A_lin.
@@ -216,11 +242,7 @@ class state_space:
             LQR_R = self.LQR_R
 
             # Update system properties and solutions
-            self._update_p_of_A()
-            self._update_M()
-            self._update_K_pole_placed()
-            self._update_Riccati_sol(t_span)
-            self._update_H_inf()
+            self._update_design(t_span)
 
             # Retrieve updated values for the report
             A_lin, A_lin_eigvals, A_lin_natural_frequencies, A_lin_dominant_frequency = self.get_p_of_A()
@@ -249,7 +271,9 @@ class state_space:
             print(f"  Optimal State Feedback Gain Matrix (K_opt): \t{riccati_K}")
             print(f"  Differential Riccati Solutions (P(t)): Computed over time span {t_span}")
             print(f"# H_inf")
+            print(f"  Optimal gamma: {self.H_inf_gamma}")
             print(f"  K: {cnt_K_H_inf}")
+            print(f"  Synthesis: {self.H_inf_timing['riccati_checks']} Riccati checks, {self.H_inf_timing['total_s'] * 1e3:.2f} ms")
             print( "==================================================================================")   
 
             self.report = {
@@ -262,11 +286,84 @@ class state_space:
                 "LQR_P_ARE"             : riccati_P_ARE,
                 "LQR_K_opt"             : np.array(riccati_K),
                 "t_span"                : t_span,
-                "H_inf_K"               : cnt_K_H_inf
+                "H_inf_K"               : cnt_K_H_inf,
+                "H_inf_gamma"           : self.H_inf_gamma
             }
 
             return self.report
 
+    def design_gain(self, method):
+        """
+        Computes the state feedback gain of a single control method, without the rest of
+        the report. This is what a rod length change needs before the next control step;
+        doReport can follow later. With a design cache, a gain designed before is taken
+        from the cache.
+
+        Parameters:
+        - method (str): "lqr" or "h_inf".
+
+        Returns:
+        - numpy.ndarray: The 1x4 gain matrix, or None for another method or a single pendulum.
+        """
+        if not self.double_pendulum or method not in ("lqr", "h_inf"):
+            return None
+
+        key = None
+        if self.design_cache is not None:
+            key = design_key(
+                method=method, l1=self.l1, l2=self.l2, rho1=self.rho1, rho2=self.rho2, g=self.g,
+                Q=self.LQR_Q, R=self.LQR_R
+            )
+            K = self.design_cache.get(key)
+            if K is not None:
+                return K
+
+        if method == "lqr":
+            _, K = rs.lqr_gain(self.A_lin, self.B_lin, self.LQR_Q, self.LQR_R)
+        else:
+            K = self._H_inf_synthesis()
+
+        if key is not None:
+            self.design_cache.put(key, K)
+        return K
+
+    def _design_key(self, t_span):
+        """
+        Returns:
+            str: Content address of the parameters the design results depend on.
+        """
+        return design_key(
+            l1=self.l1, l2=self.l2, rho1=self.rho1, rho2=self.rho2, g=self.g,
+            Q=self.LQR_Q, R=self.LQR_R, poles=self.desired_poles,
+            delay=self.pd_delay_s, Ts=self.sample_rate_s, t_span=t_span
+        )
+
+    def _update_design(self, t_span):
+        """
+        Runs the design computations, or restores their results from the design cache.
+
+        Parameters:
+        - t_span (tuple): Time span for solving the Differential Riccati Equation (DRE).
+        """
+        key = None
+        if self.design_cache is not None:
+            key = self._design_key(t_span)
+            design = self.design_cache.get(key)
+            if design is not None:
+                for name in self.DESIGN_ATTRS:
+                    setattr(self, name, design[name])
+                print(f"design cache: hit {key[:12]} {self.design_cache.stats}")
+                return
+
+        self._update_p_of_A()
+        self._update_M()
+        self._update_K_pole_placed()
+        self._update_Riccati_sol(t_span)
+        self._update_H_inf()
+
+        if key is not None:
+            self.design_cache.put(key, {name: getattr(self, name) for name in self.DESIGN_ATTRS})
+
     def _update_p_of_A(self):
         """
         Update eigenvalues and natural frequencies of the linearized system matrix (A_lin).
@@ -325,18 +422,29 @@ class state_space:
         """
         self.cnt_Riccati_sol = rs.riccati_solutions_dpic(self.A_lin, self.B_lin, self.LQR_Q, self.LQR_R, t_span)
 
-    def _update_H_inf(self, gamma=1.0):
+    def _update_H_inf(self):
         """
         Compute the H-infinity state feedback gain matrix.
 
-        Parameters:
-        - gamma (float): Performance threshold for the H-infinity controller.
-
         Updates:
         - self.cnt_K_H_inf: H-infinity state feedback gain matrix.
+        - self.H_inf_gamma, self.H_inf_timing: Optimal gamma and timing of the synthesis.
+        """
+        self.cnt_K_H_inf = self._H_inf_synthesis()
+
+    def _H_inf_synthesis(self):
+        """
+        Synthesizes the H-infinity state feedback of the current A_lin, B_lin by gamma
+        bisection. The disturbances are angular accelerations of both rods, the performance
+        output weights the state and the input with LQR_Q and LQR_R.
+
+        Returns:
+        - numpy.ndarray: H-infinity state feedback gain matrix.
         """
-        C = np.eye(4)  # Output matrix for full-state feedback
-        self.cnt_K_H_inf = h_inf.compute_h_infinity(self.A_lin, self.B_lin, C, gamma)
+        B1 = np.vstack([np.zeros((2, 2)), np.eye(2)])
+        self.H_inf_gamma, K, self.H_inf_timing = h_inf.synthesize_h_infinity(
+            self.A_lin, B1, self.B_lin, self.LQR_Q, self.LQR_R, gamma_init=self.H_inf_gamma)
+        return K
 
     def _update_lqr_dd(self):
         """
@@ -82,3 +82,33 @@ def linearized_DIPC_sys_matrices(sys_consts_double):
     ])
 
     return A_lin, B_lin
+
+def linearized_DIPC_sys_matrices_batch(sys_consts_double):
+    """
+    Compute the linearized system matrices of a batch of double inverted pendulums on a cart.
+
+    Parameters:
+    - sys_consts_double (tuple): System constants as in linearized_DIPC_sys_matrices, each an array of shape (N,).
+
+    Returns:
+    - A_lin (np.ndarray): Linearized dynamics matrices of shape (N, 4, 4).
+    - B_lin (np.ndarray): Linearized input matrices of shape (N, 4, 1).
+    """
+    C1, C2, C3, C4, C5, m1, m2, l1, l2, g = (np.asarray(c, dtype=float) for c in sys_consts_double)
+    n_batch = np.broadcast(C1, C2, C3, C4, C5, m1, m2, l1, l2).shape[0]
+
+    s1 = C3 * C3 - C1 * C2
+
+    A_lin = np.zeros((n_batch, 4, 4))
+    A_lin[:, 0, 2] = 1
+    A_lin[:, 1, 3] = 1
+    A_lin[:, 2, 0] = C2 * C4 / s1
+    A_lin[:, 2, 1] = -C3 * C5 / s1
+    A_lin[:, 3, 0] = -C3 * C4 / s1
+    A_lin[:, 3, 1] = C1 * C5 / s1
+
+    B_lin = np.zeros((n_batch, 4, 1))
+    B_lin[:, 2, 0] = -(C2 * l1 * m1 + 2 * C2 * l1 * m2 - C3 * l2 * m2) / (2 * s1)
+    B_lin[:, 3, 0] = (C3 * l1 * m1 - C1 * l2 * m2 + 2 * C3 * l1 * m2) / (2 * s1)
+
+    return A_lin, B_lin
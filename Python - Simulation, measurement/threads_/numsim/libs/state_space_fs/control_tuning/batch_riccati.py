@@ -0,0 +1,154 @@
+import numpy as np
+from multiprocessing import Pool
+from scipy.linalg import solve_continuous_are
+from threads_.numsim.libs.state_space_fs import calc_system_constants as csC
+from threads_.numsim.libs.state_space_fs import calc_system_matrices as csM
+
+def _T(M):
+    return np.swapaxes(M, -1, -2)
+
+def _lyapunov_batch(A, C):
+    """
+    Solves A^T X + X A = -C for a batch of small matrices through their Kronecker form.
+
+    Parameters:
+        A (numpy.ndarray): Matrices of shape (N, n, n).
+        C (numpy.ndarray): Right-hand sides of shape (N, n, n).
+
+    Returns:
+        numpy.ndarray: Solutions X of shape (N, n, n).
+    """
+    N, n, _ = A.shape
+    I = np.eye(n)
+    # Row-major vec: vec(A^T X) = (A^T kron I) vec(X), vec(X A) = (I kron A^T) vec(X)
+    L = np.einsum("bik,jl->bijkl", _T(A), I) + np.einsum("ik,bjl->bijkl", I, _T(A))
+    X = np.linalg.solve(L.reshape(N, n * n, n * n), -C.reshape(N, n * n, 1))
+    return X.reshape(N, n, n)
+
+def solve_care_batch(A, B, Q, R, refine=True, tol=1e-9):
+    """
+    Solves a batch of continuous algebraic Riccati equations
+    A^T P + P A - P B R^-1 B^T P + Q = 0 at once.
+
+    The stabilizing solutions are taken from the stable eigenvectors of the stacked
+    Hamiltonian matrices with one batched eigendecomposition, and improved by one Newton
+    (Kleinman) step, a batched Lyapunov solve. Entries whose Hamiltonian has no clean
+    stable subspace or whose residual stays above tol fall back to
+    scipy.linalg.solve_continuous_are.
+
+    Parameters:
+        A (numpy.ndarray): System matrices of shape (N, n, n).
+        B (numpy.ndarray): Input matrices of shape (N, n, m).
+        Q (numpy.ndarray): State weighting matrices of shape (N, n, n).
+        R (numpy.ndarray): Input weighting matrices of shape (N, m, m).
+        refine (bool): Whether to apply the Newton step (default: True).
+        tol (float): Largest relative residual accepted from the batched path (default: 1e-9).
+
+    Returns:
+        P (numpy.ndarray): Solutions of shape (N, n, n).
+        n_fallback (int): Number of entries solved one by one.
+    """
+    N, n, _ = A.shape
+    R_inv = np.linalg.inv(R)
+    G = B @ R_inv @ _T(B)
+
+    H = np.empty((N, 2 * n, 2 * n))
+    H[:, :n, :n] = A
+    H[:, :n, n:] = -G
+    H[:, n:, :n] = -Q
+    H[:, n:, n:] = -_T(A)
+    w, V = np.linalg.eig(H)
+
+    # The n eigenvalues in the left half plane span the stabilizing subspace [U1; U2]
+    order = np.argsort(w.real, axis=-1)[:, :n]
+    ok = np.sum(w.real < 0, axis=-1) == n
+    V_s = np.take_along_axis(V, order[:, None, :], axis=2)
+    U1 = V_s[:, :n, :]
+    U2 = V_s[:, n:, :]
+    ok &= np.linalg.cond(U1) < 1e12
+    U1[~ok] = np.eye(n)
+    # P = U2 U1^-1
+    P = _T(np.linalg.solve(_T(U1), _T(U2))).real
+    P = (P + _T(P)) / 2
+
+    if refine and np.any(ok):
+        K = R_inv[ok] @ _T(B[ok]) @ P[ok]
+        A_cl = A[ok] - B[ok] @ K
+        P_ok = _lyapunov_batch(A_cl, Q[ok] + _T(K) @ R[ok] @ K)
+        P[ok] = (P_ok + _T(P_ok)) / 2
+
+    residual = _T(A) @ P + P @ A - P @ G @ P + Q
+    scale = np.linalg.norm(Q, axis=(1, 2)) + np.linalg.norm(_T(A) @ P, axis=(1, 2)) + np.linalg.norm(P @ G @ P, axis=(1, 2))
+    ok &= np.linalg.norm(residual, axis=(1, 2)) <= tol * scale
+
+    fallback = np.flatnonzero(~ok)
+    for i in fallback:
+        P[i] = solve_continuous_are(A[i], B[i], Q[i], R[i])
+    return P, len(fallback)
+
+def lqr_batch(A, B, Q, R):
+    """
+    Designs the LQR gains of a batch of systems.
+
+    Parameters:
+        A (numpy.ndarray): System matrices of shape (N, n, n).
+        B (numpy.ndarray): Input matrices of shape (N, n, m).
+        Q (numpy.ndarray): State weighting matrices of shape (N, n, n).
+        R (numpy.ndarray): Input weighting matrices of shape (N, m, m).
+
+    Returns:
+        K (numpy.ndarray): State feedback gains of shape (N, m, n).
+        poles (numpy.ndarray): Closed-loop poles, eigenvalues of A - B K, of shape (N, n).
+        P (numpy.ndarray): Cost matrices, the Riccati solutions, of shape (N, n, n).
+    """
+    P, n_fallback = solve_care_batch(A, B, Q, R)
+    if n_fallback:
+        print(f"batch Riccati: {n_fallback} of {len(P)} solved one by one")
+    K = np.linalg.solve(R, _T(B) @ P)
+    poles = np.linalg.eigvals(A - B @ K)
+    return K, poles, P
+
+def _lqr_sweep_chunk(args):
+    return lqr_batch(*args)
+
+def lqr_sweep(Q, R, l1, l2, rho1, rho2, g=9.81, processes=1):
+    """
+    Designs the LQR gains of the double pendulum for a sweep of weights and geometries.
+
+    All arguments are broadcast against each other; the batch shape of Q excludes its last
+    two axes. A grid of weights, e.g. Q built from np.meshgrid of two diagonal entries,
+    gives results on the same grid, ready for plotting like the PD plane.
+
+    Parameters:
+        Q (numpy.ndarray): State weighting matrices of shape (..., 4, 4).
+        R (float or numpy.ndarray): Input weights of shape (...).
+        l1, l2 (float or numpy.ndarray): Lengths of the rods.
+        rho1, rho2 (float or numpy.ndarray): Mass densities of the rods.
+        g (float): Gravitational acceleration (default: 9.81).
+        processes (int): Number of worker processes the batch is split across (default: 1).
+
+    Returns:
+        K (numpy.ndarray): State feedback gains of shape (..., 4).
+        poles (numpy.ndarray): Closed-loop poles of shape (..., 4).
+        P (numpy.ndarray): Cost matrices of shape (..., 4, 4).
+    """
+    Q = np.asarray(Q, dtype=float)
+    R = np.asarray(R, dtype=float)
+    geometry = [np.asarray(v, dtype=float) for v in (l1, l2, rho1, rho2)]
+    shape = np.broadcast_shapes(Q.shape[:-2], R.shape, *(v.shape for v in geometry))
+    N = int(np.prod(shape))
+
+    Q = np.broadcast_to(Q, shape + (4, 4)).reshape(N, 4, 4)
+    R = np.broadcast_to(R, shape).reshape(N, 1, 1)
+    l1, l2, rho1, rho2 = (np.broadcast_to(v, shape).reshape(N) for v in geometry)
+    A, B = csM.linearized_DIPC_sys_matrices_batch(csC.calculate_system_constants_double(rho1, rho2, l1, l2, g))
+
+    if processes > 1 and N >= 2 * processes:
+        chunks = np.array_split(np.arange(N), processes)
+        with Pool(processes=processes) as pool:
+            results = pool.map(_lqr_sweep_chunk, [(A[c], B[c], Q[c], R[c]) for c in chunks])
+        K, poles, P = (np.concatenate(parts) for parts in zip(*results))
+    else:
+        K, poles, P = lqr_batch(A, B, Q, R)
+
+    return K.reshape(shape + (4,)), poles.reshape(shape + (4,)), P.reshape(shape + (4, 4))
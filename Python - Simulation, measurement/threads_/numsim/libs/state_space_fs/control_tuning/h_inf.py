@@ -1,3 +1,4 @@
+import time
 import numpy as np
 from scipy.linalg import solve_continuous_are, solve_discrete_are, expm
 from scipy.signal import cont2discrete
@@ -311,4 +312,129 @@ def compute_h_infinity_discrete_with_checks(A, B, C, gamma, T_s, delay):
     # Compute the state feedback matrix.
     K = np.linalg.inv(B_d_ext.T @ P @ B_d_ext + R) @ (B_d_ext.T @ P @ A_d_ext)
 
-    return K
\ No newline at end of file
+    return K
+
+def _h_infinity_riccati(A, B1, B2, Q, R_inv, gamma):
+    """
+    Solves the H_infinity state feedback Riccati equation
+    A^T X + X A + X (B1 B1^T / gamma^2 - B2 R^-1 B2^T) X + Q = 0 through its Hamiltonian.
+
+    Parameters:
+        A (np.ndarray): State matrix (n x n).
+        B1 (np.ndarray): Disturbance input matrix (n x p).
+        B2 (np.ndarray): Control input matrix (n x m).
+        Q (np.ndarray): State weighting matrix (n x n).
+        R_inv (np.ndarray): Inverse of the input weighting matrix (m x m).
+        gamma (float): H_infinity performance bound.
+
+    Returns:
+        np.ndarray: The stabilizing solution X >= 0, or None if gamma is not achievable.
+    """
+    n = A.shape[0]
+    H = np.block([
+        [A, B1 @ B1.T / gamma**2 - B2 @ R_inv @ B2.T],
+        [-Q, -A.T]
+    ])
+    w, V = np.linalg.eig(H)
+
+    # Eigenvalues on the imaginary axis: no stabilizing solution
+    scale = 1.0 + np.max(np.abs(w))
+    if np.min(np.abs(w.real)) < 1e-9 * scale:
+        return None
+
+    V_s = V[:, w.real < 0]
+    if V_s.shape[1] != n:
+        return None
+    U1 = V_s[:n, :]
+    U2 = V_s[n:, :]
+    if np.linalg.cond(U1) > 1e12:
+        return None
+    X = np.linalg.solve(U1.T, U2.T).T.real
+    X = (X + X.T) / 2
+
+    # The solution of an achievable gamma is positive semi-definite
+    if np.min(np.linalg.eigvalsh(X)) < -1e-9 * (1.0 + np.max(np.abs(X))):
+        return None
+    return X
+
+def synthesize_h_infinity(A, B1, B2, Q, R, gamma_init=None, rtol=1e-4, margin=1.1, gamma_min_limit=1e-6, gamma_max_limit=1e9):
+    """
+    H_infinity state feedback synthesis by bisection on gamma.
+
+    The plant x' = A x + B1 w + B2 u with the performance output z = [Q^1/2 x; R^1/2 u]
+    admits a state feedback with a closed-loop H_infinity norm from w to z below gamma if
+    and only if the Hamiltonian of the H_infinity Riccati equation has no eigenvalue on the
+    imaginary axis and its stabilizing solution X is positive semi-definite. The smallest
+    such gamma is bisected in log scale. gamma_init, e.g. the result of a similar plant,
+    narrows the starting bracket. The result is the smallest achievable gamma on the grid
+    of ratio 1 + rtol, so it does not depend on the starting bracket. The gain is the
+    central controller u = -K x at margin times that gamma; at the optimum itself X is
+    unbounded.
+
+    Parameters:
+        A (np.ndarray): State matrix (n x n).
+        B1 (np.ndarray): Disturbance input matrix (n x p).
+        B2 (np.ndarray): Control input matrix (n x m).
+        Q (np.ndarray): State weighting matrix (n x n).
+        R (np.ndarray or float): Input weighting matrix (m x m).
+        gamma_init (float, optional): Estimate of the optimal gamma.
+        rtol (float): Relative resolution of gamma (default: 1e-4).
+        margin (float): Ratio of the gamma of the gain to the optimal gamma (default: 1.1).
+        gamma_min_limit (float): Smallest gamma searched (default: 1e-6).
+        gamma_max_limit (float): Largest gamma searched (default: 1e9).
+
+    Returns:
+        gamma_opt (float): Smallest achievable gamma, within rtol.
+        K (np.ndarray): State feedback matrix (m x n) at margin * gamma_opt.
+        timing (dict): Number of Riccati checks and the time of the bisection, of the gain and in total.
+    """
+    t_start = time.perf_counter()
+    R = np.atleast_2d(R)
+    R_inv = np.linalg.inv(R)
+    step = np.log1p(rtol)
+    checks = 0
+
+    def feasible(gamma):
+        nonlocal checks
+        checks += 1
+        return _h_infinity_riccati(A, B1, B2, Q, R_inv, gamma) is not None
+
+    # Bracket [lo, hi] with lo not achievable and hi achievable
+    hi = gamma_init if gamma_init is not None else 1.0
+    while not feasible(hi):
+        if hi >= gamma_max_limit:
+            raise ValueError("H_infinity synthesis: no achievable gamma below the search limit.")
+        hi = min(hi * 10, gamma_max_limit)
+    lo = hi / (1.5 if gamma_init is not None else 10)
+    while lo > gamma_min_limit and feasible(lo):
+        hi = lo
+        lo = max(lo / 10, gamma_min_limit)
+
+    if lo <= gamma_min_limit and feasible(lo):
+        gamma_opt = lo
+    else:
+        # Bisection in log scale, then the smallest achievable grid point above lo
+        while np.log(hi / lo) > step:
+            mid = np.sqrt(lo * hi)
+            if feasible(mid):
+                hi = mid
+            else:
+                lo = mid
+        k = int(np.ceil(np.log(lo) / step))
+        gamma_opt = np.exp(k * step)
+        while gamma_opt <= lo or not feasible(gamma_opt):
+            k += 1
+            gamma_opt = np.exp(k * step)
+    t_bisection = time.perf_counter()
+
+    X = _h_infinity_riccati(A, B1, B2, Q, R_inv, margin * gamma_opt)
+    K = R_inv @ B2.T @ X
+    t_end = time.perf_counter()
+
+    timing = {
+        "riccati_checks": checks,
+        "bisection_s": t_bisection - t_start,
+        "gain_s": t_end - t_bisection,
+        "total_s": t_end - t_start
+    }
+    return gamma_opt, K, timing
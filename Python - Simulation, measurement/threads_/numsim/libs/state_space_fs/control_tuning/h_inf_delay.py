@@ -1,6 +1,6 @@
 import numpy as np
 from scipy.linalg import solve_discrete_are
-from threads_.numsim.libs.state_space_fs.control_tuning.miscs import _calculate_delay_steps, _continuous_to_discrete
+from threads_.numsim.libs.state_space_fs.control_tuning.miscs import _calculate_delay_steps, _continuous_to_discrete, _prediction_matrices
 
 def _extend_with_delay(A_d, B_d, delay_steps):
     """
@@ -80,7 +80,40 @@ def _h_infinity_control(A_d, B_d, C, gamma):
 
     return K_relevant
 
-def h_inf_delay_K_calc(A, B, gamma, T_s, delay):
+def _h_infinity_control_predictor(A_d, B_d, C, gamma, delay_steps):
+    """
+    Compute the H-infinity gain matrix of the delayed system through state prediction.
+
+    The performance output weights the plant state only, so the Riccati solution of the
+    extended system is that of the 4-state system seen through the prediction of the
+    state delay_steps samples ahead, and the gain is the 4-state gain applied to the
+    prediction. This gives the gains of _h_infinity_control on the extended system with a
+    4-state DARE, at a cost linear in the delay steps.
+
+    Parameters:
+    A_d (np.ndarray): Discrete-time system matrix.
+    B_d (np.ndarray): Discrete-time input matrix.
+    C (np.ndarray): Output matrix for performance of the original states.
+    gamma (float): H-infinity performance bound.
+    delay_steps (int): Number of discrete delay steps.
+
+    Returns:
+    K (np.ndarray): H-infinity gain matrix for the original system.
+    """
+    n_inputs = B_d.shape[1]
+
+    # Solve the Riccati equation
+    try:
+        P = solve_discrete_are(A_d, B_d, C.T @ C, gamma**2 * np.eye(n_inputs))
+    except Exception as e:
+        raise ValueError(f"H-infinity Riccati equation solver failed: {e}")
+
+    K_0 = np.linalg.solve(B_d.T @ P @ B_d - gamma**2 * np.eye(n_inputs), B_d.T @ P @ A_d)
+    A_pred, _ = _prediction_matrices(A_d, B_d, delay_steps)
+
+    return K_0 @ A_pred
+
+def h_inf_delay_K_calc(A, B, gamma, T_s, delay, structured=True):
     C = np.array([[0.01, 0.0, 0.0, 0.0],
                   [0.0, 0.001, 0.0, 0.0]])  # Performance weights
 
@@ -90,14 +123,14 @@ def h_inf_delay_K_calc(A, B, gamma, T_s, delay):
     # Calculate delay steps
     delay_steps = _calculate_delay_steps(delay, T_s)
 
-    # Extend system matrices with delay
-    A_ext, B_ext = _extend_with_delay(A_d, B_d, delay_steps)
-
-    # Extend C matrix
-    C_ext = _extend_C(C, A_ext.shape, A_d.shape[0])
-
     try:
-        K = _h_infinity_control(A_ext, B_ext, C_ext, gamma)
+        if structured:
+            K = _h_infinity_control_predictor(A_d, B_d, C, gamma, delay_steps)
+        else:
+            # Extend system and C matrices with delay
+            A_ext, B_ext = _extend_with_delay(A_d, B_d, delay_steps)
+            C_ext = _extend_C(C, A_ext.shape, A_d.shape[0])
+            K = _h_infinity_control(A_ext, B_ext, C_ext, gamma)
         print("Relevant H-infinity Gain Matrix (K):\n", K)
         return K
     except ValueError as e:
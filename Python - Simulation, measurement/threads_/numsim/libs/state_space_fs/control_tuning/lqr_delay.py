@@ -1,6 +1,6 @@
 import numpy as np
 from scipy.linalg import solve_discrete_are
-from threads_.numsim.libs.state_space_fs.control_tuning.miscs import _calculate_delay_steps, _continuous_to_discrete
+from threads_.numsim.libs.state_space_fs.control_tuning.miscs import _calculate_delay_steps, _continuous_to_discrete, _prediction_matrices
 
 def _dlqr_delay_compensation(A_d, B_d, Q, R, delay_steps):
     """
@@ -59,7 +59,46 @@ def _dlqr_delay_compensation(A_d, B_d, Q, R, delay_steps):
 
     return K
 
-def lqr_delay_K_calc(A, B, Q, R, T_s, delay):
+def _dlqr_delay_predictor(A_d, B_d, Q, R, delay_steps, full=False):
+    """
+    Compute the discrete LQR gains with delay compensation through state prediction.
+
+    With the cost on the plant state only, the delayed problem is the undelayed one of the
+    state delay_steps samples ahead: the gain of the extended system is the 4-state DLQR
+    gain K0 applied to the prediction, K_extended = K0 [A_d^d, A_d^(d-1) B_d, ..., B_d].
+    This gives the gains of _dlqr_delay_compensation with a 4-state DARE, at a cost linear
+    in the delay steps instead of cubic.
+
+    Parameters:
+    A_d (np.ndarray): Discrete-time system matrix.
+    B_d (np.ndarray): Discrete-time input matrix.
+    Q (np.ndarray): State cost matrix for LQR.
+    R (np.ndarray): Control effort cost matrix for LQR.
+    delay_steps (int): Number of discrete steps for the delay.
+    full (bool): Whether to return the gains of the delayed inputs as well (default: False).
+
+    Returns:
+    K (np.ndarray): LQR gain matrix for the original system.
+    K_u (np.ndarray): Gains of the inputs in the delay line, oldest first; only if full is set.
+    """
+    if not np.all(np.linalg.eigvals(Q) >= 0):
+        raise ValueError("Q is not positive semi-definite.")
+    if not np.all(np.linalg.eigvals(R) > 0):
+        raise ValueError("R is not positive definite.")
+
+    try:
+        P = solve_discrete_are(A_d, B_d, Q, R)
+    except Exception as e:
+        raise ValueError(f"Riccati equation solver failed: {e}")
+
+    K_0 = np.linalg.solve(R + B_d.T @ P @ B_d, B_d.T @ P @ A_d)
+    A_pred, B_pred = _prediction_matrices(A_d, B_d, delay_steps)
+
+    if full:
+        return K_0 @ A_pred, K_0 @ B_pred
+    return K_0 @ A_pred
+
+def lqr_delay_K_calc(A, B, Q, R, T_s, delay, structured=True):
     """
     Calculate the LQR gain matrix for a system with discrete delay compensation.
 
@@ -70,6 +109,8 @@ def lqr_delay_K_calc(A, B, Q, R, T_s, delay):
     R (np.ndarray): Control cost matrix for LQR. Default: [[1.0]].
     T_s (float): Sampling time for discretization.
     delay (float): Delay in seconds.
+    structured (bool): Whether to use the predictor solution instead of the extended
+        dense system (default: True).
 
     Returns:
     K (np.ndarray): LQR gain matrix with delay compensation.
@@ -88,7 +129,10 @@ def lqr_delay_K_calc(A, B, Q, R, T_s, delay):
 
     # Compute the LQR gain with delay compensation
     try:
-        K = _dlqr_delay_compensation(A_d, B_d, Q, R, delay_steps)
+        if structured:
+            K = _dlqr_delay_predictor(A_d, B_d, Q, np.atleast_2d(R), delay_steps)
+        else:
+            K = _dlqr_delay_compensation(A_d, B_d, Q, R, delay_steps)
         print("LQR Gain Matrix (K):\n", K)
     except ValueError as e:
         print(f"Error: {e}")
@@ -34,4 +34,28 @@ def _calculate_delay_steps(delay, T_s):
     Returns:
     int: Number of discrete delay steps.
     """
-    return int(np.ceil(delay / T_s))
\ No newline at end of file
+    return int(np.ceil(delay / T_s))
+
+def _prediction_matrices(A_d, B_d, delay_steps):
+    """
+    Calculate the matrices that predict the state delay_steps samples ahead from the
+    current state and the inputs still in the delay line:
+    x[k+d] = A_d^d x[k] + sum_j A_d^(d-1-j) B_d u[k-d+j].
+
+    Parameters:
+    A_d (np.ndarray): Discrete-time system matrix.
+    B_d (np.ndarray): Discrete-time input matrix.
+    delay_steps (int): Number of discrete delay steps d.
+
+    Returns:
+    A_pred (np.ndarray): A_d^d.
+    B_pred (np.ndarray): [A_d^(d-1) B_d, ..., A_d B_d, B_d], oldest input first.
+    """
+    n_states = A_d.shape[0]
+    n_inputs = B_d.shape[1]
+    B_pred = np.zeros((n_states, delay_steps * n_inputs))
+    AB = B_d
+    for j in range(delay_steps - 1, -1, -1):
+        B_pred[:, j * n_inputs:(j + 1) * n_inputs] = AB
+        AB = A_d @ AB
+    return np.linalg.matrix_power(A_d, delay_steps), B_pred
@@ -2,6 +2,24 @@ import numpy as np
 from scipy.linalg import solve_continuous_are
 from scipy.integrate import solve_ivp
 
+def lqr_gain(A, B, Q, R):
+    """
+    Computes the optimal state feedback gain of the infinite-horizon LQR problem only.
+
+    Parameters:
+        A (numpy.ndarray): System dynamics matrix (4x4)
+        B (numpy.ndarray): Input matrix (4x1)
+        Q (numpy.ndarray): State weighting matrix (4x4)
+        R (numpy.ndarray): Input weighting matrix (1x1)
+
+    Returns:
+        P_ARE (numpy.ndarray): Solution to the algebraic Riccati equation
+        K (numpy.ndarray): State feedback gain matrix
+    """
+    P_ARE = solve_continuous_are(A, B, Q, R)
+    K = np.linalg.inv(np.array([[R]])) @ B.T @ P_ARE
+    return P_ARE, K
+
 def riccati_solutions_dpic(A, B, Q, R, t_span):
     """
     Computes solutions for the Algebraic Riccati Equation (ARE) and 
@@ -20,12 +38,10 @@ def riccati_solutions_dpic(A, B, Q, R, t_span):
         t (numpy.ndarray): Time points corresponding to the DRE solution
         K (numpy.ndarray): State feedback gain matrix
     """
-    # Solve the algebraic Riccati equation (ARE)
-    P_ARE = solve_continuous_are(A, B, Q, R)
-    
-    inv_R = np.linalg.inv(np.array([[R]])) 
-    # Calculate the optimal feedback gain matrix K
-    K = inv_R @ B.T @ P_ARE
+    # Solve the algebraic Riccati equation (ARE) and calculate the optimal feedback gain matrix K
+    P_ARE, K = lqr_gain(A, B, Q, R)
+
+    inv_R = np.linalg.inv(np.array([[R]]))
     
     # Define the Riccati differential equation (DRE)
     def dre(t, P_flat):
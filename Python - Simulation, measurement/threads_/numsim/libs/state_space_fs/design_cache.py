@@ -0,0 +1,129 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Part of every key: bump it when the design computations change, so stored results are recomputed
+DESIGN_VERSION = 2
+
+def design_key(**params):
+    """
+    Computes the content address of a set of design parameters.
+
+    Every numeric value is hashed as a float64 array with its shape, so 50 and 50.0 or a
+    list and an array of the same numbers give the same key.
+
+    Args:
+        **params: The design parameters (numbers, sequences, arrays, strings or None).
+
+    Returns:
+        str: Hex SHA-256 digest of the parameters.
+    """
+    digest = hashlib.sha256(f"design v{DESIGN_VERSION}".encode())
+    for name in sorted(params):
+        value = params[name]
+        digest.update(name.encode())
+        if value is None:
+            digest.update(b"None")
+        elif isinstance(value, str):
+            digest.update(b"str:" + value.encode())
+        else:
+            arr = np.asarray(value, dtype=np.float64)
+            digest.update(str(arr.shape).encode())
+            digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+class design_cache:
+    """
+    Memoizes control design results by the content address of their parameters.
+
+    The results are kept in memory with least-recently-used eviction and, if a directory
+    is given, stored there as one pickle file per key, so a geometry designed once costs
+    nothing in later rounds and after a restart. Files that cannot be read are ignored and
+    recomputed.
+
+    Attributes:
+        maxsize (int): Number of results kept in memory.
+        directory (str): Directory of the stored results, or None.
+        stats (dict): Numbers of memory hits, disk hits and misses.
+    """
+
+    def __init__(self, maxsize=32, directory=None) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): Number of results kept in memory (default: 32).
+            directory (str, optional): Directory of the stored results; no disk store if empty.
+        """
+        self.maxsize = max(1, int(maxsize))
+        self.directory = directory or None
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        Looks up a result.
+
+        Args:
+            key (str): Key from design_key().
+
+        Returns:
+            The stored result, or None if there is none.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._entries[key]
+
+        if self.directory is not None:
+            try:
+                with open(self._path(key), "rb") as f:
+                    value = pickle.load(f)
+            except FileNotFoundError:
+                value = None
+            except Exception as e:
+                print(f"design cache: ignoring unreadable entry {key[:12]}: {e}")
+                value = None
+            if value is not None:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                    self._insert(key, value)
+                return value
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, value):
+        """
+        Stores a result.
+
+        Args:
+            key (str): Key from design_key().
+            value: The result; must be picklable for the disk store.
+        """
+        with self._lock:
+            self._insert(key, value)
+        if self.directory is not None:
+            # Written under a temporary name, so a concurrent reader never sees a partial file
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f)
+            os.replace(tmp_path, path)
+
+    def _insert(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
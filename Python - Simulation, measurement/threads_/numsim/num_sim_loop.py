@@ -1,14 +1,18 @@
 import threads_.numsim.libs.cursor_position as cursor_pos
 import threads_.numsim.num_simulator as num_simulator
 from libs.varstructs.SIM_STATE import SIM_STATE
+from libs.varstructs import sim_events
+from libs import span_tracer
 
-def num_sim_update(SIM_STATE_ref: SIM_STATE, max_theta_1):
+def num_sim_update(SIM_STATE_ref: SIM_STATE, max_theta_1, cursor_sampler=None, fit_window_s=0.03):
     """
     Updates the numerical simulation state and processes cursor input.
 
     Parameters:
     - SIM_STATE_ref (SIM_STATE): Reference to the simulation state object.
     - max_theta_1 (float): Maximum allowable angle for the first pendulum before stopping the simulation.
+    - cursor_sampler (cursor_sampler_t, optional): High-rate cursor sampler whose samples replace the direct cursor read.
+    - fit_window_s (float): Length of the sample window fitted for the cursor derivatives (default: 0.03).
 
     Returns:
     - None
@@ -20,13 +24,20 @@ def num_sim_update(SIM_STATE_ref: SIM_STATE, max_theta_1):
     double_pendulum = SIM_STATE_ref.get_data_by_key("simulation_config.DOUBLE_PENDULUM")
 
     # Update cursor position and mouse input data in the simulation state
-    cursor_pos.update(
-        SIM_STATE_ref.SIM_STATE_VAR["mouse_input"],
-        SIM_STATE_ref.SIM_STATE_VAR["plotable_datasets"],
-        screen_width_px,
-        False,  # const_null_pos: indicates whether to use a constant null position
-        meter_per_pixel
-    )
+    with span_tracer.span("cursor update"):
+        cursor_pos.update(
+            SIM_STATE_ref.SIM_STATE_VAR["mouse_input"],
+            SIM_STATE_ref.SIM_STATE_VAR["plotable_datasets"],
+            screen_width_px,
+            False,  # const_null_pos: indicates whether to use a constant null position
+            meter_per_pixel,
+            None if cursor_sampler is None else cursor_sampler.ring,
+            fit_window_s,
+            SIM_STATE_ref.input_backend,
+            SIM_STATE_ref.derivative_estimator
+        )
+    # Cursor samples also arrive during a static run, when no steps are published
+    SIM_STATE_ref.events.publish(sim_events.EVT_CURSOR_SAMPLE, len(SIM_STATE_ref.SIM_STATE_VAR["mouse_input"]["x"]))
 
     # Check if sufficient data points exist to start the simulation
     if len(SIM_STATE_ref.read_mouse_input("q_array_list", False)) > 2 + SIM_STATE_ref.get_frame_trim():
@@ -34,11 +45,14 @@ def num_sim_update(SIM_STATE_ref: SIM_STATE, max_theta_1):
         # Check if the simulation is currently running
         if SIM_STATE_ref.run_status() == 2:
             # Perform a single step of the numerical simulation
-            result = num_simulator.num_sim(double_pendulum, SIM_STATE_ref)
+            with span_tracer.span("num_sim"):
+                result = num_simulator.num_sim(double_pendulum, SIM_STATE_ref)
 
             # Update the simulation state with the results
             SIM_STATE_ref.append_DoF_State_Stack(result)
-            SIM_STATE_ref.update_PD_vals()
+            with span_tracer.span("update_PD_vals"):
+                SIM_STATE_ref.update_PD_vals()
+            SIM_STATE_ref.maybe_take_snapshot()
 
             # Stop the simulation if the first pendulum's angle exceeds the maximum limit
             if abs(SIM_STATE_ref.read_DoF_State_Stack(-1, True, False)[0][0][0]) >= max_theta_1:
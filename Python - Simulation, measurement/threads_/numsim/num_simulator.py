@@ -1,4 +1,4 @@
-import time
+from libs import sim_clock
 from threads_.numsim.libs import numsim_steps, move_equations, cart_force
 from libs.varstructs.SIM_STATE import SIM_STATE
 import numpy as np
@@ -102,7 +102,7 @@ def solve_ode(mov_equation, sys_consts, x, q:list, num_method, PD_u_q, PD_m_inpu
     prev_timestamp = x[2]
     if prev_timestamp is None:
         prev_timestamp = q_m2[3]
-    now_timestamp = time.time()
+    now_timestamp = sim_clock.now()
     dt = now_timestamp - prev_timestamp
 
     # Extract acceleration input
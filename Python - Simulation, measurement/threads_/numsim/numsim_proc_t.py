@@ -0,0 +1,362 @@
+import threading
+import queue
+import multiprocessing
+import numpy as np
+from libs.varstructs.SIM_STATE import SIM_STATE
+from libs.varstructs import sim_events
+from libs import rt_profile
+from threads_.numsim.numsim_t import numsim_t
+from threads_.numsim.libs.deadline_scheduler import deadline_scheduler, POLICY_SKIP
+from threads_.numsim.libs import shm_tick_ring as shm
+
+class tick_recorder:
+    """
+    Collects what one physics tick appended to a SIM_STATE into a shared memory tick record.
+
+    The pendulum falling ends the round inside the tick, and the round's histories are reset
+    right after the run status change is published. The recorder therefore also captures the
+    record from the run status event, while the finished round's histories are still intact.
+    """
+
+    def __init__(self, SIM_STATE_ref: SIM_STATE) -> None:
+        """
+        Initializes the recorder.
+
+        Args:
+            SIM_STATE_ref (SIM_STATE): The simulation state the physics ticks append to.
+        """
+        self.SIM_STATE = SIM_STATE_ref
+        self.record = np.zeros(shm.RECORD_WIDTH)
+        self.armed = False
+        self.SIM_STATE.events.subscribe((sim_events.EVT_RUN_STATUS,), sim_events.POLICY_IMMEDIATE, self._on_run_status)
+
+    def _lengths(self):
+        """
+        Returns:
+            tuple: Current lengths of the histories a tick appends to.
+        """
+        mouse_input = self.SIM_STATE.SIM_STATE_VAR["mouse_input"]
+        return (
+            len(mouse_input["x"]),
+            len(mouse_input["dx"]),
+            len(mouse_input["ddx"]),
+            len(self.SIM_STATE.SIM_STATE_VAR["stateVars"]["phi_np_array_list"]),
+            len(self.SIM_STATE.SIM_STATE_VAR["PD_control"]["PD_control_stack"])
+        )
+
+    def arm(self):
+        """
+        Marks the start of a tick.
+        """
+        self.record[:] = np.nan
+        self.record[shm.R_FLAGS] = 0
+        self.record[shm.R_EPOCH] = self.SIM_STATE.data_epoch
+        self._before = self._lengths()
+        self._captured = False
+        self.armed = True
+
+    def _on_run_status(self, event_type, payload):
+        """
+        Captures the record before a round ended by the tick is reset.
+        """
+        prev_state, new_state = payload
+        if self.armed and prev_state == 2:
+            self.capture()
+            self.record[shm.R_FLAGS] = int(self.record[shm.R_FLAGS]) | shm.F_FELL
+
+    def capture(self):
+        """
+        Copies the entries appended since arm() into the record. Only the first call of a tick has an effect.
+        """
+        if self._captured:
+            return
+        self._captured = True
+
+        r = self.record
+        flags = 0
+        mouse_input = self.SIM_STATE.SIM_STATE_VAR["mouse_input"]
+        n_x, n_dx, n_ddx, n_phi, n_pd = self._before
+        if len(mouse_input["x"]) > n_x:
+            flags |= shm.F_X
+            r[shm.R_X:shm.R_X + 2] = mouse_input["x"][-1][:2]
+            r[shm.R_X_POLL] = mouse_input["x"][-1][2]
+        if len(mouse_input["dx"]) > n_dx:
+            flags |= shm.F_DX
+            r[shm.R_DX:shm.R_DX + 3] = mouse_input["dx"][-1]
+        if len(mouse_input["ddx"]) > n_ddx:
+            flags |= shm.F_DDX
+            r[shm.R_DDX:shm.R_DDX + 3] = mouse_input["ddx"][-1]
+            r[shm.R_Q:shm.R_Q + 4] = mouse_input["q_array_list"][-1]
+
+        phi_list = self.SIM_STATE.SIM_STATE_VAR["stateVars"]["phi_np_array_list"]
+        if len(phi_list) > n_phi:
+            flags |= shm.F_STEP
+            x, dx, ts, F1, ddq = phi_list[-1]
+            r[shm.R_PHI:shm.R_PHI + 4] = x[:, 0]
+            r[shm.R_DPHI:shm.R_DPHI + 4] = dx[:, 0]
+            r[shm.R_STEP:shm.R_STEP + 3] = (np.nan if ts is None else ts, F1, ddq)
+
+        pd_stack = self.SIM_STATE.SIM_STATE_VAR["PD_control"]["PD_control_stack"]
+        if len(pd_stack) > n_pd:
+            flags |= shm.F_PD
+            PD_s = pd_stack[-1]
+            ddu, du, u, ts = PD_s["PD_u_q"]
+            r[shm.R_PD_ACT:shm.R_PD_ACT + 4] = (PD_s["PD_phi_1_act"], PD_s["PD_phi_2_act"], PD_s["PD_dphi_1_act"], PD_s["PD_dphi_2_act"])
+            r[shm.R_PD_UQ:shm.R_PD_UQ + 4] = (ddu, du, u, np.nan if ts is None else ts)
+
+        r[shm.R_FLAGS] = flags
+
+    def finish(self, scheduler_stats):
+        """
+        Marks the end of a tick.
+
+        Args:
+            scheduler_stats (dict): Tick statistics of the physics scheduler.
+
+        Returns:
+            numpy.ndarray: The completed record.
+        """
+        self.capture()
+        self.armed = False
+        self.record[shm.R_STATUS] = self.SIM_STATE.run_status()
+        self.record[shm.R_SCHED:shm.R_SCHED + len(shm.SCHED_KEYS)] = [scheduler_stats[key] for key in shm.SCHED_KEYS]
+        return self.record
+
+def physics_process_main(config_dict, DPI_SCALEING, run_status, shm_name, capacity, command_queue):
+    """
+    Entry point of the physics process.
+
+    Runs the numsim loop (cursor sampling, num_sim, update_PD_vals) on a replica of the
+    simulation state and publishes one tick record per tick into the shared memory ring.
+    Commands of the GUI process (run status, rod lengths, restored snapshots) arrive
+    through the command queue and are applied between ticks.
+
+    Args:
+        config_dict (dict): The simulation configuration dictionary.
+        DPI_SCALEING (float): DPI scaling factor for screen dimensions.
+        run_status (int): Run status of the GUI process when the physics process was started.
+        shm_name (str): Name of the shared memory block of the tick ring.
+        capacity (int): Number of records of the tick ring.
+        command_queue (multiprocessing.Queue): Commands from the GUI process.
+    """
+    ring = shm.shm_tick_ring(capacity, shm_name)
+    SIM_STATE_obj = SIM_STATE(config_dict, DPI_SCALEING)
+    SIM_STATE_obj.save_rounds = False
+    SIM_STATE_obj.set_run_status(run_status)
+    # The cursor warps announced by the GUI process unwrap the cursor reads of this process
+    SIM_STATE_obj.input_backend.accumulator.share(ring.header[shm.H_WARPS:shm.H_WARP_SHIFT + 1])
+
+    ring.header[shm.H_RT_APPLIED] = SIM_STATE_obj.rt_profile.apply(rt_profile.ROLE_PHYSICS) + 1
+
+    worker = numsim_t(config_dict, SIM_STATE_obj)
+    recorder = tick_recorder(SIM_STATE_obj)
+    SIM_STATE_obj.gc_policy.freeze_startup()
+    if worker.cursor_sampler is not None:
+        worker.cursor_sampler.start()
+
+    worker.scheduler.start()
+    while SIM_STATE_obj.run_status() != 0:
+        _apply_commands(SIM_STATE_obj, command_queue)
+        if SIM_STATE_obj.run_status() == 0:
+            break
+        recorder.arm()
+        worker.tick()
+        ring.push(recorder.finish(worker.scheduler.stats))
+
+        worker.scheduler.wait()
+
+    if worker.cursor_sampler is not None:
+        worker.cursor_sampler.stop()
+        worker.cursor_sampler.join()
+    SIM_STATE_obj.input_backend.stop()
+    SIM_STATE_obj.input_backend.accumulator.unshare()
+    ring.close()
+
+def _apply_commands(SIM_STATE_ref: SIM_STATE, command_queue):
+    """
+    Applies every pending command of the GUI process to the physics replica.
+    """
+    while True:
+        try:
+            command = command_queue.get_nowait()
+        except queue.Empty:
+            return
+
+        name = command[0]
+        if name == "run_status":
+            SIM_STATE_ref.set_run_status(command[1], command[2])
+        elif name == "rod_lengths":
+            SIM_STATE_ref.update_sys_variables(command[1], command[2])
+        elif name == "snapshot":
+            SIM_STATE_ref.apply_snapshot(command[1])
+
+class numsim_proc_t(threading.Thread):
+    """
+    Runs the numsim loop in a separate process and mirrors its results into SIM_STATE.
+
+    This is the "process" execution mode of the physics engine: the physics ticks run on
+    their own interpreter and GIL, so their timing does not depend on the load of pygame,
+    Tk or matplotlib. The thread forwards run status, rod length and snapshot changes to
+    the physics process and copies its tick records into SIM_STATE, where the GUI, the
+    diagnostics and the round saving read them exactly as in the thread mode.
+
+    Attributes:
+        config_dict (dict): A dictionary containing simulation configuration values.
+        SIM_STATE (SIM_STATE): An instance of SIM_STATE that manages the simulation's state.
+        ring (shm_tick_ring): Shared memory ring of the tick records.
+        process (multiprocessing.Process): The physics process.
+    """
+
+    def __init__(self, config_dict_ref, SIM_STATE_ref: SIM_STATE) -> None:
+        """
+        Initializes the numsim_proc_t class.
+
+        Args:
+            config_dict_ref (dict): A reference to the simulation configuration dictionary.
+            SIM_STATE_ref (SIM_STATE): A reference to the SIM_STATE object for simulation state management.
+        """
+        threading.Thread.__init__(self)
+        self.config_dict = config_dict_ref
+        self.SIM_STATE = SIM_STATE_ref
+
+        if self.SIM_STATE.input_backend.relative and self.config_dict["input_config"].get("input_backend") == "pygame":
+            print("numsim process: the pygame input backend only feeds the GUI process, the physics process gets no input.")
+
+        self.ring = shm.shm_tick_ring(self.config_dict["simulation_config"].get("numsim_ring_capacity", 4096))
+        # The GUI announces its cursor warps into the control block of the ring
+        self.SIM_STATE.input_backend.accumulator.share(self.ring.header[shm.H_WARPS:shm.H_WARP_SHIFT + 1])
+        self.command_queue = multiprocessing.Queue()
+        self.process = None
+
+        self._applying = False
+        self._last_control = (None, None)
+        self.subscription = self.SIM_STATE.events.subscribe(
+            (sim_events.EVT_RUN_STATUS, sim_events.EVT_ROD_LENGTH, sim_events.EVT_SNAPSHOT_RESTORED),
+            sim_events.POLICY_IMMEDIATE,
+            self._forward_event
+        )
+
+    def _forward_event(self, event_type, payload):
+        """
+        Forwards a change of the GUI side SIM_STATE to the physics process.
+        """
+        if event_type == sim_events.EVT_RUN_STATUS:
+            self.command_queue.put(("run_status", payload[1], True))
+            if payload[1] == 2:
+                # New round: filled from the tick records of the physics process
+                self.SIM_STATE.set_data_by_key("run_conditions.scheduler_stats", {
+                    "policy": self.config_dict["simulation_config"].get("tick_policy", "catch_up"),
+                    "target_period_s": self.SIM_STATE.get_data_by_key("simulation_config.SAMPLERATE_S")
+                })
+        elif event_type == sim_events.EVT_ROD_LENGTH:
+            # Rod lengths reset together with a round are reset by the physics process itself
+            if not self._applying:
+                self.command_queue.put(("rod_lengths", payload[0], payload[1]))
+        elif event_type == sim_events.EVT_SNAPSHOT_RESTORED:
+            self.command_queue.put(("snapshot", payload))
+
+    def _apply_record(self, r):
+        """
+        Appends the contents of a tick record to SIM_STATE.
+        """
+        SIM_STATE_VAR = self.SIM_STATE.SIM_STATE_VAR
+        if int(r[shm.R_EPOCH]) != self.SIM_STATE.data_epoch:
+            return  # Recorded before a reset the physics process has not seen yet
+        flags = int(r[shm.R_FLAGS])
+        mouse_input = SIM_STATE_VAR["mouse_input"]
+        plotable_datasets = SIM_STATE_VAR["plotable_datasets"]
+
+        if flags & shm.F_X:
+            mouse_input["x"].append([r[shm.R_X], r[shm.R_X + 1], r[shm.R_X_POLL]])
+            plotable_datasets["x"].append(r[shm.R_X])
+        if flags & shm.F_DX:
+            mouse_input["dx"].append(list(r[shm.R_DX:shm.R_DX + 3]))
+            mouse_input["h_s"].append(r[shm.R_DX + 2])
+            plotable_datasets["dx"].append(r[shm.R_DX])
+        if flags & shm.F_DDX:
+            mouse_input["ddx"].append(list(r[shm.R_DDX:shm.R_DDX + 3]))
+            plotable_datasets["ddx"].append(r[shm.R_DDX])
+            q = list(r[shm.R_Q:shm.R_Q + 4])
+            mouse_input["ddx_m"].append(q[2])
+            mouse_input["q_array_list"].append(q)
+            plotable_datasets["x_m"].append(q[0])
+            plotable_datasets["dx_m"].append(q[1])
+            plotable_datasets["ddx_m"].append(q[2])
+        if flags & shm.F_X:
+            self.SIM_STATE.events.publish(sim_events.EVT_CURSOR_SAMPLE, len(mouse_input["x"]))
+
+        if flags & shm.F_STEP:
+            ts = r[shm.R_STEP]
+            self.SIM_STATE.append_DoF_State_Stack([
+                r[shm.R_PHI:shm.R_PHI + 4].reshape(4, 1).copy(),
+                r[shm.R_DPHI:shm.R_DPHI + 4].reshape(4, 1).copy(),
+                None if np.isnan(ts) else ts,
+                r[shm.R_STEP + 1],
+                r[shm.R_STEP + 2]
+            ])
+        if flags & shm.F_PD:
+            ts = r[shm.R_PD_UQ + 3]
+            SIM_STATE_VAR["PD_control"]["PD_control_stack"].append({
+                "PD_phi_1_act": r[shm.R_PD_ACT],
+                "PD_phi_2_act": r[shm.R_PD_ACT + 1],
+                "PD_dphi_1_act": r[shm.R_PD_ACT + 2],
+                "PD_dphi_2_act": r[shm.R_PD_ACT + 3],
+                "PD_u_q": [r[shm.R_PD_UQ], r[shm.R_PD_UQ + 1], r[shm.R_PD_UQ + 2], None if np.isnan(ts) else ts]
+            })
+        if flags & shm.F_STEP:
+            self.SIM_STATE.maybe_take_snapshot()
+
+        if self.SIM_STATE.run_status() == 2:
+            stats = SIM_STATE_VAR["run_conditions"]["scheduler_stats"]
+            for i, key in enumerate(shm.SCHED_KEYS):
+                value = float(r[shm.R_SCHED + i])
+                stats[key] = value if key.endswith("_s") else int(value)
+            stats["achieved_rate_hz"] = 1 / stats["mean_period_s"] if stats["mean_period_s"] > 0 else 0.0
+
+        if flags & shm.F_FELL and self.SIM_STATE.run_status() == 2:
+            self.SIM_STATE.set_run_status(1)
+
+    def run(self) -> None:
+        """
+        Starts the physics process and mirrors its tick records until the simulation stops.
+        """
+        sample_rate_s = self.SIM_STATE.get_data_by_key("simulation_config.SAMPLERATE_S")
+        self.process = multiprocessing.Process(
+            target=physics_process_main,
+            args=(self.config_dict, self.SIM_STATE.get_data_by_key("GUI_conditions.DPI_SCALEING"),
+                  self.SIM_STATE.run_status(), self.ring.name, self.ring.capacity, self.command_queue),
+            daemon=True
+        )
+        self.process.start()
+
+        # Poll the ring several times per physics tick so the mirror lags by less than a tick
+        scheduler = deadline_scheduler(sample_rate_s / 4, POLICY_SKIP, spin_s=0)
+        rt_reported = False
+        while self.SIM_STATE.run_status() != 0:
+            self._apply_records()
+            if not rt_reported and self.ring.header[shm.H_RT_APPLIED] > 0:
+                # The real-time profile the physics process applied to itself
+                self.SIM_STATE.rt_profile.record_role(rt_profile.ROLE_PHYSICS, int(self.ring.header[shm.H_RT_APPLIED]) - 1)
+                rt_reported = True
+            scheduler.wait()
+
+        self.SIM_STATE.events.unsubscribe(self.subscription)
+        self.command_queue.put(("run_status", 0, True))
+        self.process.join()
+        if self.ring.lost_records:
+            print(f"numsim process: {self.ring.lost_records} tick records were lost.")
+        self.SIM_STATE.input_backend.accumulator.unshare()
+        self.ring.close()
+
+        return super().run()
+
+    def _apply_records(self):
+        """
+        Applies the tick records published since the previous call.
+        """
+        for r in self.ring.read_new():
+            self._applying = True
+            try:
+                self._apply_record(r)
+            finally:
+                self._applying = False
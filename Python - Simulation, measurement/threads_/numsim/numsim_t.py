@@ -1,7 +1,10 @@
 import threading
 from libs.varstructs.SIM_STATE import SIM_STATE
-import time
+from libs import rt_profile
+from libs import span_tracer
 from threads_.numsim.num_sim_loop import num_sim_update
+from threads_.numsim.libs.deadline_scheduler import deadline_scheduler
+from threads_.numsim.libs.cursor_sampler import cursor_sampler_t
 
 class numsim_t(threading.Thread):
     """
@@ -10,6 +13,8 @@ class numsim_t(threading.Thread):
     Attributes:
         config_dict (dict): A dictionary containing simulation configuration values.
         SIM_STATE (SIM_STATE): An instance of SIM_STATE that manages the simulation's state.
+        scheduler (deadline_scheduler): Fixed-rate scheduler of the simulation ticks.
+        cursor_sampler (cursor_sampler_t): High-rate cursor sampler, or None if disabled.
     """
 
     def __init__(self, config_dict_ref, SIM_STATE_ref: SIM_STATE) -> None:
@@ -24,15 +29,66 @@ class numsim_t(threading.Thread):
         self.config_dict = config_dict_ref  # Store the reference to the configuration dictionary.
         self.SIM_STATE = SIM_STATE_ref      # Store the reference to the SIM_STATE object.
 
+        sim_config = self.config_dict["simulation_config"]
+        self.scheduler = deadline_scheduler(
+            self.SIM_STATE.get_data_by_key("simulation_config.SAMPLERATE_S"),
+            sim_config.get("tick_policy", "catch_up"),
+            sim_config.get("tick_spin_s", 0.002),
+            sim_config.get("tick_max_catch_up", 3)
+        )
+
+        # A sample rate of 0 reads the cursor once per tick instead
+        input_config = self.config_dict["input_config"]
+        sample_rate_hz = input_config.get("cursor_sample_rate_hz", 1000)
+        self.fit_window_s = input_config.get("cursor_fit_window_s", 0.03)
+        self.cursor_sampler = cursor_sampler_t(self.SIM_STATE, sample_rate_hz) if sample_rate_hz > 0 else None
+        self._prev_status = None
+
     def run(self) -> None:
         """
         Starts the simulation thread and continuously updates the simulation state while it is active.
         """
+        self.SIM_STATE.rt_profile.apply(rt_profile.ROLE_PHYSICS)
+        if self.cursor_sampler is not None:
+            self.cursor_sampler.start()
+        self.scheduler.start()
         while self.SIM_STATE.run_status() != 0:  # 0 indicates the simulation is stopped.
-            # Update the simulation state using the num_sim_update function.
-            num_sim_update(self.SIM_STATE, self.config_dict["simulation_config"]["maximum_theta1_rad"])
+            self.tick()
+
+            # Wait for the next deadline of the fixed-rate tick grid.
+            self.scheduler.wait()
+            self.SIM_STATE.overload.report(self.scheduler.last_overrun)
 
-            # Sleep for the simulation's sampling rate to control update frequency.
-            time.sleep(self.SIM_STATE.get_data_by_key("simulation_config.SAMPLERATE_S"))
+        if self.cursor_sampler is not None:
+            self.cursor_sampler.stop()
+            self.cursor_sampler.join()
+        self.SIM_STATE.input_backend.stop()
 
         return super().run()
+
+    def tick(self):
+        """
+        Runs one simulation tick and keeps the per-round tick statistics.
+        """
+        status = self.SIM_STATE.run_status()
+        prev_status = self._prev_status
+        if status == 2 and prev_status != 2:
+            # New round: the tick statistics are saved with it
+            self.SIM_STATE.set_data_by_key("run_conditions.scheduler_stats", self.scheduler.reset_stats())
+        elif status != 2 and prev_status == 2:
+            self.print_scheduler_stats()
+        self._prev_status = status
+
+        # Update the simulation state using the num_sim_update function.
+        with span_tracer.span("physics tick"):
+            num_sim_update(self.SIM_STATE, self.config_dict["simulation_config"]["maximum_theta1_rad"],
+                           self.cursor_sampler, self.fit_window_s)
+
+    def print_scheduler_stats(self):
+        """
+        Prints the tick statistics of the last round.
+        """
+        stats = self.scheduler.stats
+        print(f"numsim ticks: {stats['ticks']}, rate: {stats['achieved_rate_hz']:.2f} Hz "
+              f"(target: {1 / stats['target_period_s']:.2f} Hz), jitter: {stats['period_jitter_s'] * 1000:.3f} ms, "
+              f"overruns: {stats['overruns']}, skipped: {stats['skipped_ticks']}, max lateness: {stats['max_lateness_s'] * 1000:.3f} ms")
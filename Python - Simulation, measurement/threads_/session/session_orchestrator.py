@@ -0,0 +1,294 @@
+import asyncio
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import threads_.diag.diag_update_loop as diag_update_loop
+from libs.varstructs.SIM_STATE import SIM_STATE
+from libs.varstructs import sim_events
+from libs import rt_profile
+from threads_.numsim.numsim_t import numsim_t
+from threads_.numsim.libs.output_data_saver import output_data_saver
+from threads_.numsim.libs.deadline_scheduler import deadline_scheduler, POLICY_SKIP
+
+AUTOSAVE_FILE_NAME = "autosave.csv"
+
+class periodic_task:
+    """
+    A job run by the session orchestrator on a fixed period.
+
+    Deadlines come from a deadline_scheduler, so the period does not drift with the run time
+    of the job. A run is awaited before the next one is scheduled, which is the back-pressure:
+    a job that is slower than its period never queues up runs, the missed deadlines are
+    accounted as overruns and skipped (or caught up, by the scheduler's policy) instead.
+
+    Attributes:
+        name (str): Name of the task in the statistics.
+        scheduler (deadline_scheduler): Deadline grid and statistics of the task.
+        job (callable): The job. Blocking jobs run in the executor.
+        executor (Executor): Executor of the job, or None to run it on the event loop.
+        condition (callable): Optional predicate; the job only runs on ticks where it returns True.
+    """
+
+    def __init__(self, name, scheduler: deadline_scheduler, job, executor=None, condition=None) -> None:
+        """
+        Initializes the task.
+
+        Args:
+            name (str): Name of the task.
+            scheduler (deadline_scheduler): Deadline grid of the task.
+            job (callable): The job to run.
+            executor (Executor, optional): Executor of the job.
+            condition (callable, optional): Predicate deciding whether a tick runs the job.
+        """
+        self.name = name
+        self.scheduler = scheduler
+        self.job = job
+        self.executor = executor
+        self.condition = condition
+        self.runs = 0
+
+    async def run(self):
+        """
+        Runs the job on its period until the task is cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        self.scheduler.start()
+        while True:
+            delay = self.scheduler.time_to_deadline()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.scheduler.mark_tick(delay > 0)
+
+            if self.condition is not None and not self.condition():
+                continue
+            if self.executor is None:
+                self.job()
+            else:
+                await loop.run_in_executor(self.executor, self.job)
+            self.runs += 1
+
+class session_orchestrator(threading.Thread):
+    """
+    asyncio based orchestration of a simulation session.
+
+    Instead of free-running threads that each poll run_status, every periodic piece of the
+    session is a task on one event loop, with an explicit period, cancellation and
+    back-pressure:
+
+    - physics: numsim_t.tick() every SAMPLERATE_S, in a dedicated executor thread
+    - diag: diagnostic refresh on simulation_config.diag_refresh_s, only when the state changed
+    - autosave: checkpoint of the running round every simulation_config.autosave_period_s
+    - rod length schedule: sleeps until the next scheduled rod length decrease
+
+    The blocking parts run in executors: the pygame render loop (simgui_t.run), the diag
+    widget updates and the round and checkpoint file writes. The session ends when the
+    run status becomes 0: the tasks are cancelled, the pending file writes are finished
+    and the executors are shut down.
+
+    The high-rate cursor sampler stays a thread of its own, a 1 kHz job is below the timer
+    resolution of an event loop.
+
+    Attributes:
+        config_dict (dict): A dictionary containing simulation configuration values.
+        SIM_STATE (SIM_STATE): An instance of SIM_STATE that manages the simulation's state.
+        simgui_thread (simgui_t): The simulation GUI; its render loop runs in an executor.
+        numsim_thread (numsim_t): Provides the physics tick; not started as a thread.
+        diag_gui (diag_gui_widget): The diagnostic widget.
+        tasks (list): The periodic tasks of the session.
+    """
+
+    def __init__(self, config_dict_ref, SIM_STATE_ref: SIM_STATE, simgui_thread, numsim_thread, diag_gui) -> None:
+        """
+        Initializes the orchestrator.
+
+        Args:
+            config_dict_ref (dict): A reference to the simulation configuration dictionary.
+            SIM_STATE_ref (SIM_STATE): A reference to the SIM_STATE object.
+            simgui_thread (simgui_t): The simulation GUI.
+            numsim_thread (numsim_t or numsim_proc_t): The physics engine. A numsim_proc_t is started as its own thread.
+            diag_gui (diag_gui_widget): The diagnostic widget.
+        """
+        threading.Thread.__init__(self)
+        self.config_dict = config_dict_ref
+        self.SIM_STATE = SIM_STATE_ref
+        self.simgui_thread = simgui_thread
+        self.numsim_thread = numsim_thread
+        self.diag_gui = diag_gui
+        self.tasks = []
+
+        sim_config = self.config_dict["simulation_config"]
+        self.sample_rate_s = self.SIM_STATE.get_data_by_key("simulation_config.SAMPLERATE_S")
+        self.diag_refresh_s = sim_config.get("diag_refresh_s", self.sample_rate_s)
+        self.autosave_period_s = sim_config.get("autosave_period_s", 10.0)
+
+        # The executor threads take the real-time profile of their role when they start
+        apply_profile = self.SIM_STATE.rt_profile.apply
+        self._physics_executor = ThreadPoolExecutor(1, "physics", apply_profile, (rt_profile.ROLE_PHYSICS,))
+        self._gui_executor = ThreadPoolExecutor(2, "gui", apply_profile, (rt_profile.ROLE_RENDER,))
+        self._io_executor = ThreadPoolExecutor(1, "io", apply_profile, (rt_profile.ROLE_IO,))
+        self._stop_event = None
+        self._loop = None
+
+        self.diag_subscription = self.SIM_STATE.events.subscribe(sim_events.ALL_EVENTS, sim_events.POLICY_LATEST)
+        self.status_subscription = self.SIM_STATE.events.subscribe(
+            (sim_events.EVT_RUN_STATUS,), sim_events.POLICY_IMMEDIATE, self._on_run_status)
+
+        # The orchestrator runs the rod length schedule and writes the rounds
+        self.simgui_thread.rod_schedule_external = True
+        self._round_started = None
+
+    def _on_run_status(self, event_type, payload):
+        """
+        Wakes the event loop on the run status changes the session reacts to.
+        """
+        prev_state, new_state = payload
+        if self._loop is None:
+            return
+        if new_state == 2:
+            self._loop.call_soon_threadsafe(self._round_started.set)
+        elif new_state == 0:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+    def _save_round(self, frozen_state_var):
+        """
+        Round save handler of SIM_STATE: queues the file write of a finished round.
+        Called on the thread that ended the round.
+        """
+        self._io_executor.submit(self._write_round, frozen_state_var)
+
+    def _write_round(self, frozen_state_var):
+        """
+        Writes a finished round and removes the checkpoint of it.
+        """
+        csv_file_path = self.SIM_STATE.data_saver_obj.save_new_round(frozen_state_var)
+        self.SIM_STATE.events.publish(sim_events.EVT_ROUND_SAVED, csv_file_path)
+
+        autosave_path = os.path.join(self.SIM_STATE.data_saver_obj.section_folder_path, AUTOSAVE_FILE_NAME)
+        if os.path.exists(autosave_path):
+            os.remove(autosave_path)
+
+    def _autosave(self):
+        """
+        Writes a checkpoint of the running round into the section folder.
+        """
+        saver = self.SIM_STATE.data_saver_obj
+        if saver.section_folder_path is None:
+            saver.new_section()
+        output_data_saver._save_output_file(AUTOSAVE_FILE_NAME, saver.section_folder_path, self.SIM_STATE.freeze_round_data())
+
+    def _physics_tick(self):
+        """
+        Runs a physics tick and reports whether its deadline was met to the overload controller.
+        """
+        self.SIM_STATE.overload.report(self.numsim_thread.scheduler.last_overrun)
+        self.numsim_thread.tick()
+
+    def _on_task_done(self, task):
+        """
+        Ends the session when one of its tasks stops on an exception, so the session never runs
+        on without physics.
+        """
+        if task.cancelled() or task.exception() is None:
+            return
+        print(f"session task {task.get_name()} failed, stopping the session:")
+        traceback.print_exception(task.exception())
+        self.SIM_STATE.set_run_status(0)
+        self._stop_event.set()
+
+    def _diag_pending(self):
+        """
+        Returns:
+            bool: True if the simulation state changed since the last diag refresh.
+        """
+        if not self.diag_subscription.pending():
+            return False
+        self.diag_subscription.drain()
+        return True
+
+    async def _rod_length_schedule(self):
+        """
+        Applies the rod length schedule of each round, sleeping until the next decrease is due.
+        """
+        schedule = self.simgui_thread.rod_schedule
+        while True:
+            await self._round_started.wait()
+            self._round_started.clear()
+            schedule.restart()
+
+            while self.SIM_STATE.run_status() == 2 and not self._round_started.is_set():
+                due = schedule.next_due()
+                if due is None:
+                    break
+                await asyncio.sleep(max(0.0, due - time.time()))
+                if self.SIM_STATE.run_status() == 2:
+                    schedule.poll()
+
+    async def _session(self):
+        """
+        Runs the session until the run status becomes 0.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._round_started = asyncio.Event()
+        self.SIM_STATE.round_save_handler = self._save_round
+
+        physics_in_process = not isinstance(self.numsim_thread, numsim_t)
+        if physics_in_process:
+            self.numsim_thread.start()
+        else:
+            if self.numsim_thread.cursor_sampler is not None:
+                self.numsim_thread.cursor_sampler.start()
+            self.tasks.append(periodic_task("physics", self.numsim_thread.scheduler, self._physics_tick, self._physics_executor))
+
+        self.tasks.append(periodic_task(
+            "diag", deadline_scheduler(self.diag_refresh_s, POLICY_SKIP),
+            lambda: diag_update_loop.diag_update_values(self.SIM_STATE, self.diag_gui),
+            self._gui_executor, self._diag_pending))
+        if self.autosave_period_s > 0:
+            self.tasks.append(periodic_task(
+                "autosave", deadline_scheduler(self.autosave_period_s, POLICY_SKIP),
+                self._autosave, self._io_executor, lambda: self.SIM_STATE.run_status() == 2))
+
+        running = [asyncio.create_task(task.run(), name=task.name) for task in self.tasks]
+        running.append(asyncio.create_task(self._rod_length_schedule(), name="rod length schedule"))
+        for task in running:
+            task.add_done_callback(self._on_task_done)
+        gui_future = self._loop.run_in_executor(self._gui_executor, self.simgui_thread.run)
+
+        if self.SIM_STATE.run_status() != 0:
+            await self._stop_event.wait()
+
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        await gui_future
+
+    def run(self) -> None:
+        """
+        Runs the session's event loop and shuts the session down when it ends.
+        """
+        try:
+            asyncio.run(self._session())
+        finally:
+            if isinstance(self.numsim_thread, numsim_t):
+                if self.numsim_thread.cursor_sampler is not None:
+                    self.numsim_thread.cursor_sampler.stop()
+                    self.numsim_thread.cursor_sampler.join()
+                self.SIM_STATE.input_backend.stop()
+            elif self.numsim_thread.is_alive():
+                self.numsim_thread.join()
+
+            self._physics_executor.shutdown(wait=True)
+            self._gui_executor.shutdown(wait=True)
+            self._io_executor.shutdown(wait=True)  # Pending round writes are finished
+            self.SIM_STATE.round_save_handler = None
+            self.SIM_STATE.events.unsubscribe(self.diag_subscription)
+            self.SIM_STATE.events.unsubscribe(self.status_subscription)
+
+            for task in self.tasks:
+                stats = task.scheduler.stats
+                print(f"session task {task.name}: runs: {task.runs}, rate: {stats['achieved_rate_hz']:.2f} Hz, "
+                      f"overruns: {stats['overruns']}, skipped: {stats['skipped_ticks']}")
+            print("Session orchestrator stopping...")
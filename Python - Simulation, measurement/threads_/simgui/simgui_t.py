@@ -11,6 +11,12 @@ from threads_.simgui.overlays import msg_overlay
 from threads_.simgui.overlays import dim_scale_overlay
 from threads_.simgui.libs import graphics_draw_figure as gdf
 from libs.varstructs.SIM_STATE import SIM_STATE
+from libs.varstructs import sim_events
+from libs import rt_profile
+from libs import overload_controller
+from libs import span_tracer
+from threads_.numsim.libs.rod_length_schedule import rod_length_schedule
+from threads_.numsim.libs.input_backends.pygame_backend import pygame_backend
 import os 
 from screeninfo import get_monitors
 import traceback
@@ -74,8 +80,15 @@ class simgui_t(threading.Thread):
         self.is_fullscreen = False
 
         self.rdt_cntr_update_flag = True
-        self.rdt_cntr_strt_1 = -1
-        self.rdt_cntr_strt_2 = -1
+        self.rod_schedule = rod_length_schedule(self.config_dict, self.SIM_STATE)
+        # Set when the rod length schedule is run by the session orchestrator instead of the render loop
+        self.rod_schedule_external = False
+
+        # The info overlay is re-formatted only when the values it shows change
+        self.info_subscription = self.SIM_STATE.events.subscribe(
+            (sim_events.EVT_RUN_STATUS, sim_events.EVT_ROD_LENGTH, sim_events.EVT_GAIN), sim_events.POLICY_LATEST)
+        self.info_overlay_dirty = True
+        self.info_overlay_parts = ("", "")
 
         self.init_pygame_panel()
 
@@ -94,6 +107,7 @@ class simgui_t(threading.Thread):
         """
         Main thread function to handle GUI events and updates during the simulation.
         """
+        self.SIM_STATE.rt_profile.apply(rt_profile.ROLE_RENDER)
         last_center_top_msg = ""
         string_tmp_1 = ""
 
@@ -132,10 +146,19 @@ class simgui_t(threading.Thread):
                         elif self.SIM_STATE.run_status() == 2:
                             self.SIM_STATE.set_run_status(1)
 
+                    elif event.key == pygame.K_r:
+                        # Restore the state from a few seconds before the last fall
+                        if self.SIM_STATE.run_status() == 1:
+                            self.SIM_STATE.restore_snapshot_before_last_fall()
+
                     elif event.key == pygame.K_q:
                         self.SIM_STATE.set_run_status(0)
                         to_status_zero_flag = True
 
+                    elif event.key == pygame.K_t:
+                        # Start tracing, or stop it and save the trace
+                        self.toggle_trace()
+
                 # Check if the window is active or inactive
                 if event.type == pygame.ACTIVEEVENT:
                     if event.state == 1:  # Window focus changes
@@ -144,25 +167,24 @@ class simgui_t(threading.Thread):
                 # Check if the mouse is over the Pygame window
                 if event.type == pygame.MOUSEMOTION:
                     cursor_in_window = pygame.mouse.get_focused()
+                    if isinstance(self.SIM_STATE.input_backend, pygame_backend):
+                        self.SIM_STATE.input_backend.feed_motion(event.rel[0], getattr(event, "timestamp", None))
 
             if to_status_zero_flag:
                 break
 
-            # Handle infinite space for mouse cursor
-            if cursor_in_window and is_active and self.SIM_STATE.get_data_by_key("GUI_conditions.INFINITE_SPACE"):
+            # Handle infinite space for mouse cursor; relative input backends need no cursor warping
+            if (cursor_in_window and is_active and self.SIM_STATE.get_data_by_key("GUI_conditions.INFINITE_SPACE")
+                    and not self.SIM_STATE.input_backend.relative):
                 x, y = pygame.mouse.get_pos()
 
-                if self.SIM_STATE.SIM_STATE_VAR["mouse_input"]["cursor_replace_flag"] == 0:
-                    if x < 2:
-                        self.SIM_STATE.SIM_STATE_VAR["mouse_input"]["cursor_replace_flag"] = 1
-                        pygame.mouse.set_pos(self.win_w - 2, y)
-                        self.SIM_STATE.SIM_STATE_VAR["mouse_input"]["replace_counter"] -= 1
-                        self.SIM_STATE.SIM_STATE_VAR["mouse_input"]["cursor_replace_flag"] = 2
-                    elif x > self.win_w - 2:
-                        self.SIM_STATE.SIM_STATE_VAR["mouse_input"]["cursor_replace_flag"] = 1
-                        pygame.mouse.set_pos(2, y)
-                        self.SIM_STATE.SIM_STATE_VAR["mouse_input"]["replace_counter"] += 1
-                        self.SIM_STATE.SIM_STATE_VAR["mouse_input"]["cursor_replace_flag"] = 2
+                # The warp is announced before the pointer moves, so the backend unwraps every read
+                if x < 2:
+                    self.SIM_STATE.input_backend.accumulator.warp(x, self.win_w - 2)
+                    pygame.mouse.set_pos(self.win_w - 2, y)
+                elif x > self.win_w - 2:
+                    self.SIM_STATE.input_backend.accumulator.warp(x, 2)
+                    pygame.mouse.set_pos(2, y)
 
             # Fill background with color
             self.window.fill(self.config_dict["sim_gui_config"]["bg_color_-"])
@@ -170,76 +192,86 @@ class simgui_t(threading.Thread):
             self._window_pos_update()
 
             # Handle mouse input and draw pendulum
-            if len(self.SIM_STATE.read_mouse_input("x", False)) > 0:
-                raw_cart_x = (self.SIM_STATE.read_mouse_input("x", True)[-1][0] -
-                              self.SIM_STATE.get_data_by_key("mouse_input.replace_counter") * (self.win_w - 2) +
-                              self.SIM_STATE.read_PD_u_q()[2])
-
-                DoF_State = self.SIM_STATE.read_DoF_State_Stack(-1, True)[0]
-                cart_x = self.mouse_pos_to_viewport_pos(raw_cart_x)
-
-                end_a, end_b = gdf.draw_figure(self,
-                                               cart_x,
-                                               self.rect_y,
-                                               DoF_State[0][0],
-                                               DoF_State[1][0],
-                                               self.SIM_STATE.get_l1(),
-                                               self.SIM_STATE.get_l2(),
-                                               self.config_dict["graphics_config"]["figure_config"],
-                                               self.SIM_STATE.get_data_by_key("GUI_conditions.dim_scale"),
-                                               self.config_dict["geometry_config"]["mass_visibile"],
-                                               self.config_dict["geometry_config"]["rod_a_visibile"],
-                                               self.SIM_STATE.get_data_by_key("simulation_config.DOUBLE_PENDULUM") and
-                                               self.config_dict["geometry_config"]["rod_b_visibile"],
-                                               self.SIM_STATE.get_data_by_key("GUI_conditions.INFINITE_SPACE"))
+            with span_tracer.span("render"):
+                if len(self.SIM_STATE.read_mouse_input("x", False)) > 0:
+                    raw_cart_x = (self.SIM_STATE.read_mouse_input("x", True)[-1][0] -
+                                  self.SIM_STATE.input_backend.accumulator.shift_px +
+                                  self.SIM_STATE.read_PD_u_q()[2])
+
+                    DoF_State = self.SIM_STATE.read_DoF_State_Stack(-1, True)[0]
+                    cart_x = self.mouse_pos_to_viewport_pos(raw_cart_x)
+
+                    end_a, end_b = gdf.draw_figure(self,
+                                                   cart_x,
+                                                   self.rect_y,
+                                                   DoF_State[0][0],
+                                                   DoF_State[1][0],
+                                                   self.SIM_STATE.get_l1(),
+                                                   self.SIM_STATE.get_l2(),
+                                                   self.config_dict["graphics_config"]["figure_config"],
+                                                   self.SIM_STATE.get_data_by_key("GUI_conditions.dim_scale"),
+                                                   self.config_dict["geometry_config"]["mass_visibile"],
+                                                   self.config_dict["geometry_config"]["rod_a_visibile"],
+                                                   self.SIM_STATE.get_data_by_key("simulation_config.DOUBLE_PENDULUM") and
+                                                   self.config_dict["geometry_config"]["rod_b_visibile"],
+                                                   self.SIM_STATE.get_data_by_key("GUI_conditions.INFINITE_SPACE"))
 
             # Display messages and overlay information
-            if self.SIM_STATE.run_status() == 1:
-                self.rdt_cntr_update_flag = True
-                msg_overlay.msg_center(self, "Press...\nSPACE - start a new simulation\nQ - quit")
-            elif self.SIM_STATE.run_status() == 2:
-                self.check_for_length_decrease()
-                last_center_top_msg = f"{time.time() - self.SIM_STATE.get_data_by_key('run_conditions.simulation_timer')['start']:.2f} s"
-
-            msg_overlay.msg_center_top(self, last_center_top_msg)
-
-            msg_right_top_str=f"{self.SIM_STATE.SIM_STATE_VAR["meta"]["SIM_TITLE"]}\n{string_tmp_1}"
-            if self.SIM_STATE.get_data_by_key("simulation_config.DOUBLE_PENDULUM"):
-                msg_right_top_str+=f"\nrod a length [m]: {self.SIM_STATE.get_l1():.2f}"
-                msg_right_top_str+=f"\nrod b length [m]: {self.SIM_STATE.get_l2():.2f}"
-            else:
-                msg_right_top_str+=f"\nrod a length [m]: {self.SIM_STATE.get_l1():.2f}"
-            
-            msg_right_top_str+=f"\ntime delay [s]: {self.config_dict["simulation_config"]["time_delay_s"]:.2f}"
-            msg_right_top_str+=f"\nnumeric method: {self.SIM_STATE.get_data_by_key("simulation_config.NUM_METHOD")}"
-            msg_right_top_str+=f"\nresolution [px]: {self.SIM_STATE.get_data_by_key("GUI_conditions.WIN_DIMS")}"
-            msg_right_top_str+=f"\nfps: {self.SIM_STATE.get_data_by_key("run_conditions.fps"):.2f}"
-            if self.SIM_STATE.get_data_by_key("PD_control.PD_CONTROL_ON"):
-                msg_right_top_str+=f"\nControl method: {self.SIM_STATE.get_data_by_key("PD_control.CONTROL_METHOD")}"
-                msg_right_top_str+=f"\ntimedelay: {(self.SIM_STATE.get_frame_trim(True)*self.SIM_STATE.get_data_by_key("simulation_config.SAMPLERATE_S")):.3f} s"
-                msg_right_top_str+=f"\n -> K: [{self.SIM_STATE.get_data_by_key("PD_control.PD_K_1"):.2f}, {self.SIM_STATE.get_data_by_key("PD_control.PD_K_2"):.2f}, {self.SIM_STATE.get_data_by_key("PD_control.PD_K_3"):.2f}, {self.SIM_STATE.get_data_by_key("PD_control.PD_K_4"):.2f}]"
-            else:
-                msg_right_top_str+=f"\nWithout control loop."
-            msg_overlay.msg_left_top(self,msg_right_top_str)
+            with span_tracer.span("overlays"):
+                if self.SIM_STATE.run_status() == 1:
+                    self.rdt_cntr_update_flag = True
+                    msg_overlay.msg_center(self, "Press...\nSPACE - start a new simulation\nR - retry from before the last fall\nQ - quit")
+                elif self.SIM_STATE.run_status() == 2:
+                    self.check_for_length_decrease()
+                    last_center_top_msg = f"{time.time() - self.SIM_STATE.get_data_by_key('run_conditions.simulation_timer')['start']:.2f} s"
+
+                msg_overlay.msg_center_top(self, last_center_top_msg)
+
+                overload = self.SIM_STATE.overload
+                if not overload.sheds(overload_controller.LEVEL_OVERLAY_TEXT):
+                    if self.info_overlay_dirty or self.info_subscription.pending():
+                        self.info_subscription.drain()
+                        self.info_overlay_dirty = False
+                        self.info_overlay_parts = self._format_info_overlay(string_tmp_1)
+                    msg_right_top_str=f"{self.info_overlay_parts[0]}\nfps: {self.SIM_STATE.get_data_by_key('run_conditions.fps'):.2f}{self.info_overlay_parts[1]}"
+                    msg_overlay.msg_left_top(self,msg_right_top_str)
             
-            x_axis_start_pos, x_axis_end_pos, y_axis_start_pos, y_axis_end_pos,x_axis_length_in_m,y_axis_length_in_m,x_axis_unti,y_axis_unti,rot_ref_end_pos, phi_ref_deg_rounded=dim_scale_overlay.calculate_dim_scale_props(
-                self,10,self.rect_y,self.SIM_STATE.get_data_by_key("GUI_conditions.dim_scale"))
-            dim_scale_overlay.draw_dim_scale(self,x_axis_start_pos, x_axis_end_pos, y_axis_start_pos, y_axis_end_pos,x_axis_length_in_m,y_axis_length_in_m,x_axis_unti,y_axis_unti,rot_ref_end_pos, phi_ref_deg_rounded)
-            
-            pygame.display.flip()
-            self.clock.tick(60)
+                x_axis_start_pos, x_axis_end_pos, y_axis_start_pos, y_axis_end_pos,x_axis_length_in_m,y_axis_length_in_m,x_axis_unti,y_axis_unti,rot_ref_end_pos, phi_ref_deg_rounded=dim_scale_overlay.calculate_dim_scale_props(
+                    self,10,self.rect_y,self.SIM_STATE.get_data_by_key("GUI_conditions.dim_scale"))
+                dim_scale_overlay.draw_dim_scale(self,x_axis_start_pos, x_axis_end_pos, y_axis_start_pos, y_axis_end_pos,x_axis_length_in_m,y_axis_length_in_m,x_axis_unti,y_axis_unti,rot_ref_end_pos, phi_ref_deg_rounded)
+
+            with span_tracer.span("flip"):
+                pygame.display.flip()
+
+            # A frame whose work took longer than its budget missed its deadline
+            target_fps = 30 if overload.sheds(overload_controller.LEVEL_RENDER_RATE) else 60
+            overload.report(time.time() - tmp_timer_for_fps_start > 1 / target_fps)
+            self.clock.tick(target_fps)
 
             divider = time.time() - tmp_timer_for_fps_start
             if divider < 0.00000001:
                 divider = 0.00000001
             self.SIM_STATE.set_data_by_key("run_conditions.fps", 1 / divider)
 
+        self.SIM_STATE.events.unsubscribe(self.info_subscription)
+
         if self.stop_callback_function is not None:
             self.stop_callback_function()
 
         simgui_t.pygame_quit()
         print("SimGUI thread finished.")
         
+    def toggle_trace(self):
+        """
+        Switches the span tracer on, or switches it off and saves the trace into the section folder.
+        """
+        if span_tracer.is_enabled():
+            span_tracer.set_enabled(False)
+            self.SIM_STATE.data_saver_obj.save_trace()
+        else:
+            span_tracer.set_enabled(True)
+            print("Tracing started, press T again to save the trace.")
+
     def pygame_quit():
         """
         Safely quit the Pygame environment and close the GUI panel.
@@ -317,6 +349,9 @@ class simgui_t(threading.Thread):
         if self.SIM_STATE.get_data_by_key("GUI_conditions.INFINITE_SPACE") or self.SIM_STATE.get_data_by_key("GUI_conditions.FULLSCREEN"):
             self.set_fullscreen(True)
             self.set_cursor_visibility(False)
+            if self.SIM_STATE.input_backend.relative:
+                # Grabbed input with a hidden cursor: SDL reports relative motion beyond the screen edges
+                pygame.event.set_grab(True)
         else:
             self.maximize_pygame_window()
 
@@ -385,53 +420,49 @@ class simgui_t(threading.Thread):
                                 self.SIM_STATE.get_data_by_key("simulation_config.DOUBLE_PENDULUM") and self.config_dict["geometry_config"]["rod_b_visibile"])
         self.SIM_STATE.set_data_by_key("GUI_conditions.dim_scale", dim_scale)
         self.SIM_STATE.set_data_by_key("GUI_conditions.WIN_DIMS", [self.win_w, self.win_h])
+        self.info_overlay_dirty = True
         self.rect_y = self.win_h - self.config_dict["graphics_config"]["figure_pos_y_px"]
 
+    def _format_info_overlay(self, sim_type_str):
+        """
+        Format the parts of the top-left info overlay that only change with the run status,
+        the rod lengths or the control gains. The fps line is inserted between the two parts.
+
+        Args:
+            sim_type_str (str): Description of the simulation type.
+
+        Returns:
+            tuple: The overlay text before and after the fps line.
+        """
+        msg_right_top_str=f"{self.SIM_STATE.SIM_STATE_VAR["meta"]["SIM_TITLE"]}\n{sim_type_str}"
+        if self.SIM_STATE.get_data_by_key("simulation_config.DOUBLE_PENDULUM"):
+            msg_right_top_str+=f"\nrod a length [m]: {self.SIM_STATE.get_l1():.2f}"
+            msg_right_top_str+=f"\nrod b length [m]: {self.SIM_STATE.get_l2():.2f}"
+        else:
+            msg_right_top_str+=f"\nrod a length [m]: {self.SIM_STATE.get_l1():.2f}"
+
+        msg_right_top_str+=f"\ntime delay [s]: {self.config_dict["simulation_config"]["time_delay_s"]:.2f}"
+        msg_right_top_str+=f"\nnumeric method: {self.SIM_STATE.get_data_by_key("simulation_config.NUM_METHOD")}"
+        msg_right_top_str+=f"\nresolution [px]: {self.SIM_STATE.get_data_by_key("GUI_conditions.WIN_DIMS")}"
+        head_str = msg_right_top_str
+        msg_right_top_str = ""
+        if self.SIM_STATE.get_data_by_key("PD_control.PD_CONTROL_ON"):
+            msg_right_top_str+=f"\nControl method: {self.SIM_STATE.get_data_by_key("PD_control.CONTROL_METHOD")}"
+            msg_right_top_str+=f"\ntimedelay: {(self.SIM_STATE.get_frame_trim(True)*self.SIM_STATE.get_data_by_key("simulation_config.SAMPLERATE_S")):.3f} s"
+            msg_right_top_str+=f"\n -> K: [{self.SIM_STATE.get_data_by_key("PD_control.PD_K_1"):.2f}, {self.SIM_STATE.get_data_by_key("PD_control.PD_K_2"):.2f}, {self.SIM_STATE.get_data_by_key("PD_control.PD_K_3"):.2f}, {self.SIM_STATE.get_data_by_key("PD_control.PD_K_4"):.2f}]"
+        else:
+            msg_right_top_str+=f"\nWithout control loop."
+        return head_str, msg_right_top_str
+
     def check_for_length_decrease(self):
         """
         Check if the lengths of the rods should be decreased over time, based on simulation configuration.
         """
-        if not self.config_dict["simulation_config"]["constant_rod_length"]:
-            time_now = time.time()
-
-            if self.rdt_cntr_update_flag:
-                self.SIM_STATE.SIM_STATE_VAR["simulation_config"]["l1"] = []
-                self.SIM_STATE.SIM_STATE_VAR["simulation_config"]["l1"].append([
-                    self.config_dict["geometry_config"]["rod_a_length_m"], 0])
-                self.SIM_STATE.SIM_STATE_VAR["simulation_config"]["l2"] = []
-                self.SIM_STATE.SIM_STATE_VAR["simulation_config"]["l2"].append([
-                    self.config_dict["geometry_config"]["rod_b_length_m"], 0])
-                self.rdt_cntr_strt_1 = time_now
-                self.rdt_cntr_strt_2 = time_now
-                self.rdt_cntr_update_flag = False
-            else:
-                if self.config_dict["simulation_config"]["rod_a_dt_s"] == self.config_dict["simulation_config"]["rod_b_dt_s"]:
-                    if self.config_dict["simulation_config"]["rod_a_dt_s"] > 0.0001 and self.rdt_cntr_strt_1 + self.config_dict["simulation_config"]["rod_a_dt_s"] < time_now:    
-                        self.rdt_cntr_strt_1 = time_now
-                        self.rdt_cntr_strt_2 = time_now
-                        self.rod_length_decrease_action(
-                            self.config_dict["simulation_config"]["rod_a_dl_m"],
-                            self.config_dict["simulation_config"]["rod_b_dl_m"])
-                else:
-                    if self.config_dict["simulation_config"]["rod_a_dt_s"] > 0.0001 and self.rdt_cntr_strt_1 + self.config_dict["simulation_config"]["rod_a_dt_s"] < time_now:
-                        self.rdt_cntr_strt_1 = time_now
-                        self.rod_length_decrease_action(self.config_dict["simulation_config"]["rod_a_dl_m"], 0)
-
-                    if self.config_dict["simulation_config"]["rod_b_dt_s"] > 0.0001 and self.rdt_cntr_strt_2 + self.config_dict["simulation_config"]["rod_b_dt_s"] < time_now:
-                        self.rdt_cntr_strt_2 = time_now
-                        self.rod_length_decrease_action(0, self.config_dict["simulation_config"]["rod_b_dl_m"])
-
-    def rod_length_decrease_action(self, dL1, dL2):
-        """
-        Decrease the lengths of the rods in the simulation state.
+        if self.rod_schedule_external:
+            return
 
-        Args:
-            dL1 (float): Decrease in length for rod A.
-            dL2 (float): Decrease in length for rod B.
-        """
-        l1 = self.SIM_STATE.get_l1()
-        l2 = self.SIM_STATE.get_l2()
-        if l2 is None:
-            self.SIM_STATE.update_sys_variables(l1 - dL1, None)        
+        if self.rdt_cntr_update_flag:
+            self.rod_schedule.restart()
+            self.rdt_cntr_update_flag = False
         else:
-            self.SIM_STATE.update_sys_variables(l1 - dL1, l2 - dL2)
\ No newline at end of file
+            self.rod_schedule.poll()